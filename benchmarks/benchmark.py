@@ -0,0 +1,224 @@
+"""
+Benchmarks of the Grassmann tensor operations, sweeping rank, edge sizes, ratios of odd parts and dtypes.
+
+Record the timings with `python benchmarks/benchmark.py --output result.json`,
+and compare a later run with them by `python benchmarks/benchmark.py --baseline result.json`,
+which prints the speedup of every case recorded in both runs
+and exits with failure if any case is slower than the baseline beyond the tolerance.
+The script only relies on GrassmannTensor and checks the other features it uses,
+so it could record a baseline with an older revision of the package on the path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import itertools
+import json
+import math
+import sys
+import typing
+import torch
+import torch.utils.benchmark
+import grassmann_tensor
+from grassmann_tensor import GrassmannTensor
+
+RANKS = (2, 4, 6)
+DIMENSIONS = (2, 4, 8, 16)
+ODD_RATIOS = (0.25, 0.5)
+DTYPES = {"float32": torch.float32, "float64": torch.float64, "complex128": torch.complex128}
+
+
+@dataclasses.dataclass(frozen=True)
+class Case:
+    """
+    A benchmark case, which runs a single operation on tensors of given rank, dimension of every edge, ratio of odd part and dtype.
+    """
+
+    operation: str
+    rank: int
+    dimension: int
+    odd_ratio: float
+    dtype: str
+
+    @property
+    def name(self) -> str:
+        """
+        The name of the case, used as the key in the recorded results.
+        """
+        return f"{self.operation}/rank={self.rank}/dimension={self.dimension}/odd={self.odd_ratio}/{self.dtype}"
+
+
+def merged_edge(edges: tuple[tuple[int, int], ...]) -> tuple[int, int]:
+    """
+    Get the (even, odd) pair of the edge obtained by merging the given edges, like `grassmann_tensor.structure.merged_edge`.
+    """
+    total = math.prod(even + odd for even, odd in edges)
+    difference = math.prod(even - odd for even, odd in edges)
+    return (total + difference) // 2, (total - difference) // 2
+
+
+def random_tensor(edges: tuple[tuple[int, int], ...], dtype: torch.dtype, device: torch.device) -> GrassmannTensor:
+    """
+    Create a Grassmann tensor with random data and all arrows True, so every sign of the operations is nontrivial.
+    """
+    data = torch.randn([even + odd for even, odd in edges], dtype=dtype, device=device)
+    return GrassmannTensor(tuple(True for _ in edges), edges, data).update_mask()
+
+
+def prepare(case: Case, device: torch.device) -> typing.Callable[[], typing.Any]:
+    """
+    Create the tensors of a case and return the statement to be timed.
+    The deferred signs are materialized by reading the data, so the cost of applying them is included.
+    """
+    # pylint: disable=too-many-return-statements, too-many-locals
+    odd = round(case.dimension * case.odd_ratio)
+    edge = (case.dimension - odd, odd)
+    edges = tuple(edge for _ in range(case.rank))
+    dtype = DTYPES[case.dtype]
+    a = random_tensor(edges, dtype, device)
+    match case.operation:
+        case "permute":
+            order = tuple(reversed(range(case.rank)))
+            return lambda: a.permute(order).tensor
+        case "reverse":
+            indices = tuple(range(case.rank))
+            return lambda: a.reverse(indices).tensor
+        case "dagger":
+            return lambda: a.dagger().tensor
+        case "reshape_merge":
+            merge = (case.dimension**2,) + (-1,) * (case.rank - 2)
+            return lambda: a.reshape(merge).tensor
+        case "reshape_split":
+            merged = a.reshape((case.dimension**2,) + (-1,) * (case.rank - 2))
+            split = (edge, edge) + (-1,) * (case.rank - 2)
+            return lambda: merged.reshape(split).tensor
+        case "matmul":
+            matrix_edge = merged_edge(edges[:case.rank // 2])
+            x = random_tensor((matrix_edge, matrix_edge), dtype, device)
+            y = random_tensor((matrix_edge, matrix_edge), dtype, device)
+            return lambda: x.matmul(y).tensor
+        case "update_mask":
+            return lambda: a.clone().update_mask().tensor
+        case "clone":
+            return lambda: a.clone().tensor
+        case "construct":
+            data = a.tensor
+            return lambda: GrassmannTensor(a.arrow, edges, data)
+        case "neg":
+            return lambda: (-a).tensor
+        case "add":
+            b = random_tensor(edges, dtype, device)
+            return lambda: (a + b).tensor
+        case "mul":
+            b = random_tensor(edges, dtype, device)
+            return lambda: (a * b).tensor
+        case "iadd":
+            b = random_tensor(edges, dtype, device)
+            c = a.clone()
+
+            def iadd() -> None:
+                nonlocal c
+                c += b
+
+            return iadd
+        case _:
+            raise ValueError(f"Unknown operation {case.operation}.")
+
+
+OPERATIONS = ("permute", "reverse", "dagger", "reshape_merge", "reshape_split", "matmul", "update_mask", "clone", "construct", "neg", "add", "mul", "iadd")
+
+
+def cases(max_size: int) -> list[Case]:
+    """
+    Enumerate all benchmark cases with at most max_size elements in every tensor.
+    """
+    return [
+        Case(operation, rank, dimension, odd_ratio, dtype)
+        for operation, rank, dimension, odd_ratio, dtype in itertools.product(OPERATIONS, RANKS, DIMENSIONS, ODD_RATIOS, DTYPES)
+        if dimension**rank <= max_size and (operation != "dagger" or hasattr(GrassmannTensor, "dagger"))
+    ]
+
+
+def run(case: Case, device: torch.device, min_run_time: float) -> float:
+    """
+    Run a case and return the median time of a single call in seconds.
+    """
+    statement = prepare(case, device)
+    timer = torch.utils.benchmark.Timer(stmt="statement()", globals={"statement": statement})
+    return timer.blocked_autorange(min_run_time=min_run_time).median
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Compare the results with the baseline, returning the names of the cases slower than the baseline by more than the tolerance ratio.
+    """
+    return [name for name, time in results.items() if name in baseline and time > baseline[name] * (1 + tolerance)]
+
+
+def configure(no_validation: bool, block_threads: int) -> None:
+    """
+    Apply the switches of the package. Older revisions lack them, and always validate and run the blocks serially, so they are skipped with a note.
+    """
+    if no_validation:
+        if hasattr(grassmann_tensor, "set_validation"):
+            grassmann_tensor.set_validation(False)
+        else:
+            print("This revision has no set_validation, so the validation stays enabled.", file=sys.stderr)
+    if hasattr(grassmann_tensor, "set_block_threads"):
+        grassmann_tensor.set_block_threads(block_threads)
+    elif block_threads != 1:
+        print("This revision has no set_block_threads, so the blocks run serially.", file=sys.stderr)
+
+
+def main() -> int:
+    """
+    The entry of the benchmark script.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Grassmann tensor operations.")
+    parser.add_argument("--output", help="the file to record the results as JSON")
+    parser.add_argument("--baseline", help="the JSON file recorded by a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="the allowed relative slowdown compared with the baseline")
+    parser.add_argument("--filter", default="", help="only run the cases whose name contains this string")
+    parser.add_argument("--device", default="cpu", help="the device to run on")
+    parser.add_argument("--max-size", type=int, default=2**20, help="the maximum number of elements of a tensor")
+    parser.add_argument("--min-run-time", type=float, default=0.2, help="the minimum time in seconds spent on every case")
+    parser.add_argument("--no-validation", action="store_true", help="disable the validation of the tensor structure")
+    parser.add_argument("--block-threads", type=int, default=1, help="the number of threads running the sector blocks concurrently")
+    args = parser.parse_args()
+
+    configure(args.no_validation, args.block_threads)
+
+    baseline: dict[str, float] = {}
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    device = torch.device(args.device)
+    results: dict[str, float] = {}
+    for case in cases(args.max_size):
+        if args.filter in case.name:
+            results[case.name] = run(case, device, args.min_run_time)
+            if case.name in baseline:
+                speedup = baseline[case.name] / results[case.name]
+                print(f"{case.name}: {baseline[case.name] * 1e6:.1f} us -> {results[case.name] * 1e6:.1f} us ({speedup:.2f}x)")
+            else:
+                print(f"{case.name}: {results[case.name] * 1e6:.1f} us")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"torch": torch.__version__, "device": str(device), "results": results}, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    if args.baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name in regressions:
+            print(f"Regression in {name}: {baseline[name] * 1e6:.1f} us -> {results[name] * 1e6:.1f} us")
+        if regressions:
+            return 1
+        print(f"No regression beyond {args.tolerance:.0%} compared with {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
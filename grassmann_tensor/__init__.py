@@ -2,7 +2,56 @@
 A Grassmann algebra tensor package.
 """
 
-__all__ = ["__version__", "GrassmannTensor"]
+__all__ = [
+    "__version__",
+    "GrassmannTensor",
+    "set_validation",
+    "validation_enabled",
+    "BlockGrassmannTensor",
+    "sign_cache_info",
+    "clear_sign_cache",
+    "set_sign_cache_size",
+    "einsum",
+    "contraction_path",
+    "reshape_cache_info",
+    "clear_reshape_cache",
+    "Metrics",
+    "OperationMetrics",
+    "collect_metrics",
+    "enable_metrics",
+    "disable_metrics",
+    "current_metrics",
+    "save",
+    "load",
+    "load_blocks",
+    "set_block_threads",
+    "block_threads",
+    "ShardedGrassmannTensor",
+    "TensorNetwork",
+    "create_blocks",
+    "open_blocks",
+    "streamed_tensordot",
+    "streamed_matmul",
+    "ChargedGrassmannTensor",
+    "fuse_edges",
+    "fusion_order",
+    "parity_edge",
+    "svd",
+    "qr",
+    "eigh",
+]
 
 from .version import __version__
-from .tensor import GrassmannTensor
+from .tensor import GrassmannTensor, set_validation, validation_enabled
+from .block_tensor import BlockGrassmannTensor
+from .sign import sign_cache_info, clear_sign_cache, set_sign_cache_size
+from .einsum import einsum, contraction_path
+from .reshape_plan import reshape_cache_info, clear_reshape_cache
+from .metrics import Metrics, OperationMetrics, collect_metrics, enable_metrics, disable_metrics, current_metrics
+from .serialization import save, load, load_blocks
+from .parallel import set_block_threads, block_threads
+from .distributed import ShardedGrassmannTensor
+from .network import TensorNetwork
+from .out_of_core import create_blocks, open_blocks, streamed_tensordot, streamed_matmul
+from .charged import ChargedGrassmannTensor, fuse_edges, fusion_order, parity_edge
+from .linalg import svd, qr, eigh
@@ -0,0 +1,484 @@
+"""
+A block-sparse Grassmann tensor class.
+"""
+
+from __future__ import annotations
+
+__all__ = ["BlockGrassmannTensor", "reshape_blocks", "reshape_sources"]
+
+import dataclasses
+import functools
+import operator
+import typing
+import torch
+from .parallel import run_blocks
+from .structure import sectors, sector_slices, sector_shape, parse_reshape
+from .tensor import GrassmannTensor
+
+Block = dict[tuple[bool, ...], torch.Tensor]
+FineSector = tuple[tuple[bool, ...], tuple[bool, ...], bool, tuple[tuple[bool, ...], ...]]
+
+
+@dataclasses.dataclass
+class BlockGrassmannTensor:
+    """
+    A block-sparse Grassmann tensor class, which stores only the parity-allowed sector blocks of a Grassmann tensor.
+
+    Each block is keyed by a tuple of booleans, one per edge, where True selects the odd part of that edge.
+    Every sector with even total parity is stored, even if it is empty, and no other sector is stored.
+    Since the sign of every fermionic operation is constant inside a sector, signs are applied per block instead of per element.
+    """
+
+    _arrow: tuple[bool, ...]
+    _edges: tuple[tuple[int, int], ...]
+    _blocks: Block
+
+    @property
+    def arrow(self) -> tuple[bool, ...]:
+        """
+        The arrow of the tensor, represented as a tuple of booleans indicating the order of the fermion operators.
+        """
+        return self._arrow
+
+    @property
+    def edges(self) -> tuple[tuple[int, int], ...]:
+        """
+        The edges of the tensor, represented as a tuple of pairs (even, odd).
+        """
+        return self._edges
+
+    @property
+    def blocks(self) -> Block:
+        """
+        The sector blocks of the tensor, keyed by the parity of each edge.
+        """
+        return self._blocks
+
+    @classmethod
+    def from_dense(cls, tensor: GrassmannTensor) -> BlockGrassmannTensor:
+        """
+        Create a block-sparse Grassmann tensor from a dense one, dropping the elements forbidden by parity.
+        The pending sign of the dense tensor is constant in every block, so it is applied per block without materializing the whole data.
+        """
+        # pylint: disable=protected-access
+        assert not tensor.batch_shape, f"Block-sparse Grassmann tensors have no batch dimensions. Got batch shape {tuple(tensor.batch_shape)}."
+        singles, pairs = tensor._pending_sign(tuple(range(len(tensor.edges))))
+        blocks: Block = {}
+        for key in sectors(len(tensor.edges)):
+            block = tensor._block(sector_slices(tensor.edges, key))
+            sign = (sum(key[i] for i in singles) + sum(key[i] and key[j] for i, j in pairs)) % 2 == 1
+            blocks[key] = -block if sign else block.clone()
+        return cls(_arrow=tensor.arrow, _edges=tensor.edges, _blocks=blocks)
+
+    def to_dense(self) -> GrassmannTensor:
+        """
+        Convert the block-sparse Grassmann tensor to a dense one, filling the elements forbidden by parity with zeros.
+        """
+        tensor = self._reference().new_zeros([even + odd for even, odd in self._edges])
+        for key, block in self._blocks.items():
+            tensor[sector_slices(self._edges, key)] = block
+        return GrassmannTensor(_arrow=self._arrow, _edges=self._edges, _tensor=tensor)
+
+    def to(self, whatever: torch.device | torch.dtype | str | None = None, *, device: torch.device | None = None, dtype: torch.dtype | None = None) -> BlockGrassmannTensor:
+        """
+        Copy the tensor to a specified device or copy it to a specified data type.
+        """
+        match whatever:
+            case torch.device():
+                assert device is None, "Duplicate device specification."
+                device = whatever
+            case torch.dtype():
+                assert dtype is None, "Duplicate dtype specification."
+                dtype = whatever
+            case str():
+                assert device is None, "Duplicate device specification."
+                device = torch.device(whatever)
+            case _:
+                pass
+        if device is None and dtype is None:
+            return self
+        return dataclasses.replace(
+            self,
+            _blocks={
+                key: block.to(device=device, dtype=dtype) for key, block in self._blocks.items()
+            },
+        )
+
+    def permute(self, before_by_after: tuple[int, ...]) -> BlockGrassmannTensor:
+        """
+        Permute the indices of the Grassmann tensor.
+        """
+        assert len(before_by_after) == len(set(before_by_after)), "Permutation indices must be unique."
+        assert set(before_by_after) == set(range(len(self._edges))), "Permutation indices must cover all dimensions."
+
+        arrow = tuple(self._arrow[i] for i in before_by_after)
+        edges = tuple(self._edges[i] for i in before_by_after)
+        pairs = tuple((i, j) for j in range(len(before_by_after)) for i in range(0, j) if before_by_after[i] > before_by_after[j])
+
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            new_key = tuple(key[i] for i in before_by_after)
+            blocks[new_key] = self._signed(block.permute(before_by_after), sum(new_key[i] and new_key[j] for i, j in pairs) % 2 == 1)
+
+        return dataclasses.replace(
+            self,
+            _arrow=arrow,
+            _edges=edges,
+            _blocks=blocks,
+        )
+
+    def reverse(self, indices: tuple[int, ...]) -> BlockGrassmannTensor:
+        """
+        Reverse the specified indices of the Grassmann tensor.
+
+        A single sign is generated during reverse, which should be applied to one of the connected two tensors.
+        This package always applies it to the tensor with arrow as True.
+        """
+        assert len(set(indices)) == len(indices), f"Indices must be unique. Got {indices}."
+        assert all(0 <= i < len(self._edges) for i in indices), f"Indices must be within tensor dimensions. Got {indices}."
+
+        arrow = tuple(self._arrow[i] ^ (i in indices) for i in range(len(self._edges)))
+        singles = tuple(index for index in indices if self._arrow[index])
+
+        return dataclasses.replace(
+            self,
+            _arrow=arrow,
+            _blocks={
+                key: self._signed(block,
+                                  sum(key[i] for i in singles) % 2 == 1) for key, block in self._blocks.items()
+            },
+        )
+
+    def reshape(self, new_shape: tuple[int | tuple[int, int], ...]) -> BlockGrassmannTensor:
+        """
+        Reshape the Grassmann tensor, which may split or merge edges.
+
+        See `GrassmannTensor.reshape` for the format of the new shape.
+        """
+        arrow, edges, blocks = reshape_blocks(self._arrow, self._edges, self._blocks, new_shape)
+        return BlockGrassmannTensor(_arrow=arrow, _edges=edges, _blocks=blocks)
+
+    def matmul(self, other: BlockGrassmannTensor) -> BlockGrassmannTensor:
+        """
+        Perform matrix multiplication with another Grassmann tensor.
+        Both of them should be rank 2 tensors, except some pure even edges could exist before the last two edges.
+        The products of the even and the odd blocks run concurrently if more than one block thread is set by set_block_threads.
+        """
+        # pylint: disable=protected-access, too-many-locals
+        # The creation operator order from arrow is (False True)
+        # So (x, True) * (False, y) = (x, y)
+        tensor_a = self
+        tensor_b = other
+
+        vector_a = len(tensor_a.edges) == 1
+        if vector_a:
+            tensor_a = tensor_a._insert_trivial_edge(0)
+        vector_b = len(tensor_b.edges) == 1
+        if vector_b:
+            tensor_b = tensor_b._insert_trivial_edge(1)
+
+        assert all(odd == 0 for (even, odd) in tensor_a.edges[:-2]), f"All edges except the last two must be pure even. Got {tensor_a.edges[:-2]}."
+        assert all(odd == 0 for (even, odd) in tensor_b.edges[:-2]), f"All edges except the last two must be pure even. Got {tensor_b.edges[:-2]}."
+        assert tensor_a.edges[-1] == tensor_b.edges[-2], f"Contracted edges must match. Got {tensor_a.edges[-1]} and {tensor_b.edges[-2]}."
+
+        if tensor_a.arrow[-1] is not True:
+            tensor_a = tensor_a.reverse((len(tensor_a.edges) - 1,))
+        if tensor_b.arrow[-2] is not False:
+            tensor_b = tensor_b.reverse((len(tensor_b.edges) - 2,))
+
+        broadcast_a = len(tensor_a.edges) - 2
+        broadcast_b = len(tensor_b.edges) - 2
+
+        arrow = []
+        edges = []
+        for i in range(-max(broadcast_a, broadcast_b), 0):
+            arrow.append(False)
+            candidate_a = candidate_b = 1
+            if i >= -broadcast_a:
+                candidate_a = tensor_a.edges[i - 2][0]
+            if i >= -broadcast_b:
+                candidate_b = tensor_b.edges[i - 2][0]
+            assert candidate_a == candidate_b or candidate_a == 1 or candidate_b == 1, f"Cannot broadcast edges {tensor_a.edges[i - 2]} and {tensor_b.edges[i - 2]}."
+            edges.append((max(candidate_a, candidate_b), 0))
+        arrow.append(tensor_a.arrow[-2])
+        edges.append(tensor_a.edges[-2])
+        arrow.append(tensor_b.arrow[-1])
+        edges.append(tensor_b.edges[-1])
+
+        # Only the diagonal blocks (even, even) and (odd, odd) of both matrices are allowed by parity.
+        pairs = [(tensor_a.blocks[(False,) * broadcast_a + (parity, parity)], tensor_b.blocks[(False,) * broadcast_b + (parity, parity)]) for parity in (False, True)]
+        products = dict(zip((False, True), run_blocks([(block_a.numel() * block_b.size(-1), functools.partial(torch.matmul, block_a, block_b)) for block_a, block_b in pairs])))
+        blocks: Block = {}
+        for key in sectors(len(edges)):
+            if not any(key[:-2]) and key[-2] == key[-1]:
+                blocks[key] = products[key[-1]]
+            else:
+                blocks[key] = products[False].new_zeros(sector_shape(tuple(edges), key))
+
+        result = BlockGrassmannTensor(_arrow=tuple(arrow), _edges=tuple(edges), _blocks=blocks)
+        if vector_a:
+            result = result._remove_trivial_edge(len(edges) - 2)
+        if vector_b:
+            result = result._remove_trivial_edge(len(result.edges) - 1)
+        return result
+
+    def __post_init__(self) -> None:
+        assert len(self._arrow) == len(self._edges), f"Arrow length ({len(self._arrow)}) must match edges length ({len(self._edges)})."
+        assert set(self._blocks) == set(sectors(len(self._edges))), f"Blocks must cover exactly the sectors with even parity. Got {tuple(self._blocks)}."
+        for key, block in self._blocks.items():
+            assert tuple(block.shape) == sector_shape(self._edges, key), f"Block {key} has shape {tuple(block.shape)} but edges {self._edges} require {sector_shape(self._edges, key)}."
+        for (even, odd) in self._edges:
+            assert even >= 0 and odd >= 0, f"Even ({even}) and odd ({odd}) parts must be non-negative."
+
+    def _reference(self) -> torch.Tensor:
+        # There is always at least one block, since the sector with all edges even always exists.
+        return next(iter(self._blocks.values()))
+
+    def _signed(self, block: torch.Tensor, sign: bool) -> torch.Tensor:
+        return -block if sign else block
+
+    def _insert_trivial_edge(self, index: int) -> BlockGrassmannTensor:
+        edges = self._edges[:index] + ((1, 0),) + self._edges[index:]
+        blocks: Block = {}
+        for key in sectors(len(edges)):
+            if key[index]:
+                blocks[key] = self._reference().new_zeros(sector_shape(edges, key))
+            else:
+                blocks[key] = self._blocks[key[:index] + key[index + 1:]].unsqueeze(index)
+        return BlockGrassmannTensor(_arrow=self._arrow[:index] + (False,) + self._arrow[index:], _edges=edges, _blocks=blocks)
+
+    def _remove_trivial_edge(self, index: int) -> BlockGrassmannTensor:
+        return BlockGrassmannTensor(
+            _arrow=self._arrow[:index] + self._arrow[index + 1:],
+            _edges=self._edges[:index] + self._edges[index + 1:],
+            _blocks={
+                key[:index] + key[index + 1:]: block.squeeze(index) for key, block in self._blocks.items() if not key[index]
+            },
+        )
+
+    def _validate_edge_compatibility(self, other: BlockGrassmannTensor) -> None:
+        """
+        Validate that the edges of two BlockGrassmannTensor instances are compatible for arithmetic operations.
+        """
+        assert self._arrow == other.arrow, f"Arrows must match for arithmetic operations. Got {self._arrow} and {other.arrow}."
+        assert self._edges == other.edges, f"Edges must match for arithmetic operations. Got {self._edges} and {other.edges}."
+
+    def _binary(self, other: typing.Any, function: typing.Callable[[typing.Any, typing.Any], typing.Any], reflected: bool = False) -> BlockGrassmannTensor:
+        if isinstance(other, BlockGrassmannTensor):
+            self._validate_edge_compatibility(other)
+            return dataclasses.replace(
+                self,
+                _blocks={
+                    key: function(block, other.blocks[key]) for key, block in self._blocks.items()
+                },
+            )
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            try:
+                result = function(other, block) if reflected else function(block, other)
+            except TypeError:
+                return NotImplemented
+            if not isinstance(result, torch.Tensor):
+                return NotImplemented
+            blocks[key] = result
+        return dataclasses.replace(
+            self,
+            _blocks=blocks,
+        )
+
+    def _inplace(self, other: typing.Any, function: typing.Callable[[typing.Any, typing.Any], typing.Any]) -> BlockGrassmannTensor:
+        # Blocks may share memory with other tensors, for example after permute, so they are replaced instead of being updated in place.
+        result = self._binary(other, function)
+        if result is NotImplemented:
+            return NotImplemented
+        self._blocks = result.blocks
+        return self
+
+    def __pos__(self) -> BlockGrassmannTensor:
+        return dataclasses.replace(
+            self,
+            _blocks={
+                key: +block for key, block in self._blocks.items()
+            },
+        )
+
+    def __neg__(self) -> BlockGrassmannTensor:
+        return dataclasses.replace(
+            self,
+            _blocks={
+                key: -block for key, block in self._blocks.items()
+            },
+        )
+
+    def __add__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.add)
+
+    def __radd__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.add, reflected=True)
+
+    def __iadd__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._inplace(other, operator.add)
+
+    def __sub__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.sub)
+
+    def __rsub__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.sub, reflected=True)
+
+    def __isub__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._inplace(other, operator.sub)
+
+    def __mul__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.mul)
+
+    def __rmul__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.mul, reflected=True)
+
+    def __imul__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._inplace(other, operator.mul)
+
+    def __truediv__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.truediv)
+
+    def __rtruediv__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._binary(other, operator.truediv, reflected=True)
+
+    def __itruediv__(self, other: typing.Any) -> BlockGrassmannTensor:
+        return self._inplace(other, operator.truediv)
+
+    def clone(self) -> BlockGrassmannTensor:
+        """
+        Create a deep copy of the Grassmann tensor.
+        """
+        return dataclasses.replace(
+            self,
+            _blocks={
+                key: block.clone() for key, block in self._blocks.items()
+            },
+        )
+
+    def __copy__(self) -> BlockGrassmannTensor:
+        return self.clone()
+
+    def __deepcopy__(self, memo: dict) -> BlockGrassmannTensor:
+        return self.clone()
+
+
+def _unsqueeze(tensor: torch.Tensor, index: int, dim: int) -> torch.Tensor:
+    return tensor.view([-1 if i == index else 1 for i in range(dim)])
+
+
+def _fine_rank(edges: tuple[tuple[int, int], ...], device: torch.device) -> torch.Tensor:
+    # The position of every element of the merged edge inside the even or odd part it belongs to, in the shape of the finest edges.
+    parity = functools.reduce(
+        torch.logical_xor,
+        (_unsqueeze(torch.arange(even + odd, device=device) >= even, index, len(edges)) for index, (even, odd) in enumerate(edges)),
+        torch.zeros([even + odd for even, odd in edges], dtype=torch.bool, device=device),
+    ).flatten()
+    rank = torch.where(parity, torch.cumsum(parity, 0), torch.cumsum(~parity, 0)) - 1
+    return rank.view([even + odd for even, odd in edges])
+
+
+def _fine_sectors(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    new_shape: tuple[int | tuple[int, int], ...],
+) -> tuple[tuple[bool, ...], tuple[tuple[int, int], ...], tuple[tuple[int, int, int, int], ...], tuple[tuple[tuple[int, int], ...], ...], list[FineSector]]:
+    # Parse a reshape and enumerate the sectors of the finest edges, each with its old key, new key, sign and the sub keys of every group.
+    # pylint: disable=too-many-locals
+    new_arrow, new_edges, groups = parse_reshape(arrow, edges, new_shape)
+    # The finest edges of each group, which are the old edges for merging and the new edges for splitting.
+    fine_edges = tuple(new_edges[begin_plan:end_plan] if end_plan - begin_plan != 1 else edges[begin_self:end_self] for begin_self, end_self, begin_plan, end_plan in groups)
+    fine_sectors: list[FineSector] = []
+    for fine_key in sectors(sum(len(group_edges) for group_edges in fine_edges)):
+        old_key: list[bool] = []
+        new_key: list[bool] = []
+        sign = False
+        sub_keys: list[tuple[bool, ...]] = []
+        cursor = 0
+        for (begin_self, end_self, begin_plan, end_plan), group_edges in zip(groups, fine_edges):
+            sub_key = fine_key[cursor:cursor + len(group_edges)]
+            cursor += len(group_edges)
+            sub_keys.append(sub_key)
+            parity = sum(sub_key) % 2 == 1
+            old_key.extend(sub_key if end_self - begin_self != 1 else (parity,))
+            new_key.extend(sub_key if end_plan - begin_plan != 1 else (parity,))
+            if len(sub_key) != 1 and arrow[begin_self]:
+                count = sum(sub_key)
+                sign ^= bool(count * (count - 1) & 2)
+        fine_sectors.append((tuple(old_key), tuple(new_key), sign, tuple(sub_keys)))
+    return new_arrow, new_edges, groups, fine_edges, fine_sectors
+
+
+def reshape_sources(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    new_shape: tuple[int | tuple[int, int], ...],
+) -> dict[tuple[bool, ...], set[tuple[bool, ...]]]:
+    """
+    Get the keys of the old blocks that every new block of a reshape is built from.
+    """
+    sources: dict[tuple[bool, ...], set[tuple[bool, ...]]] = {}
+    for old_key, new_key, _, _ in _fine_sectors(arrow, edges, new_shape)[4]:
+        sources.setdefault(new_key, set()).add(old_key)
+    return sources
+
+
+def reshape_blocks(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    blocks: typing.Mapping[tuple[bool, ...], torch.Tensor],
+    new_shape: tuple[int | tuple[int, int], ...],
+    keys: typing.Collection[tuple[bool, ...]] | None = None,
+) -> tuple[tuple[bool, ...], tuple[tuple[int, int], ...], Block]:
+    """
+    Reshape the blocks of a Grassmann tensor with the given arrow and edges, returning the new arrow, edges and blocks.
+    Only the new blocks in keys are built, or all of them if keys is None, and only the old blocks they are built from are read,
+    so the other old blocks could be missing, see reshape_sources.
+    """
+    # This function reshapes sector by sector of the finest edges, including the following steps:
+    # 1. Select the old block which the fine sector belongs to
+    # 2. Select the fine sector inside the old block for splitting
+    # 3. Apply the sign for splitting and merging
+    # 4. Place the fine sector inside the new block for merging
+
+    # pylint: disable=too-many-locals,too-many-arguments,too-many-positional-arguments
+
+    new_arrow, new_edges, groups, fine_edges, fine_sectors = _fine_sectors(arrow, edges, new_shape)
+    keys = sectors(len(new_edges)) if keys is None else keys
+    new_blocks: Block = {}
+    if not keys:
+        return new_arrow, new_edges, new_blocks
+    reference = next(iter(blocks.values()))
+    fine_ranks = tuple(_fine_rank(group_edges, reference.device) if len(group_edges) != 1 else None for group_edges in fine_edges)
+    merging = any(end_self - begin_self != 1 for begin_self, end_self, _, _ in groups)
+
+    if merging:
+        new_blocks = {key: reference.new_zeros(sector_shape(new_edges, key)) for key in keys}
+
+    for old_key, new_key, sign, sub_keys in fine_sectors:
+        if new_key not in keys:
+            continue
+        block = blocks[old_key]
+        for (begin_self, _, begin_plan, end_plan), group_edges, sub_key, fine_rank in reversed(tuple(zip(groups, fine_edges, sub_keys, fine_ranks))):
+            if end_plan - begin_plan != 1:
+                assert fine_rank is not None
+                positions = fine_rank[sector_slices(group_edges, sub_key)].flatten()
+                block = torch.unflatten(block.index_select(begin_self, positions), begin_self, sector_shape(group_edges, sub_key))
+        block = -block if sign else block
+
+        if not merging:
+            new_blocks[new_key] = block
+            continue
+
+        indices: list[torch.Tensor] = []
+        for (begin_self, end_self, _, _), group_edges, sub_key, fine_rank in zip(groups, fine_edges, sub_keys, fine_ranks):
+            if end_self - begin_self != 1:
+                assert fine_rank is not None
+                indices.append(fine_rank[sector_slices(group_edges, sub_key)].flatten())
+            else:
+                indices.extend(torch.arange(size, device=reference.device) for size in sector_shape(group_edges, sub_key))
+        block = block.reshape([len(positions) for positions in indices])
+        new_blocks[new_key][tuple(_unsqueeze(positions, index, len(indices)) for index, positions in enumerate(indices))] = block
+
+    return new_arrow, new_edges, new_blocks
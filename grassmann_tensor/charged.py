@@ -0,0 +1,541 @@
+"""
+A block-sparse Grassmann tensor class whose edges carry U(1) or Z2×U(1) charges, with the parity derived from the charges.
+"""
+
+from __future__ import annotations
+
+__all__ = ["ChargedGrassmannTensor", "fuse_edges", "fusion_order", "parity_edge"]
+
+import dataclasses
+import functools
+import itertools
+import math
+import operator
+import types
+import typing
+import torch
+from .parallel import run_blocks
+from .tensor import GrassmannTensor
+
+Charge = tuple[int, ...]
+ChargedEdge = tuple[tuple[Charge, int], ...]
+Key = tuple[Charge, ...]
+Block = dict[Key, torch.Tensor]
+
+CHARGE_CACHE_SIZE = 128
+
+
+def _canonical(charge: Charge, moduli: tuple[int, ...]) -> Charge:
+    return tuple(value % modulus if modulus != 0 else value for value, modulus in zip(charge, moduli))
+
+
+def _parity(charge: Charge) -> bool:
+    # The first symmetry counts the fermions, so its charge gives the parity.
+    return charge[0] % 2 == 1
+
+
+def _negated(edge: ChargedEdge, moduli: tuple[int, ...]) -> ChargedEdge:
+    return tuple((_canonical(tuple(-value for value in charge), moduli), dim) for charge, dim in edge)
+
+
+def _conserved(arrow: tuple[bool, ...], key: Key, moduli: tuple[int, ...]) -> bool:
+    total = [0] * len(moduli)
+    for flipped, charge in zip(arrow, key):
+        for index, value in enumerate(charge):
+            total[index] += -value if flipped else value
+    return not any(_canonical(tuple(total), moduli))
+
+
+@functools.lru_cache(maxsize=CHARGE_CACHE_SIZE)
+def _sectors(arrow: tuple[bool, ...], edges: tuple[ChargedEdge, ...], moduli: tuple[int, ...]) -> tuple[Key, ...]:
+    # Enumerate the keys of the blocks whose total charge is zero, where the charges of the edges with arrow True count negatively.
+    return tuple(key for key in itertools.product(*(tuple(charge for charge, _ in edge) for edge in edges)) if _conserved(arrow, key, moduli))
+
+
+@functools.lru_cache(maxsize=CHARGE_CACHE_SIZE)
+def _offsets(edge: ChargedEdge) -> typing.Mapping[Charge, int]:
+    # The offset of every segment in the dense edge, where the even segments precede the odd segments, each kept in order.
+    # It is cached, so a read-only view is returned.
+    offsets: dict[Charge, int] = {}
+    cursor = 0
+    for parity in (False, True):
+        for charge, dim in edge:
+            if _parity(charge) == parity:
+                offsets[charge] = cursor
+                cursor += dim
+    return types.MappingProxyType(offsets)
+
+
+def _shape(edges: tuple[ChargedEdge, ...], key: Key) -> tuple[int, ...]:
+    return tuple(dict(edge)[charge] for edge, charge in zip(edges, key))
+
+
+def _slices(edges: tuple[ChargedEdge, ...], key: Key) -> tuple[slice, ...]:
+    return tuple(slice(_offsets(edge)[charge], _offsets(edge)[charge] + dim) for edge, charge, dim in zip(edges, key, _shape(edges, key)))
+
+
+def _dimension(edge: ChargedEdge) -> int:
+    return sum(dim for _, dim in edge)
+
+
+@functools.lru_cache(maxsize=CHARGE_CACHE_SIZE)
+def _fusion(edges: tuple[ChargedEdge, ...], moduli: tuple[int, ...]) -> tuple[ChargedEdge, typing.Mapping[Key, tuple[Charge, int]]]:
+    # Fuse the edges, returning the fused edge and the segment and the offset inside it where every combination of the segments is placed.
+    # It is cached, so a read-only view of the placements is returned.
+    dims: dict[Charge, int] = {}
+    placements: dict[Key, tuple[Charge, int]] = {}
+    for segments in itertools.product(*edges):
+        sub_key = tuple(charge for charge, _ in segments)
+        charge = _canonical(tuple(map(sum, zip(*sub_key))), moduli)
+        placements[sub_key] = (charge, dims.get(charge, 0))
+        dims[charge] = dims.get(charge, 0) + math.prod(dim for _, dim in segments)
+    return tuple(sorted(dims.items(), key=lambda item: (_parity(item[0]), item[0]))), types.MappingProxyType(placements)
+
+
+def fuse_edges(edges: tuple[ChargedEdge, ...], moduli: tuple[int, ...]) -> ChargedEdge:
+    """
+    Get the charged edge obtained by merging the given charged edges, whose segments are the sums of the charges of the merged edges,
+    ordered by parity and then by charge.
+    Inside every segment, the products of the segments of the merged edges with that charge are placed in lexicographic order.
+    """
+    return _fusion(edges, moduli)[0]
+
+
+@functools.lru_cache(maxsize=CHARGE_CACHE_SIZE)
+def fusion_order(edges: tuple[ChargedEdge, ...], moduli: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Get the position in the merged edge of `GrassmannTensor.reshape` of every position in the merged edge given by fuse_edges.
+    Both merged edges place the even elements before the odd ones, but order the elements inside each parity differently,
+    so a dense tensor converted from a merged charged tensor equals the dense reshape indexed by this order along the merged edge.
+    """
+    # pylint: disable=too-many-locals
+    fused, placements = _fusion(edges, moduli)
+    # The rank of every element of the flattened edges among the elements of the same parity, with the odd ones after the even ones.
+    parities = [False]
+    for edge in edges:
+        edge_parities = [False] * _dimension(edge)
+        for charge, dim in edge:
+            edge_parities[_offsets(edge)[charge]:_offsets(edge)[charge] + dim] = [_parity(charge)] * dim
+        parities = [parity ^ edge_parity for parity in parities for edge_parity in edge_parities]
+    ranks = [0] * len(parities)
+    counts = [0, parities.count(False)]
+    for index, parity in enumerate(parities):
+        ranks[index] = counts[parity]
+        counts[parity] += 1
+
+    strides = [math.prod(_dimension(edge) for edge in edges[index + 1:]) for index in range(len(edges))]
+    order = [0] * len(parities)
+    for sub_key, (charge, offset) in placements.items():
+        cursor = _offsets(fused)[charge] + offset
+        ranges = [range(_offsets(edge)[sub_charge], _offsets(edge)[sub_charge] + dict(edge)[sub_charge]) for edge, sub_charge in zip(edges, sub_key)]
+        for indices in itertools.product(*ranges):
+            order[cursor] = ranks[sum(index * stride for index, stride in zip(indices, strides))]
+            cursor += 1
+    return tuple(order)
+
+
+def parity_edge(edge: ChargedEdge) -> tuple[int, int]:
+    """
+    Get the (even, odd) pair of the edge of the dense tensor corresponding to the given charged edge.
+    """
+    even = sum(dim for charge, dim in edge if not _parity(charge))
+    return even, _dimension(edge) - even
+
+
+def _parse_reshape(
+    arrow: tuple[bool, ...],
+    edges: tuple[ChargedEdge, ...],
+    moduli: tuple[int, ...],
+    new_shape: tuple[int | ChargedEdge, ...],
+) -> tuple[tuple[bool, ...], tuple[ChargedEdge, ...], tuple[tuple[int, int, int, int], ...]]:
+    # Parse the new shape of a reshape like parse_reshape, returning the new arrow, the new edges and the groups (begin_self, end_self, begin_plan, end_plan).
+    # pylint: disable=too-many-locals
+    new_arrow: list[bool] = []
+    new_edges: list[ChargedEdge] = []
+    groups: list[tuple[int, int, int, int]] = []
+    cursor_self = 0
+    cursor_plan = 0
+    while cursor_self != len(edges) or cursor_plan != len(new_shape):
+        assert cursor_self < len(edges) and cursor_plan < len(new_shape), f"Dimension mismatch with edges {edges} and new shape {new_shape}."
+        item = new_shape[cursor_plan]
+        if item == -1:
+            # Does not change
+            new_arrow.append(arrow[cursor_self])
+            new_edges.append(edges[cursor_self])
+            groups.append((cursor_self, cursor_self + 1, cursor_plan, cursor_plan + 1))
+            cursor_self += 1
+            cursor_plan += 1
+        elif isinstance(item, int) or _dimension(item) >= _dimension(edges[cursor_self]):
+            # Merging
+            total = item if isinstance(item, int) else _dimension(item)
+            end_self = cursor_self
+            self_total = 1
+            while self_total < total:
+                assert end_self < len(edges), f"New shape {new_shape} exceeds tensor dimensions {len(edges)}."
+                self_total *= _dimension(edges[end_self])
+                end_self += 1
+            assert self_total == total, f"Dimension mismatch with edges {edges} and new shape {new_shape}."
+            assert all(self_arrow == arrow[cursor_self] for self_arrow in arrow[cursor_self:end_self]), f"Cannot merge edges with different arrows {arrow[cursor_self:end_self]}."
+            fused = fuse_edges(edges[cursor_self:end_self], moduli)
+            assert isinstance(item, int) or item == fused, f"Merged edge {item} must be the fusion {fused} of edges {edges[cursor_self:end_self]}."
+            new_arrow.append(arrow[cursor_self])
+            new_edges.append(fused)
+            groups.append((cursor_self, end_self, cursor_plan, cursor_plan + 1))
+            cursor_self = end_self
+            cursor_plan += 1
+        else:
+            # Splitting
+            end_plan = cursor_plan
+            plan_total = 1
+            while plan_total < _dimension(edges[cursor_self]):
+                assert end_plan < len(new_shape), f"New shape {new_shape} exceeds specified dimensions {len(new_shape)}."
+                split_edge = new_shape[end_plan]
+                assert not isinstance(split_edge, int), f"New shape must be a charged edge when splitting, got {split_edge}."
+                plan_total *= _dimension(split_edge)
+                end_plan += 1
+            split_edges = typing.cast(tuple[ChargedEdge, ...], new_shape[cursor_plan:end_plan])
+            assert fuse_edges(split_edges, moduli) == edges[cursor_self], f"Edge {edges[cursor_self]} must be the fusion of the split edges {split_edges}."
+            new_arrow.extend(arrow[cursor_self] for _ in split_edges)
+            new_edges.extend(split_edges)
+            groups.append((cursor_self, cursor_self + 1, cursor_plan, end_plan))
+            cursor_self += 1
+            cursor_plan = end_plan
+    return tuple(new_arrow), tuple(new_edges), tuple(groups)
+
+
+@dataclasses.dataclass
+class ChargedGrassmannTensor:
+    """
+    A block-sparse Grassmann tensor class, whose edges carry the charges of U(1) or Z2 symmetries, and which stores only the blocks conserving them.
+
+    Every charge is a tuple of integers, one per symmetry, where moduli is 0 for a U(1) symmetry and 2 for a Z2 symmetry.
+    The first symmetry counts the fermions, so the parity of a charge is the parity of its first component.
+    For example, moduli (0,) conserves the particle number, (0, 0) the particle number and twice Sz, and (2, 0) the parity and twice Sz.
+
+    Every edge is a tuple of segments (charge, dimension) with unique charges, which corresponds to the edge (even, odd) of a dense tensor,
+    where the even segments are placed before the odd segments, each in the given order.
+    The charges of the edges with arrow False count positively and those with arrow True count negatively,
+    and exactly the blocks with zero total charge are stored, so reverse negates the charges of the reversed edges.
+    Since the parity is constant inside every block, the signs are those of BlockGrassmannTensor, applied per block.
+    The dtype and the device are carried explicitly, since a tensor may have no block conserving the charges at all.
+    """
+
+    _arrow: tuple[bool, ...]
+    _edges: tuple[ChargedEdge, ...]
+    _moduli: tuple[int, ...]
+    _blocks: Block
+    _dtype: torch.dtype
+    _device: torch.device
+
+    @property
+    def arrow(self) -> tuple[bool, ...]:
+        """
+        The arrow of the tensor, represented as a tuple of booleans indicating the order of the fermion operators.
+        """
+        return self._arrow
+
+    @property
+    def edges(self) -> tuple[ChargedEdge, ...]:
+        """
+        The edges of the tensor, represented as a tuple of charged edges, each of which is a tuple of segments (charge, dimension).
+        """
+        return self._edges
+
+    @property
+    def moduli(self) -> tuple[int, ...]:
+        """
+        The moduli of the symmetries, 0 for a U(1) symmetry and 2 for a Z2 symmetry.
+        """
+        return self._moduli
+
+    @property
+    def blocks(self) -> Block:
+        """
+        The blocks of the tensor conserving the charges, keyed by the charge of each edge.
+        """
+        return self._blocks
+
+    @property
+    def dtype(self) -> torch.dtype:
+        """
+        The dtype of the blocks.
+        """
+        return self._dtype
+
+    @property
+    def device(self) -> torch.device:
+        """
+        The device of the blocks.
+        """
+        return self._device
+
+    @property
+    def parity_edges(self) -> tuple[tuple[int, int], ...]:
+        """
+        The edges of the corresponding dense tensor, represented as a tuple of pairs (even, odd).
+        """
+        return tuple(parity_edge(edge) for edge in self._edges)
+
+    @classmethod
+    def from_dense(cls, tensor: GrassmannTensor, edges: tuple[ChargedEdge, ...], moduli: tuple[int, ...]) -> ChargedGrassmannTensor:
+        """
+        Create a charged Grassmann tensor from a dense one with the given charged edges, dropping the elements not conserving the charges.
+        """
+        assert not tensor.batch_shape, f"Charged Grassmann tensors have no batch dimensions. Got batch shape {tuple(tensor.batch_shape)}."
+        parity_edges = tuple(parity_edge(edge) for edge in edges)
+        assert parity_edges == tensor.edges, f"Charged edges with parts {parity_edges} must match the edges of the tensor {tensor.edges}."
+        return cls(
+            _arrow=tensor.arrow,
+            _edges=edges,
+            _moduli=moduli,
+            _blocks={key: tensor.tensor[_slices(edges, key)].clone() for key in _sectors(tensor.arrow, edges, moduli)},
+            _dtype=tensor.tensor.dtype,
+            _device=tensor.tensor.device,
+        )
+
+    def to_dense(self) -> GrassmannTensor:
+        """
+        Convert the charged Grassmann tensor to a dense one, filling the elements not conserving the charges with zeros.
+        The dense layout of a merged edge follows its charged segments, which differs from the merged edge of `GrassmannTensor.reshape` as described by fusion_order.
+        """
+        tensor = self._zeros(tuple(_dimension(edge) for edge in self._edges))
+        for key, block in self._blocks.items():
+            tensor[_slices(self._edges, key)] = block
+        return GrassmannTensor(_arrow=self._arrow, _edges=self.parity_edges, _tensor=tensor)
+
+    def permute(self, before_by_after: tuple[int, ...]) -> ChargedGrassmannTensor:
+        """
+        Permute the indices of the Grassmann tensor.
+        """
+        assert len(before_by_after) == len(set(before_by_after)), "Permutation indices must be unique."
+        assert set(before_by_after) == set(range(len(self._edges))), "Permutation indices must cover all dimensions."
+
+        pairs = tuple((i, j) for j in range(len(before_by_after)) for i in range(0, j) if before_by_after[i] > before_by_after[j])
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            new_key = tuple(key[i] for i in before_by_after)
+            blocks[new_key] = self._signed(block.permute(before_by_after), sum(_parity(new_key[i]) and _parity(new_key[j]) for i, j in pairs) % 2 == 1)
+
+        return dataclasses.replace(
+            self,
+            _arrow=tuple(self._arrow[i] for i in before_by_after),
+            _edges=tuple(self._edges[i] for i in before_by_after),
+            _blocks=blocks,
+        )
+
+    def reverse(self, indices: tuple[int, ...]) -> ChargedGrassmannTensor:
+        """
+        Reverse the specified indices of the Grassmann tensor, negating their charges, so the total charge of every block stays zero.
+        See `BlockGrassmannTensor.reverse` for the sign.
+        """
+        assert len(set(indices)) == len(indices), f"Indices must be unique. Got {indices}."
+        assert all(0 <= i < len(self._edges) for i in indices), f"Indices must be within tensor dimensions. Got {indices}."
+
+        singles = tuple(index for index in indices if self._arrow[index])
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            new_key = tuple(_canonical(tuple(-value for value in charge), self._moduli) if i in indices else charge for i, charge in enumerate(key))
+            blocks[new_key] = self._signed(block, sum(_parity(key[i]) for i in singles) % 2 == 1)
+
+        return dataclasses.replace(
+            self,
+            _arrow=tuple(self._arrow[i] ^ (i in indices) for i in range(len(self._edges))),
+            _edges=tuple(_negated(edge, self._moduli) if i in indices else edge for i, edge in enumerate(self._edges)),
+            _blocks=blocks,
+        )
+
+    def reshape(self, new_shape: tuple[int | ChargedEdge, ...]) -> ChargedGrassmannTensor:
+        """
+        Reshape the charged Grassmann tensor, which may split or merge edges.
+
+        Every item of the new shape is -1 to keep an edge, an integer or a charged edge to merge edges, or charged edges to split an edge.
+        The merged edge is given by fuse_edges, so an edge could only be split into edges whose fusion is that edge.
+        Every block of the finest edges is copied by slices, without gathering any element, and the signs are those of `GrassmannTensor.reshape`.
+        So the merged edge orders its elements by charge, which permutes them inside each parity compared with `GrassmannTensor.reshape`:
+        the dense tensor of the result equals the dense reshape indexed by fusion_order along the merged edge,
+        while splitting back and contracting over merged edges agree with the dense tensors regardless of the order.
+        """
+        # pylint: disable=too-many-locals
+        arrow, edges, groups = _parse_reshape(self._arrow, self._edges, self._moduli, new_shape)
+        # The finest edges of each group, which are the old edges for merging and the new edges for splitting.
+        fine_edges = tuple(edges[begin_plan:end_plan] if end_plan - begin_plan != 1 else self._edges[begin_self:end_self] for begin_self, end_self, begin_plan, end_plan in groups)
+        fusions = tuple(_fusion(group_edges, self._moduli)[1] if len(group_edges) != 1 else None for group_edges in fine_edges)
+        fine_arrow = tuple(self._arrow[begin_self] for (begin_self, _, _, _), group_edges in zip(groups, fine_edges) for _ in group_edges)
+        merging = any(end_self - begin_self != 1 for begin_self, end_self, _, _ in groups)
+
+        blocks: Block = {key: self._zeros(_shape(edges, key)) for key in _sectors(arrow, edges, self._moduli)} if merging else {}
+        for fine_key in _sectors(fine_arrow, tuple(itertools.chain.from_iterable(fine_edges)), self._moduli):
+            old_key: list[Charge] = []
+            new_key: list[Charge] = []
+            old_slices: list[slice] = []
+            new_slices: list[slice] = []
+            fine_shape: list[int] = []
+            sign = False
+            cursor = 0
+            for (begin_self, end_self, _, _), group_edges, fusion in zip(groups, fine_edges, fusions):
+                sub_key = fine_key[cursor:cursor + len(group_edges)]
+                cursor += len(group_edges)
+                sub_shape = _shape(group_edges, sub_key)
+                fine_shape.extend(sub_shape)
+                if fusion is None:
+                    old_key.extend(sub_key)
+                    new_key.extend(sub_key)
+                    old_slices.append(slice(None))
+                    new_slices.append(slice(None))
+                    continue
+                charge, offset = fusion[sub_key]
+                window = slice(offset, offset + math.prod(sub_shape))
+                if end_self - begin_self != 1:
+                    old_key.extend(sub_key)
+                    old_slices.extend(slice(None) for _ in sub_key)
+                    new_key.append(charge)
+                    new_slices.append(window)
+                else:
+                    old_key.append(charge)
+                    old_slices.append(window)
+                    new_key.extend(sub_key)
+                    new_slices.extend(slice(None) for _ in sub_key)
+                if self._arrow[begin_self]:
+                    count = sum(_parity(sub_charge) for sub_charge in sub_key)
+                    sign ^= bool(count * (count - 1) & 2)
+
+            block = self._signed(self._blocks[tuple(old_key)][tuple(old_slices)].reshape(fine_shape), sign)
+            if merging:
+                target = blocks[tuple(new_key)][tuple(new_slices)]
+                target.copy_(block.reshape(target.shape))
+            else:
+                blocks[tuple(new_key)] = block
+
+        return dataclasses.replace(self, _arrow=arrow, _edges=edges, _blocks=blocks)
+
+    def matmul(self, other: ChargedGrassmannTensor) -> ChargedGrassmannTensor:
+        """
+        Perform matrix multiplication with another charged Grassmann tensor, where both of them should be rank 2 tensors with the same moduli.
+
+        Like `BlockGrassmannTensor.matmul`, the contracted edge is reversed to arrow True in this tensor and to arrow False in the other one,
+        which negates its charges, and then the contracted edges must match.
+        Every charge of the contracted edge gives a single product of two blocks, and the products run concurrently
+        if more than one block thread is set by set_block_threads.
+        """
+        assert len(self._edges) == 2 and len(other.edges) == 2, f"Both tensors must be rank 2. Got {len(self._edges)} and {len(other.edges)}."
+        assert self._moduli == other.moduli, f"Moduli must match. Got {self._moduli} and {other.moduli}."
+
+        # The creation operator order from arrow is (False True)
+        # So (x, True) * (False, y) = (x, y)
+        tensor_a = self if self._arrow[1] else self.reverse((1,))
+        tensor_b = other if not other.arrow[0] else other.reverse((0,))
+        assert tensor_a.edges[1] == tensor_b.edges[0], f"Contracted edges must match. Got {tensor_a.edges[1]} and {tensor_b.edges[0]}."
+        arrow = (tensor_a.arrow[0], tensor_b.arrow[1])
+        edges = (tensor_a.edges[0], tensor_b.edges[1])
+
+        # The charge of the row fixes the charge of the contracted edge, so every result block is a single product.
+        pairs = [((key_a[0], key_b[1]), block_a, block_b) for key_a, block_a in tensor_a.blocks.items() for key_b, block_b in tensor_b.blocks.items() if key_a[1] == key_b[0]]
+        products = run_blocks([(block_a.numel() * block_b.size(-1), functools.partial(torch.matmul, block_a, block_b)) for _, block_a, block_b in pairs])
+        blocks: Block = {key: product for (key, _, _), product in zip(pairs, products)}
+        for key in _sectors(arrow, edges, self._moduli):
+            if key not in blocks:
+                blocks[key] = self._zeros(_shape(edges, key))
+
+        return dataclasses.replace(self, _arrow=arrow, _edges=edges, _blocks=blocks)
+
+    def __post_init__(self) -> None:
+        assert len(self._arrow) == len(self._edges), f"Arrow length ({len(self._arrow)}) must match edges length ({len(self._edges)})."
+        assert self._moduli and self._moduli[0] in (0, 2), f"The first symmetry must be U(1) or Z2 to count the fermions. Got moduli {self._moduli}."
+        assert all(modulus >= 0 for modulus in self._moduli), f"Moduli must be non-negative. Got {self._moduli}."
+        for edge in self._edges:
+            charges = [charge for charge, _ in edge]
+            assert len(set(charges)) == len(charges), f"Charges of an edge must be unique. Got {charges}."
+            for charge, dim in edge:
+                assert len(charge) == len(self._moduli), f"Charge {charge} must have one value per symmetry of moduli {self._moduli}."
+                assert charge == _canonical(charge, self._moduli), f"Charge {charge} must be reduced by moduli {self._moduli}."
+                assert dim > 0, f"Dimension of charge {charge} must be positive. Got {dim}."
+        keys = _sectors(self._arrow, self._edges, self._moduli)
+        assert set(self._blocks) == set(keys), f"Blocks must cover exactly the sectors conserving the charges. Got {tuple(self._blocks)}."
+        for key, block in self._blocks.items():
+            assert tuple(block.shape) == _shape(self._edges, key), f"Block {key} has shape {tuple(block.shape)} but edges require {_shape(self._edges, key)}."
+            assert block.dtype == self._dtype, f"Block {key} has dtype {block.dtype} but the tensor has dtype {self._dtype}."
+
+    def _zeros(self, shape: tuple[int, ...]) -> torch.Tensor:
+        # A zero block of the dtype and the device of the tensor, which exist even if no block conserves the charges.
+        return torch.zeros(shape, dtype=self._dtype, device=self._device)
+
+    def _replaced(self, blocks: Block) -> ChargedGrassmannTensor:
+        # Replace the blocks, whose dtype may be promoted by arithmetic, keeping the dtype if there is no block.
+        dtype = next(iter(blocks.values())).dtype if blocks else self._dtype
+        return dataclasses.replace(self, _blocks=blocks, _dtype=dtype)
+
+    def _signed(self, block: torch.Tensor, sign: bool) -> torch.Tensor:
+        return -block if sign else block
+
+    def _binary(self, other: typing.Any, function: typing.Callable[[typing.Any, typing.Any], typing.Any], reflected: bool = False) -> ChargedGrassmannTensor:
+        if isinstance(other, ChargedGrassmannTensor):
+            assert self._arrow == other.arrow, f"Arrows must match for arithmetic operations. Got {self._arrow} and {other.arrow}."
+            assert self._edges == other.edges, f"Edges must match for arithmetic operations. Got {self._edges} and {other.edges}."
+            assert self._moduli == other.moduli, f"Moduli must match for arithmetic operations. Got {self._moduli} and {other.moduli}."
+            return self._replaced({key: function(block, other.blocks[key]) for key, block in self._blocks.items()})
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            try:
+                result = function(other, block) if reflected else function(block, other)
+            except TypeError:
+                return NotImplemented
+            if not isinstance(result, torch.Tensor):
+                return NotImplemented
+            blocks[key] = result
+        return self._replaced(blocks)
+
+    def _inplace(self, other: typing.Any, function: typing.Callable[[typing.Any, typing.Any], typing.Any]) -> ChargedGrassmannTensor:
+        # Blocks may share memory with other tensors, for example after permute, so they are replaced instead of being updated in place.
+        result = self._binary(other, function)
+        if result is NotImplemented:
+            return NotImplemented
+        self._blocks, self._dtype = result.blocks, result.dtype
+        return self
+
+    def __pos__(self) -> ChargedGrassmannTensor:
+        return dataclasses.replace(self, _blocks={key: +block for key, block in self._blocks.items()})
+
+    def __neg__(self) -> ChargedGrassmannTensor:
+        return dataclasses.replace(self, _blocks={key: -block for key, block in self._blocks.items()})
+
+    def __add__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.add)
+
+    def __radd__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.add, reflected=True)
+
+    def __iadd__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._inplace(other, operator.add)
+
+    def __sub__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.sub)
+
+    def __rsub__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.sub, reflected=True)
+
+    def __isub__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._inplace(other, operator.sub)
+
+    def __mul__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.mul)
+
+    def __rmul__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.mul, reflected=True)
+
+    def __imul__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._inplace(other, operator.mul)
+
+    def __truediv__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.truediv)
+
+    def __rtruediv__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._binary(other, operator.truediv, reflected=True)
+
+    def __itruediv__(self, other: typing.Any) -> ChargedGrassmannTensor:
+        return self._inplace(other, operator.truediv)
+
+    def clone(self) -> ChargedGrassmannTensor:
+        """
+        Create a deep copy of the Grassmann tensor.
+        """
+        return dataclasses.replace(self, _blocks={key: block.clone() for key, block in self._blocks.items()})
@@ -0,0 +1,256 @@
+"""
+Grassmann tensors sharded by sector blocks over the ranks of a torch.distributed process group.
+"""
+
+from __future__ import annotations
+
+__all__ = ["ShardedGrassmannTensor", "assign_owners"]
+
+import dataclasses
+import math
+import typing
+import torch
+import torch.distributed as dist
+from .block_tensor import Block, BlockGrassmannTensor, reshape_blocks, reshape_sources
+from .structure import sectors, sector_shape
+from .tensor import GrassmannTensor
+
+Key = tuple[bool, ...]
+
+
+def assign_owners(sizes: dict[Key, int], world_size: int) -> dict[Key, int]:
+    """
+    Assign every block to a rank, from the largest block to the smallest, each to the rank with the fewest elements so far.
+    The assignment is deterministic, so every rank computes the same owners without communication.
+    """
+    loads = [0] * world_size
+    owners: dict[Key, int] = {}
+    for key in sorted(sizes, key=lambda key: (-sizes[key], key)):
+        rank = min(range(world_size), key=lambda rank: loads[rank])
+        owners[key] = rank
+        loads[rank] += sizes[key]
+    return owners
+
+
+@dataclasses.dataclass
+class ShardedGrassmannTensor:
+    """
+    A Grassmann tensor distributed over the ranks of a process group, where every sector block allowed by parity is owned by a single rank.
+    Every rank holds the same arrow, edges and owners, and only the blocks it owns.
+
+    permute and reverse act on the local blocks without any communication.
+    matmul and reshape send a block from its owner only to the ranks building a result block from it,
+    where every result block is owned by the rank already holding most of the elements it is built from.
+    All methods except the properties are collective, so they must be called by every rank of the group in the same order.
+    """
+
+    _arrow: tuple[bool, ...]
+    _edges: tuple[tuple[int, int], ...]
+    _owners: dict[Key, int]
+    _blocks: Block
+    _dtype: torch.dtype
+    _device: torch.device
+    _group: typing.Any = None
+
+    @property
+    def arrow(self) -> tuple[bool, ...]:
+        """
+        The arrow of the tensor, represented as a tuple of booleans indicating the order of the fermion operators.
+        """
+        return self._arrow
+
+    @property
+    def edges(self) -> tuple[tuple[int, int], ...]:
+        """
+        The edges of the tensor, represented as a tuple of pairs (even, odd).
+        """
+        return self._edges
+
+    @property
+    def owners(self) -> dict[Key, int]:
+        """
+        The rank in the group owning every sector block, keyed by the parity of each edge.
+        """
+        return self._owners
+
+    @property
+    def blocks(self) -> Block:
+        """
+        The sector blocks owned by the current rank.
+        """
+        return self._blocks
+
+    @classmethod
+    def from_blocks(cls, tensor: BlockGrassmannTensor, group: typing.Any = None) -> ShardedGrassmannTensor:
+        """
+        Shard a block-sparse Grassmann tensor, which every rank of the group passes in the same structure, keeping only the blocks owned by the current rank.
+        The blocks not owned are never touched, so a tensor loaded by load_blocks with mmap is read by every rank only for its own blocks.
+        """
+        reference = next(iter(tensor.blocks.values()))
+        owners = assign_owners({key: math.prod(sector_shape(tensor.edges, key)) for key in tensor.blocks}, dist.get_world_size(group))
+        rank = dist.get_rank(group)
+        blocks = {key: block.to(reference.device) for key, block in tensor.blocks.items() if owners[key] == rank}
+        return cls(tensor.arrow, tensor.edges, owners, blocks, reference.dtype, reference.device, group)
+
+    @classmethod
+    def from_dense(cls, tensor: GrassmannTensor, group: typing.Any = None) -> ShardedGrassmannTensor:
+        """
+        Shard a dense Grassmann tensor, which every rank of the group passes with the same data.
+        """
+        return cls.from_blocks(BlockGrassmannTensor.from_dense(tensor), group)
+
+    def gather(self) -> BlockGrassmannTensor:
+        """
+        Gather all sector blocks to every rank of the group as a block-sparse Grassmann tensor.
+        """
+        rank = dist.get_rank(self._group)
+        blocks: Block = {}
+        for key in sectors(len(self._edges)):
+            owner = self._owners[key]
+            if owner == rank:
+                block = self._blocks[key].contiguous()
+            else:
+                block = torch.empty(sector_shape(self._edges, key), dtype=self._dtype, device=self._device)
+            if block.numel() != 0:
+                dist.broadcast(block, src=self._global_rank(owner), group=self._group)
+            blocks[key] = block
+        return BlockGrassmannTensor(_arrow=self._arrow, _edges=self._edges, _blocks=blocks)
+
+    def to_dense(self) -> GrassmannTensor:
+        """
+        Gather all sector blocks to every rank of the group as a dense Grassmann tensor.
+        """
+        return self.gather().to_dense()
+
+    def permute(self, before_by_after: tuple[int, ...]) -> ShardedGrassmannTensor:
+        """
+        Permute the indices of the Grassmann tensor, where every rank permutes its own blocks.
+        """
+        assert len(before_by_after) == len(set(before_by_after)), "Permutation indices must be unique."
+        assert set(before_by_after) == set(range(len(self._edges))), "Permutation indices must cover all dimensions."
+
+        pairs = tuple((i, j) for j in range(len(before_by_after)) for i in range(0, j) if before_by_after[i] > before_by_after[j])
+        blocks: Block = {}
+        for key, block in self._blocks.items():
+            new_key = tuple(key[i] for i in before_by_after)
+            block = block.permute(before_by_after)
+            blocks[new_key] = -block if sum(new_key[i] and new_key[j] for i, j in pairs) % 2 == 1 else block
+
+        return dataclasses.replace(
+            self,
+            _arrow=tuple(self._arrow[i] for i in before_by_after),
+            _edges=tuple(self._edges[i] for i in before_by_after),
+            _owners={
+                tuple(key[i] for i in before_by_after): owner for key, owner in self._owners.items()
+            },
+            _blocks=blocks,
+        )
+
+    def reverse(self, indices: tuple[int, ...]) -> ShardedGrassmannTensor:
+        """
+        Reverse the specified indices of the Grassmann tensor, where every rank reverses its own blocks.
+        See `GrassmannTensor.reverse` for the sign.
+        """
+        assert len(set(indices)) == len(indices), f"Indices must be unique. Got {indices}."
+        assert all(0 <= i < len(self._edges) for i in indices), f"Indices must be within tensor dimensions. Got {indices}."
+
+        singles = tuple(index for index in indices if self._arrow[index])
+        return dataclasses.replace(
+            self,
+            _arrow=tuple(self._arrow[i] ^ (i in indices) for i in range(len(self._edges))),
+            _blocks={
+                key: -block if sum(key[i] for i in singles) % 2 == 1 else block for key, block in self._blocks.items()
+            },
+        )
+
+    def reshape(self, new_shape: tuple[int | tuple[int, int], ...]) -> ShardedGrassmannTensor:
+        """
+        Reshape the Grassmann tensor, which may split or merge edges. See `GrassmannTensor.reshape` for the format of the new shape.
+
+        Every new block is owned by the rank holding most of the elements of the old blocks it is built from,
+        and only the other old blocks are sent to it.
+        """
+        world_size = dist.get_world_size(self._group)
+        sources = reshape_sources(self._arrow, self._edges, new_shape)
+        owners: dict[Key, int] = {}
+        for new_key, old_keys in sources.items():
+            volumes = [0] * world_size
+            for old_key in old_keys:
+                volumes[self._owners[old_key]] += self._size(old_key)
+            owners[new_key] = max(range(world_size), key=volumes.__getitem__)
+
+        received = self._exchange(sorted({(old_key, owners[new_key]) for new_key, old_keys in sources.items() for old_key in old_keys}))
+        rank = dist.get_rank(self._group)
+        arrow, edges, blocks = reshape_blocks(self._arrow, self._edges, {**self._blocks, **received}, new_shape, {key for key, owner in owners.items() if owner == rank})
+        return dataclasses.replace(self, _arrow=arrow, _edges=edges, _owners=owners, _blocks=blocks)
+
+    def matmul(self, other: ShardedGrassmannTensor) -> ShardedGrassmannTensor:
+        """
+        Perform matrix multiplication with another sharded Grassmann tensor in the same group, where both of them should be rank 2 tensors.
+
+        The product of the (even, even) or the (odd, odd) blocks is computed by the owner of the larger one of the two blocks,
+        and only the smaller one is sent to it if they are owned by different ranks.
+        """
+        assert len(self._edges) == 2 and len(other.edges) == 2, f"Both tensors must be rank 2. Got {len(self._edges)} and {len(other.edges)}."
+        assert self._edges[-1] == other.edges[-2], f"Contracted edges must match. Got {self._edges[-1]} and {other.edges[-2]}."
+
+        # The creation operator order from arrow is (False True)
+        # So (x, True) * (False, y) = (x, y)
+        tensor_a = self if self._arrow[-1] else self.reverse((1,))
+        tensor_b = other if not other.arrow[-2] else other.reverse((0,))
+
+        owners: dict[Key, int] = {}
+        for parity in (False, True):
+            key: Key = (parity, parity)
+            larger_a = tensor_a._size(key) >= tensor_b._size(key)  # pylint: disable=protected-access
+            owners[key] = tensor_a.owners[key] if larger_a else tensor_b.owners[key]
+        received_a = tensor_a._exchange(list(owners.items()))  # pylint: disable=protected-access
+        received_b = tensor_b._exchange(list(owners.items()))  # pylint: disable=protected-access
+
+        rank = dist.get_rank(self._group)
+        blocks: Block = {}
+        for key, owner in owners.items():
+            if owner == rank:
+                block_a = tensor_a.blocks[key] if key in tensor_a.blocks else received_a[key]
+                block_b = tensor_b.blocks[key] if key in tensor_b.blocks else received_b[key]
+                blocks[key] = torch.matmul(block_a, block_b)
+
+        return dataclasses.replace(
+            self,
+            _arrow=(tensor_a.arrow[0], tensor_b.arrow[1]),
+            _edges=(tensor_a.edges[0], tensor_b.edges[1]),
+            _owners=owners,
+            _blocks=blocks,
+        )
+
+    def _size(self, key: Key) -> int:
+        return math.prod(sector_shape(self._edges, key))
+
+    def _global_rank(self, rank: int) -> int:
+        return rank if self._group is None else dist.get_global_rank(self._group, rank)
+
+    def _exchange(self, transfers: typing.Sequence[tuple[Key, int]]) -> Block:
+        # Send every block in transfers from its owner to the given rank, returning the blocks received by the current rank.
+        # Every rank passes the same transfers, and the index of a transfer is its tag, so the messages between two ranks are matched.
+        rank = dist.get_rank(self._group)
+        received: Block = {}
+        sending: list[torch.Tensor] = []
+        requests = []
+        for tag, (key, destination) in enumerate(transfers):
+            source = self._owners[key]
+            if source == destination or rank not in (source, destination):
+                continue
+            if rank == source:
+                if self._size(key) != 0:
+                    # The contiguous copy must be kept alive until the send completes.
+                    sending.append(self._blocks[key].contiguous())
+                    requests.append(dist.isend(sending[-1], self._global_rank(destination), group=self._group, tag=tag))
+            else:
+                block = torch.empty(sector_shape(self._edges, key), dtype=self._dtype, device=self._device)
+                if block.numel() != 0:
+                    requests.append(dist.irecv(block, self._global_rank(source), group=self._group, tag=tag))
+                received[key] = block
+        for request in requests:
+            if request is not None:
+                request.wait()
+        return received
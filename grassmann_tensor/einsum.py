@@ -0,0 +1,168 @@
+"""
+Multi-operand contraction of Grassmann tensors along an optimized contraction path.
+"""
+
+from __future__ import annotations
+
+__all__ = ["einsum", "contraction_path", "contract_pair"]
+
+import itertools
+import typing
+from .metrics import measured
+from .structure import merged_edge
+from .tensor import GrassmannTensor
+
+Path = list[tuple[int, int]]
+Tree = typing.Union[int, tuple["Tree", "Tree"]]
+
+
+def _parse(subscripts: str, operands: tuple[GrassmannTensor, ...]) -> tuple[list[str], str, dict[str, tuple[int, int]]]:
+    subscripts = subscripts.replace(" ", "")
+    if "->" in subscripts:
+        inputs, output = subscripts.split("->")
+    else:
+        inputs, output = subscripts, ""
+    labels = inputs.split(",")
+    if "->" not in subscripts:
+        output = "".join(sorted(label for label in set(inputs) if inputs.count(label) == 1 and label != ","))
+    assert len(labels) == len(operands), f"Number of subscripts ({len(labels)}) must match number of operands ({len(operands)})."
+
+    edges: dict[str, tuple[int, int]] = {}
+    arrows: dict[str, list[bool]] = {}
+    for operand_labels, operand in zip(labels, operands):
+        assert len(operand_labels) == len(operand.edges), f"Subscripts {operand_labels} must match tensor dimensions ({len(operand.edges)})."
+        assert len(set(operand_labels)) == len(operand_labels), f"Repeated subscripts inside one operand are not supported. Got {operand_labels}."
+        for label, edge, arrow in zip(operand_labels, operand.edges, operand.arrow):
+            assert edges.setdefault(label, edge) == edge, f"Edges of subscript {label} must match. Got {edges[label]} and {edge}."
+            arrows.setdefault(label, []).append(arrow)
+    for label in edges:
+        count = len(arrows[label])
+        assert count <= 2, f"Subscript {label} appears in more than two operands."
+        # Reversing one of two connected edges with the same arrow is a convention, which would make the result depend on the path.
+        assert count == 1 or arrows[label][0] != arrows[label][1], f"Edges of subscript {label} must have opposite arrows."
+        assert (label in output) == (count == 1), f"Subscript {label} must appear in the output if and only if it appears in only one operand."
+    assert len(set(output)) == len(output) and set(output) <= set(edges), f"Output subscripts {output} must be unique and appear in the operands."
+    return labels, output, edges
+
+
+def _size(labels: typing.Iterable[str], edges: dict[str, tuple[int, int]]) -> int:
+    # The number of elements allowed by parity, which is the size of the even part of all edges merged.
+    return merged_edge(tuple(edges[label] for label in labels))[0]
+
+
+def _greedy(labels: list[str], edges: dict[str, tuple[int, int]]) -> Path:
+    current = [frozenset(operand_labels) for operand_labels in labels]
+    path: Path = []
+    while len(current) > 1:
+        candidates = [(i, j) for i, j in itertools.combinations(range(len(current)), 2) if current[i] & current[j]]
+        if not candidates:
+            candidates = list(itertools.combinations(range(len(current)), 2))
+        i, j = min(candidates, key=lambda pair: (_size(current[pair[0]] | current[pair[1]], edges), _size(current[pair[0]] ^ current[pair[1]], edges)))
+        result = current[i] ^ current[j]
+        current.pop(j)
+        current.pop(i)
+        current.append(result)
+        path.append((i, j))
+    return path
+
+
+def _optimal(labels: list[str], edges: dict[str, tuple[int, int]]) -> Path:
+    count = len(labels)
+    open_labels: dict[int, frozenset[str]] = {}
+    best: dict[int, tuple[int, Tree]] = {}
+    for i, operand_labels in enumerate(labels):
+        open_labels[1 << i] = frozenset(operand_labels)
+        best[1 << i] = (0, i)
+    for subset in range(1, 1 << count):
+        if subset in best:
+            continue
+        candidates: list[tuple[int, Tree]] = []
+        # Enumerate every split of the subset into two non-empty parts once, by requiring the lowest operand to be in the left part.
+        lowest = subset & -subset
+        left = (subset - 1) & subset
+        while left:
+            right = subset ^ left
+            if left & lowest and right:
+                cost = best[left][0] + best[right][0] + _size(open_labels[left] | open_labels[right], edges)
+                candidates.append((cost, (best[left][1], best[right][1])))
+                open_labels[subset] = open_labels[left] ^ open_labels[right]
+            left = (left - 1) & subset
+        best[subset] = min(candidates, key=lambda candidate: candidate[0])
+    return _tree_to_path(best[(1 << count) - 1][1], count)
+
+
+def _tree_to_path(tree: Tree, count: int) -> Path:
+    current = list(range(count))
+    identity = itertools.count(count)
+    path: Path = []
+
+    def visit(node: Tree) -> int:
+        if isinstance(node, int):
+            return node
+        left = visit(node[0])
+        right = visit(node[1])
+        i, j = sorted((current.index(left), current.index(right)))
+        current.pop(j)
+        current.pop(i)
+        result = next(identity)
+        current.append(result)
+        path.append((i, j))
+        return result
+
+    visit(tree)
+    return path
+
+
+def contraction_path(subscripts: str, *operands: GrassmannTensor, optimize: typing.Literal["greedy", "optimal"] = "greedy") -> Path:
+    """
+    Find a pairwise contraction path for einsum, weighting every contraction by the number of elements allowed by parity.
+
+    The path is a list of pairs of positions in the current list of operands,
+    where the two operands are removed and their contraction is appended to the end of the list.
+    The greedy search picks the cheapest contraction at every step, while the optimal search tries every contraction tree,
+    which is exponential in the number of operands.
+    """
+    labels, _, edges = _parse(subscripts, operands)
+    match optimize:
+        case "greedy":
+            return _greedy(labels, edges)
+        case "optimal":
+            return _optimal(labels, edges)
+        case _:
+            raise ValueError(f"Unknown optimization method {optimize}.")
+
+
+def contract_pair(tensor_a: GrassmannTensor, labels_a: str, tensor_b: GrassmannTensor, labels_b: str) -> tuple[GrassmannTensor, str]:
+    """
+    Contract two labelled Grassmann tensors over their shared labels by GrassmannTensor.tensordot,
+    returning the result with its labels, which are the free labels of the first tensor followed by those of the second.
+    """
+    shared = [label for label in labels_a if label in labels_b]
+    tensor = tensor_a.tensordot(tensor_b, (tuple(labels_a.index(label) for label in shared), tuple(labels_b.index(label) for label in shared)))
+    return tensor, "".join(label for label in labels_a if label not in shared) + "".join(label for label in labels_b if label not in shared)
+
+
+@measured("einsum")
+def einsum(subscripts: str, *operands: GrassmannTensor, optimize: typing.Literal["greedy", "optimal"] | Path = "greedy") -> GrassmannTensor:
+    """
+    Contract several Grassmann tensors according to the subscripts, such as "ij,jk,kl->il".
+
+    Every subscript must appear either in two operands, which are contracted, or in one operand and the output.
+    The two edges of a contracted subscript must have opposite arrows.
+    Without "->", the output contains the subscripts appearing once in alphabetical order.
+    The contraction path is found by contraction_path, unless it is given explicitly.
+    Every pairwise contraction is done by GrassmannTensor.tensordot, which tracks the fermionic signs,
+    and since all the operands have even parity, the result does not depend on the contraction path.
+    """
+    labels, output, _ = _parse(subscripts, operands)
+    path = optimize if isinstance(optimize, list) else contraction_path(subscripts, *operands, optimize=optimize)
+
+    current = list(zip(operands, labels))
+    for i, j in path:
+        tensor_b, labels_b = current.pop(j)
+        tensor_a, labels_a = current.pop(i)
+        current.append(contract_pair(tensor_a, labels_a, tensor_b, labels_b))
+    assert len(current) == 1, f"The contraction path must contract all {len(operands)} operands into one."
+
+    tensor, result_labels = current[0]
+    return tensor.permute(tuple(result_labels.index(label) for label in output))
@@ -0,0 +1,114 @@
+"""
+Decompositions of Grassmann matrices, done independently in their even and odd blocks.
+"""
+
+from __future__ import annotations
+
+__all__ = ["svd", "qr", "eigh"]
+
+import torch
+from .metrics import measured
+from .tensor import GrassmannTensor
+
+
+def _blocks(tensor: GrassmannTensor) -> tuple[torch.Tensor, torch.Tensor]:
+    # A Grassmann matrix with even parity only has its (even, even) and (odd, odd) blocks allowed.
+    assert len(tensor.edges) == 2, f"Decompositions need a rank 2 Grassmann tensor, merge edges with reshape first. Got rank {len(tensor.edges)}."
+    assert not tensor.batch_shape, f"Decompositions do not support batch dimensions. Got batch shape {tuple(tensor.batch_shape)}."
+    (even_row, _), (even_column, _) = tensor.edges
+    data = tensor.tensor
+    return data[:even_row, :even_column], data[even_row:, even_column:]
+
+
+def _block_diagonal(even: torch.Tensor, odd: torch.Tensor) -> torch.Tensor:
+    tensor = even.new_zeros([even.shape[0] + odd.shape[0], even.shape[1] + odd.shape[1]])
+    tensor[:even.shape[0], :even.shape[1]] = even
+    tensor[even.shape[0]:, even.shape[1]:] = odd
+    return tensor
+
+
+def _truncate(even: torch.Tensor, odd: torch.Tensor, rank: int | None, cutoff: float | None) -> tuple[int, int]:
+    # Both values are sorted in descending order, so the kept values are a prefix in each sector.
+    values = torch.cat([even, odd])
+    keep = torch.ones_like(values, dtype=torch.bool)
+    if cutoff is not None:
+        keep &= values > cutoff
+    if rank is not None:
+        keep[torch.argsort(values, descending=True, stable=True)[rank:]] = False
+    return int(keep[:even.shape[0]].sum()), int(keep[even.shape[0]:].sum())
+
+
+@measured("svd")
+def svd(tensor: GrassmannTensor, *, rank: int | None = None, cutoff: float | None = None) -> tuple[GrassmannTensor, GrassmannTensor, GrassmannTensor]:
+    """
+    Compute the singular value decomposition of a Grassmann matrix, returning U, S and Vh with tensor = U.matmul(S).matmul(Vh).
+
+    The even and odd blocks are decomposed independently, and the singular values of both sectors are truncated together,
+    keeping at most rank of the largest ones and dropping the ones not larger than cutoff.
+    The new edge is (number of kept even values, number of kept odd values).
+    U has arrow (tensor.arrow[0], True), S is diagonal with arrow (False, True), and Vh has arrow (False, tensor.arrow[1]).
+    """
+    # pylint: disable=too-many-locals
+    block_even, block_odd = _blocks(tensor)
+    u_even, s_even, vh_even = torch.linalg.svd(block_even, full_matrices=False)
+    u_odd, s_odd, vh_odd = torch.linalg.svd(block_odd, full_matrices=False)
+    even, odd = _truncate(s_even, s_odd, rank, cutoff)
+
+    bond = (even, odd)
+    u = _block_diagonal(u_even[:, :even], u_odd[:, :odd])
+    s = torch.diag(torch.cat([s_even[:even], s_odd[:odd]])).to(dtype=u.dtype)
+    vh = _block_diagonal(vh_even[:even, :], vh_odd[:odd, :])
+    return (
+        GrassmannTensor(_arrow=(tensor.arrow[0], True), _edges=(tensor.edges[0], bond), _tensor=u),
+        GrassmannTensor(_arrow=(False, True), _edges=(bond, bond), _tensor=s),
+        GrassmannTensor(_arrow=(False, tensor.arrow[1]), _edges=(bond, tensor.edges[1]), _tensor=vh),
+    )
+
+
+@measured("qr")
+def qr(tensor: GrassmannTensor) -> tuple[GrassmannTensor, GrassmannTensor]:
+    """
+    Compute the reduced QR decomposition of a Grassmann matrix, returning Q and R with tensor = Q.matmul(R).
+
+    The even and odd blocks are decomposed independently.
+    Q has arrow (tensor.arrow[0], True), and R has arrow (False, tensor.arrow[1]).
+    """
+    block_even, block_odd = _blocks(tensor)
+    q_even, r_even = torch.linalg.qr(block_even)
+    q_odd, r_odd = torch.linalg.qr(block_odd)
+
+    bond = (q_even.shape[1], q_odd.shape[1])
+    return (
+        GrassmannTensor(_arrow=(tensor.arrow[0], True), _edges=(tensor.edges[0], bond), _tensor=_block_diagonal(q_even, q_odd)),
+        GrassmannTensor(_arrow=(False, tensor.arrow[1]), _edges=(bond, tensor.edges[1]), _tensor=_block_diagonal(r_even, r_odd)),
+    )
+
+
+@measured("eigh")
+def eigh(tensor: GrassmannTensor, *, rank: int | None = None, cutoff: float | None = None) -> tuple[GrassmannTensor, GrassmannTensor]:
+    """
+    Compute the eigenvalue decomposition of a Hermitian Grassmann matrix, returning the eigenvalues W and the eigenvectors V,
+    with tensor = V.matmul(W).matmul(Vh), where Vh has arrow (False, tensor.arrow[1]) and the conjugate transpose of V as its data.
+
+    The even and odd blocks are decomposed independently, and the eigenvalues of both sectors are truncated together by their magnitude,
+    keeping at most rank of the largest ones and dropping the ones not larger than cutoff.
+    W is diagonal with arrow (False, True) and eigenvalues sorted by descending magnitude in each sector, and V has arrow (tensor.arrow[0], True).
+    """
+    # pylint: disable=too-many-locals
+    assert tensor.edges[0] == tensor.edges[1], f"Eigenvalue decomposition needs a square matrix with the same edges. Got {tensor.edges}."
+    block_even, block_odd = _blocks(tensor)
+    w_even, v_even = torch.linalg.eigh(block_even)
+    w_odd, v_odd = torch.linalg.eigh(block_odd)
+    order_even = torch.argsort(w_even.abs(), descending=True, stable=True)
+    order_odd = torch.argsort(w_odd.abs(), descending=True, stable=True)
+    w_even, v_even = w_even[order_even], v_even[:, order_even]
+    w_odd, v_odd = w_odd[order_odd], v_odd[:, order_odd]
+    even, odd = _truncate(w_even.abs(), w_odd.abs(), rank, cutoff)
+
+    bond = (even, odd)
+    v = _block_diagonal(v_even[:, :even], v_odd[:, :odd])
+    w = torch.diag(torch.cat([w_even[:even], w_odd[:odd]])).to(dtype=v.dtype)
+    return (
+        GrassmannTensor(_arrow=(False, True), _edges=(bond, bond), _tensor=w),
+        GrassmannTensor(_arrow=(tensor.arrow[0], True), _edges=(tensor.edges[0], bond), _tensor=v),
+    )
@@ -0,0 +1,191 @@
+"""
+Opt-in metrics of the Grassmann tensor operations, counting calls, wall time, FLOPs, allocated bytes, sign passes and cache statistics.
+"""
+
+from __future__ import annotations
+
+__all__ = ["OperationMetrics", "Metrics", "collect_metrics", "enable_metrics", "disable_metrics", "current_metrics"]
+
+import contextlib
+import dataclasses
+import functools
+import time
+import typing
+import torch
+
+P = typing.ParamSpec("P")
+R = typing.TypeVar("R")
+
+_caches: dict[str, typing.Callable[[], typing.Any]] = {}
+_current: Metrics | None = None
+
+
+@dataclasses.dataclass
+class OperationMetrics:
+    """
+    The counters of a single operation.
+
+    The time includes the nested operations, while the FLOPs, bytes and sign passes are counted only for the innermost running operation.
+    """
+
+    calls: int = 0
+    time: float = 0.0
+    flops: int = 0
+    allocated_bytes: int = 0
+    sign_passes: int = 0
+
+
+@dataclasses.dataclass
+class Metrics:
+    """
+    The metrics collected while enabled, with the counters of every operation by its name.
+    Work done outside of any measured operation is counted under the name "other".
+
+    If synchronize is True, CUDA is synchronized around every operation, so the time includes the kernels instead of only their launches.
+    """
+
+    operations: dict[str, OperationMetrics] = dataclasses.field(default_factory=dict)
+    synchronize: bool = False
+    _stack: list[str] = dataclasses.field(default_factory=list, repr=False)
+    _cache_start: dict[str, tuple[int, int]] = dataclasses.field(default_factory=dict, repr=False)
+    _outer_time: float = dataclasses.field(default=0.0, repr=False)
+
+    def __post_init__(self) -> None:
+        self._cache_start = {name: _hits_misses(info) for name, info in _caches.items()}
+
+    def cache_stats(self) -> dict[str, tuple[int, int]]:
+        """
+        Get the hits and misses of every cache of the package since these metrics were created.
+        """
+        stats = {}
+        for name, info in _caches.items():
+            hits, misses = _hits_misses(info)
+            start_hits, start_misses = self._cache_start.get(name, (0, 0))
+            stats[name] = (hits - start_hits, misses - start_misses)
+        return stats
+
+    def total(self) -> OperationMetrics:
+        """
+        Get the sum of the counters of all operations, except the time, which is the time of the outermost operations only.
+        """
+        return OperationMetrics(
+            calls=sum(operation.calls for operation in self.operations.values()),
+            time=self._outer_time,
+            flops=sum(operation.flops for operation in self.operations.values()),
+            allocated_bytes=sum(operation.allocated_bytes for operation in self.operations.values()),
+            sign_passes=sum(operation.sign_passes for operation in self.operations.values()),
+        )
+
+    def summary(self) -> str:
+        """
+        Format the counters as a table, sorted by time in descending order.
+        """
+        lines = [f"{'operation':<16}{'calls':>10}{'time (s)':>14}{'GFLOPs':>12}{'MB':>12}{'sign passes':>14}"]
+        for name, operation in sorted(self.operations.items(), key=lambda item: item[1].time, reverse=True):
+            lines.append(f"{name:<16}{operation.calls:>10}{operation.time:>14.6f}{operation.flops / 1e9:>12.3f}{operation.allocated_bytes / 1e6:>12.3f}{operation.sign_passes:>14}")
+        for name, (hits, misses) in self.cache_stats().items():
+            lines.append(f"{name} cache: {hits} hits, {misses} misses")
+        return "\n".join(lines)
+
+    def _operation(self) -> OperationMetrics:
+        return self.operations.setdefault(self._stack[-1] if self._stack else "other", OperationMetrics())
+
+
+def _hits_misses(info: typing.Callable[[], typing.Any]) -> tuple[int, int]:
+    cache_info = info()
+    return cache_info.hits, cache_info.misses
+
+
+def register_cache(name: str, info: typing.Callable[[], typing.Any]) -> None:
+    """
+    Register a cache of the package by the function returning its statistics, whose hits and misses are reported by the metrics.
+    """
+    _caches[name] = info
+
+
+def measured(name: str) -> typing.Callable[[typing.Callable[P, R]], typing.Callable[P, R]]:
+    """
+    Decorate a function to be measured as an operation with the given name.
+    When the metrics are disabled, the only overhead is a single check of the current metrics.
+    """
+
+    def decorator(function: typing.Callable[P, R]) -> typing.Callable[P, R]:
+
+        @functools.wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            metrics = _current
+            if metrics is None:
+                return function(*args, **kwargs)
+            if metrics.synchronize and torch.cuda.is_available():
+                torch.cuda.synchronize()
+            metrics._stack.append(name)  # pylint: disable=protected-access
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if metrics.synchronize and torch.cuda.is_available():
+                    torch.cuda.synchronize()
+                elapsed = time.perf_counter() - start
+                metrics._stack.pop()  # pylint: disable=protected-access
+                operation = metrics.operations.setdefault(name, OperationMetrics())
+                operation.calls += 1
+                operation.time += elapsed
+                if not metrics._stack:  # pylint: disable=protected-access
+                    metrics._outer_time += elapsed  # pylint: disable=protected-access
+
+        return wrapper
+
+    return decorator
+
+
+def record(*, flops: int = 0, allocated: torch.Tensor | None = None, sign_passes: int = 0) -> None:
+    """
+    Record the FLOPs, the newly allocated tensor and the sign passes of the innermost running operation, if the metrics are enabled.
+    """
+    metrics = _current
+    if metrics is None:
+        return
+    operation = metrics._operation()  # pylint: disable=protected-access
+    operation.flops += flops
+    operation.sign_passes += sign_passes
+    if allocated is not None:
+        operation.allocated_bytes += allocated.numel() * allocated.element_size()
+
+
+def enable_metrics(*, synchronize: bool = False) -> Metrics:
+    """
+    Enable the metrics globally with new counters, and return them.
+    """
+    global _current  # pylint: disable=global-statement
+    _current = Metrics(synchronize=synchronize)
+    return _current
+
+
+def disable_metrics() -> Metrics | None:
+    """
+    Disable the metrics globally, and return the counters collected since they were enabled.
+    """
+    global _current  # pylint: disable=global-statement
+    metrics, _current = _current, None
+    return metrics
+
+
+def current_metrics() -> Metrics | None:
+    """
+    Get the counters being collected, or None if the metrics are disabled.
+    """
+    return _current
+
+
+@contextlib.contextmanager
+def collect_metrics(*, synchronize: bool = False) -> typing.Iterator[Metrics]:
+    """
+    Collect the metrics of the operations inside the context into new counters, restoring the previous state when leaving.
+    """
+    global _current  # pylint: disable=global-statement
+    previous = _current
+    _current = Metrics(synchronize=synchronize)
+    try:
+        yield _current
+    finally:
+        _current = previous
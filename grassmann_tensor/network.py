@@ -0,0 +1,151 @@
+"""
+A network of Grassmann tensors connected by labelled edges, contracted along a planned order with cached intermediate results.
+"""
+
+from __future__ import annotations
+
+__all__ = ["TensorNetwork"]
+
+import collections
+import dataclasses
+import typing
+from .einsum import Path, contract_pair, contraction_path
+from .metrics import measured
+from .tensor import GrassmannTensor
+
+Subset = frozenset[str]
+
+
+@dataclasses.dataclass
+class TensorNetwork:
+    """
+    A network of named Grassmann tensors, where every edge of a tensor has a label, and two edges with the same label are connected.
+    The labels follow einsum: a label appears either in two tensors with opposite arrows, or in one tensor and the output.
+
+    The contraction order is planned once by contraction_path and kept until the structure of the network changes.
+    Every intermediate result is cached by the set of tensors it is contracted from,
+    so after updating a tensor, only the intermediates containing it are recomputed.
+    """
+
+    optimize: typing.Literal["greedy", "optimal"] = "greedy"
+    _tensors: dict[str, GrassmannTensor] = dataclasses.field(default_factory=dict)
+    _labels: dict[str, str] = dataclasses.field(default_factory=dict)
+    _plan: list[tuple[Subset, Subset]] | None = dataclasses.field(default=None, repr=False)
+    _cache: dict[Subset, tuple[GrassmannTensor, str]] = dataclasses.field(default_factory=dict, repr=False)
+
+    @property
+    def tensors(self) -> dict[str, GrassmannTensor]:
+        """
+        The tensors of the network by their names.
+        """
+        return dict(self._tensors)
+
+    @property
+    def labels(self) -> dict[str, str]:
+        """
+        The labels of the edges of every tensor by their names.
+        """
+        return dict(self._labels)
+
+    @property
+    def bonds(self) -> dict[str, tuple[str, ...]]:
+        """
+        The names of the tensors having every label, where a label of two tensors is a bond connecting them, and a label of one tensor is open.
+        """
+        bonds: dict[str, list[str]] = collections.defaultdict(list)
+        for name, labels in self._labels.items():
+            for label in labels:
+                bonds[label].append(name)
+        return {label: tuple(names) for label, names in bonds.items()}
+
+    @property
+    def cached(self) -> tuple[Subset, ...]:
+        """
+        The sets of tensors whose contraction is cached.
+        """
+        return tuple(self._cache)
+
+    def add(self, name: str, tensor: GrassmannTensor, labels: str) -> None:
+        """
+        Add a tensor to the network with the labels of its edges.
+        """
+        assert name not in self._tensors, f"Tensor {name} is already in the network."
+        assert len(labels) == len(tensor.edges), f"Labels {labels} must match tensor dimensions ({len(tensor.edges)})."
+        self._tensors[name] = tensor
+        self._labels[name] = labels
+        self._plan = None
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a tensor from the network, dropping the cached intermediates containing it.
+        """
+        assert name in self._tensors, f"Tensor {name} is not in the network."
+        del self._tensors[name]
+        del self._labels[name]
+        self._plan = None
+        self._invalidate(name)
+
+    def update(self, name: str, tensor: GrassmannTensor) -> None:
+        """
+        Replace a tensor of the network with its labels kept, dropping only the cached intermediates containing it.
+        The contraction order is planned and validated again only if the edges or the arrow of the tensor change.
+        """
+        assert name in self._tensors, f"Tensor {name} is not in the network."
+        assert len(tensor.edges) == len(self._labels[name]), f"Labels {self._labels[name]} must match tensor dimensions ({len(tensor.edges)})."
+        if tensor.edges != self._tensors[name].edges or tensor.arrow != self._tensors[name].arrow:
+            self._plan = None
+        self._tensors[name] = tensor
+        self._invalidate(name)
+
+    def clear_cache(self) -> None:
+        """
+        Drop all cached intermediates, releasing their memory.
+        """
+        self._cache.clear()
+
+    @measured("network")
+    def contract(self, output: str | None = None) -> GrassmannTensor:
+        """
+        Contract the whole network, with the open labels ordered as output,
+        which defaults to the labels appearing in one tensor in alphabetical order.
+
+        The fermionic signs are handled by GrassmannTensor.tensordot in every pairwise contraction,
+        so the result does not depend on the contraction order, and the cached intermediates could be reused by any later contraction.
+        """
+        assert self._tensors, "The network has no tensor."
+        names = list(self._tensors)
+        open_labels = sorted(label for label, bond in self.bonds.items() if len(bond) == 1)
+        if output is None:
+            output = "".join(open_labels)
+        assert sorted(output) == open_labels, f"Output {output} must be a permutation of the open labels {''.join(open_labels)}."
+        if self._plan is None:
+            # The path search also validates the labels against the edges and arrows of the tensors.
+            subscripts = ",".join(self._labels[name] for name in names) + "->" + output
+            self._plan = self._schedule(names, contraction_path(subscripts, *self._tensors.values(), optimize=self.optimize))
+
+        for subset_a, subset_b in self._plan:
+            if subset_a | subset_b not in self._cache:
+                self._cache[subset_a | subset_b] = contract_pair(*self._result(subset_a), *self._result(subset_b))
+
+        tensor, labels = self._result(frozenset(names))
+        return tensor.permute(tuple(labels.index(label) for label in output))
+
+    def _schedule(self, names: list[str], path: Path) -> list[tuple[Subset, Subset]]:
+        # Convert a path of positions into the pairs of sets of tensors contracted at every step.
+        current = [frozenset((name,)) for name in names]
+        plan = []
+        for i, j in path:
+            subset_b = current.pop(j)
+            subset_a = current.pop(i)
+            plan.append((subset_a, subset_b))
+            current.append(subset_a | subset_b)
+        return plan
+
+    def _result(self, subset: Subset) -> tuple[GrassmannTensor, str]:
+        if len(subset) == 1:
+            name = next(iter(subset))
+            return self._tensors[name], self._labels[name]
+        return self._cache[subset]
+
+    def _invalidate(self, name: str) -> None:
+        self._cache = {subset: result for subset, result in self._cache.items() if name not in subset}
@@ -0,0 +1,169 @@
+"""
+Out-of-core contraction of block-sparse Grassmann tensors, streaming over chunks of one edge and writing the result into a memory-mapped file.
+"""
+
+from __future__ import annotations
+
+__all__ = ["create_blocks", "open_blocks", "streamed_tensordot", "streamed_matmul"]
+
+import itertools
+import json
+import math
+import os
+import typing
+import torch
+from .block_tensor import Block, BlockGrassmannTensor
+from .structure import sectors, sector_shape
+
+FORMAT = "grassmann_tensor_raw"
+VERSION = 1
+CHUNK_BYTES = 2**28
+
+File = typing.Union[str, os.PathLike[str]]
+
+
+def _metadata_path(file: File) -> str:
+    return os.fspath(file) + ".json"
+
+
+def create_blocks(file: File, arrow: tuple[bool, ...], edges: tuple[tuple[int, int], ...], dtype: torch.dtype) -> BlockGrassmannTensor:
+    """
+    Create a block-sparse Grassmann tensor filled with zeros, whose blocks are stored one after another in sector order in a raw file,
+    and whose arrow, edges and dtype are stored in the file with ".json" appended.
+    The blocks are writable views of the memory-mapped file, so the data written into them goes to the disk instead of staying in memory.
+    """
+    keys = sectors(len(edges))
+    total = sum(math.prod(sector_shape(edges, key)) for key in keys)
+    with open(_metadata_path(file), "w", encoding="utf-8") as metadata:
+        json.dump({"format": FORMAT, "version": VERSION, "arrow": arrow, "edges": edges, "dtype": str(dtype).removeprefix("torch.")}, metadata)
+    with open(file, "wb") as data:
+        # Truncating to the size creates a sparse file of zeros without writing them.
+        data.truncate(total * torch.empty((), dtype=dtype).element_size())
+    return open_blocks(file, writable=True)
+
+
+def open_blocks(file: File, *, writable: bool = False) -> BlockGrassmannTensor:
+    """
+    Open a block-sparse Grassmann tensor created by create_blocks, memory-mapping its file, so only the touched pages are read.
+    If writable is False, the changes to the blocks are private to this process and never written to the file.
+    """
+    with open(_metadata_path(file), "r", encoding="utf-8") as metadata:
+        header = json.load(metadata)
+    assert header.get("format") == FORMAT, "The file is not in the raw format of Grassmann tensors."
+    assert header["version"] <= VERSION, f"The file has format version {header['version']}, newer than the supported version {VERSION}."
+    arrow = tuple(header["arrow"])
+    edges = tuple((even, odd) for even, odd in header["edges"])
+    dtype = getattr(torch, header["dtype"])
+    keys = sectors(len(edges))
+    sizes = [math.prod(sector_shape(edges, key)) for key in keys]
+    total = sum(sizes)
+    storage = torch.from_file(os.fspath(file), shared=writable, size=total, dtype=dtype) if total != 0 else torch.empty(0, dtype=dtype)
+    blocks: Block = {}
+    offset = 0
+    for key, size in zip(keys, sizes):
+        blocks[key] = storage[offset:offset + size].view(sector_shape(edges, key))
+        offset += size
+    return BlockGrassmannTensor(_arrow=arrow, _edges=edges, _blocks=blocks)
+
+
+def _sign(key: tuple[bool, ...], singles: set[int], pairs: set[tuple[int, int]]) -> bool:
+    return (sum(key[i] for i in singles) + sum(key[i] and key[j] for i, j in pairs)) % 2 == 1
+
+
+def _inversions(order: tuple[int, ...]) -> set[tuple[int, int]]:
+    return {(i, j) for j in range(len(order)) for i in range(0, j) if order[i] > order[j]}
+
+
+def streamed_tensordot(
+    tensor_a: BlockGrassmannTensor,
+    tensor_b: BlockGrassmannTensor,
+    axes: int | tuple[tuple[int, ...], tuple[int, ...]],
+    file: File,
+    *,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> BlockGrassmannTensor:
+    """
+    Contract edges of two block-sparse Grassmann tensors like `GrassmannTensor.tensordot`, writing the result into a file created by create_blocks.
+
+    The inputs are usually memory-mapped, loaded by load_blocks with mmap or by open_blocks.
+    Every result block is computed in chunks of its first edge, which is the first free edge of tensor_a,
+    or of tensor_b if tensor_a has no free edge, so only a chunk of that tensor, of about chunk_bytes, is read at once, and the chunk of the result
+    is written once. If that edge is the first edge of its tensor, all reads and writes are sequential.
+    The sector blocks of the other tensor are read whole for every chunk, so the smaller tensor should be passed as the other one.
+    """
+    # pylint: disable=too-many-locals,too-many-arguments,too-many-branches,too-many-statements
+    if isinstance(axes, int):
+        axes_a = tuple(range(len(tensor_a.edges) - axes, len(tensor_a.edges)))
+        axes_b = tuple(range(axes))
+    else:
+        axes_a = tuple(axes[0])
+        axes_b = tuple(axes[1])
+    assert len(axes_a) == len(axes_b), f"The numbers of contracted edges must match. Got {axes_a} and {axes_b}."
+    assert len(set(axes_a)) == len(axes_a) and len(set(axes_b)) == len(axes_b), f"Contracted edges must be unique. Got {axes_a} and {axes_b}."
+    assert all(0 <= i < len(tensor_a.edges) for i in axes_a), f"Contracted edges must be within tensor dimensions. Got {axes_a}."
+    assert all(0 <= i < len(tensor_b.edges) for i in axes_b), f"Contracted edges must be within tensor dimensions. Got {axes_b}."
+    assert all(tensor_a.edges[i] == tensor_b.edges[j] for i, j in zip(axes_a, axes_b)), "Contracted edges must match."
+
+    free_a = tuple(i for i in range(len(tensor_a.edges)) if i not in axes_a)
+    free_b = tuple(i for i in range(len(tensor_b.edges)) if i not in axes_b)
+    order_a = free_a + axes_a
+    order_b = axes_b + free_b
+    contract = range(len(axes_a))
+
+    # The signs are those of GrassmannTensor.tensordot, which are constant in every sector block.
+    pairs_a = _inversions(order_a) ^ {(len(free_a) + i, len(free_a) + j) for j in contract for i in range(0, j)}
+    pairs_b = _inversions(order_b)
+    singles_b = {i for i in contract if tensor_b.arrow[axes_b[i]]}
+
+    reference = next(iter(tensor_a.blocks.values()))
+    dtype = torch.promote_types(reference.dtype, next(iter(tensor_b.blocks.values())).dtype)
+    arrow = tuple(tensor_a.arrow[i] for i in free_a) + tuple(tensor_b.arrow[i] for i in free_b)
+    edges = tuple(tensor_a.edges[i] for i in free_a) + tuple(tensor_b.edges[i] for i in free_b)
+    result = create_blocks(file, arrow, edges, dtype)
+    # The streamed edge is the first edge of the result, taken from tensor_a if it has a free edge and from tensor_b otherwise.
+    streamed_a = bool(free_a)
+    streamed = free_a[0] if free_a else free_b[0] if free_b else None
+
+    for key, out in result.blocks.items():
+        if out.numel() == 0:
+            continue
+        key_a_free, key_b_free = key[:len(free_a)], key[len(free_a):]
+        terms = []
+        for key_contract in itertools.product((False, True), repeat=len(axes_a)):
+            if sum(key_contract) % 2 != sum(key_a_free) % 2:
+                continue
+            key_a = [False] * len(tensor_a.edges)
+            for position, parity in zip(order_a, key_a_free + key_contract):
+                key_a[position] = parity
+            key_b = [False] * len(tensor_b.edges)
+            for position, parity in zip(order_b, key_contract + key_b_free):
+                key_b[position] = parity
+            sign = _sign(key_a_free + key_contract, set(), pairs_a) ^ _sign(key_contract + key_b_free, singles_b, pairs_b)
+            terms.append((tensor_a.blocks[tuple(key_a)], tensor_b.blocks[tuple(key_b)], sign))
+        if not terms:
+            continue
+
+        rows = out.size(0) if streamed is not None else 1
+        row_bytes = max(out.numel(), *(block_a.numel() if streamed_a else block_b.numel() for block_a, block_b, _ in terms)) // max(rows, 1) * out.element_size()
+        chunk = max(1, chunk_bytes // max(row_bytes, 1))
+        for start in range(0, rows, chunk):
+            length = min(chunk, rows - start)
+            total = torch.zeros((), dtype=dtype, device=out.device)
+            for block_a, block_b, sign in terms:
+                if streamed is not None and streamed_a:
+                    block_a = block_a.narrow(streamed, start, length)
+                elif streamed is not None:
+                    block_b = block_b.narrow(streamed, start, length)
+                part = torch.tensordot(block_a.permute(order_a).to(dtype), block_b.permute(order_b).to(dtype), dims=(list(range(len(free_a), len(order_a))), list(contract)))
+                total = total - part if sign else total + part
+            (out.narrow(0, start, length) if streamed is not None else out).copy_(total)
+    return result
+
+
+def streamed_matmul(tensor_a: BlockGrassmannTensor, tensor_b: BlockGrassmannTensor, file: File, *, chunk_bytes: int = CHUNK_BYTES) -> BlockGrassmannTensor:
+    """
+    Perform matrix multiplication of two rank 2 block-sparse Grassmann tensors like `GrassmannTensor.matmul`, writing the result into a file.
+    The rows of tensor_a are streamed in chunks, see streamed_tensordot.
+    """
+    assert len(tensor_a.edges) == 2 and len(tensor_b.edges) == 2, f"Both tensors must be rank 2. Got {len(tensor_a.edges)} and {len(tensor_b.edges)}."
+    return streamed_tensordot(tensor_a, tensor_b, 1, file, chunk_bytes=chunk_bytes)
@@ -0,0 +1,69 @@
+"""
+Execution of independent sector block work on a thread pool, balanced by the size of the blocks.
+"""
+
+from __future__ import annotations
+
+__all__ = ["run_blocks", "set_block_threads", "block_threads"]
+
+import concurrent.futures
+import typing
+import torch
+
+T = typing.TypeVar("T")
+
+_threads = 1  # pylint: disable=invalid-name
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+def set_block_threads(count: int) -> int:
+    """
+    Set the number of threads running the sector blocks of an operation concurrently, returning the previous number.
+    A single thread, which is the default, runs every block in order in the calling thread without any pool.
+
+    Every block still uses the intra-op threads of torch, so reducing them by torch.set_num_threads avoids oversubscription of the cores.
+    """
+    global _threads, _executor  # pylint: disable=global-statement
+    assert count >= 1, f"The number of block threads must be positive. Got {count}."
+    previous, _threads = _threads, count
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    return previous
+
+
+def block_threads() -> int:
+    """
+    Get the number of threads running the sector blocks of an operation concurrently.
+    """
+    return _threads
+
+
+def _pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=_threads, thread_name_prefix="grassmann_block")
+    return _executor
+
+
+def run_blocks(tasks: typing.Sequence[tuple[int, typing.Callable[[], T]]]) -> list[T]:
+    """
+    Run the independent tasks of sector blocks, each given with its cost, such as the FLOPs or the elements of the block,
+    and return their results in the order of the tasks.
+
+    With more than one block thread, the tasks are submitted to the pool from the largest to the smallest cost,
+    so the idle threads take the remaining smaller blocks and the load is balanced.
+    The grad mode of the calling thread is kept inside the tasks, since it is local to every thread.
+    """
+    if _threads == 1 or len(tasks) < 2:
+        return [task() for _, task in tasks]
+    grad_enabled = torch.is_grad_enabled()
+
+    def run(task: typing.Callable[[], T]) -> T:
+        with torch.set_grad_enabled(grad_enabled):
+            return task()
+
+    pool = _pool()
+    order = sorted(range(len(tasks)), key=lambda i: tasks[i][0], reverse=True)
+    futures = {i: pool.submit(run, tasks[i][1]) for i in order}
+    return [futures[i].result() for i in range(len(tasks))]
@@ -0,0 +1,137 @@
+"""
+Precompiled plans of reshaping dense Grassmann tensors, memoized with a bounded LRU cache.
+"""
+
+from __future__ import annotations
+
+__all__ = ["ReshapePlan", "reshape_plan", "reshape_cache_info", "clear_reshape_cache"]
+
+import dataclasses
+import functools
+import typing
+import torch
+from .metrics import register_cache
+from .structure import parse_reshape
+
+RESHAPE_CACHE_SIZE = 128
+
+
+@dataclasses.dataclass(frozen=True)
+class ReshapePlan:  # pylint: disable=too-many-instance-attributes
+    """
+    A precompiled reshape plan, which holds everything needed to reshape a tensor with given arrow and edges to a given new shape.
+
+    The reshape gathers the splitting edges with splitting_reorder, views the tensor with fine_shape, where every splitting edge is split,
+    applies the sign given by pairs of fine_edges, reshapes the tensor to shape and gathers the merging edges with merging_reorder.
+    The old edge i corresponds to the fine edges fine_indices[i], so a sign of the old edges could be applied together with the sign of the plan.
+    Every reorder is an edge index with a permutation gathering that edge and its inverse permutation, which gathers the gradient in backward.
+    All tensors are shared between calls, so they must not be modified in place.
+    """
+
+    arrow: tuple[bool, ...]
+    edges: tuple[tuple[int, int], ...]
+    shape: tuple[int, ...]
+    fine_edges: tuple[tuple[int, int], ...]
+    fine_shape: tuple[int, ...]
+    fine_indices: tuple[tuple[int, ...], ...]
+    pairs: tuple[tuple[int, int], ...]
+    splitting_reorder: tuple[tuple[int, torch.Tensor, torch.Tensor], ...]
+    merging_reorder: tuple[tuple[int, torch.Tensor, torch.Tensor], ...]
+
+
+def _unsqueeze(tensor: torch.Tensor, index: int, dim: int) -> torch.Tensor:
+    return tensor.view([-1 if i == index else 1 for i in range(dim)])
+
+
+def _reorder_indices(edges: tuple[tuple[int, int], ...], device: torch.device) -> torch.Tensor:
+    # The reorder gathering the even elements before the odd ones of the merged edge.
+    parity = [_unsqueeze(torch.arange(even + odd, device=device) >= even, index, len(edges)) for index, (even, odd) in enumerate(edges)]
+    shape = [even + odd for even, odd in edges]
+    flatten_parity = functools.reduce(torch.logical_xor, parity, torch.zeros(shape, dtype=torch.bool, device=device)).flatten()
+    return torch.cat([(~flatten_parity).nonzero().flatten(), flatten_parity.nonzero().flatten()], dim=0)
+
+
+def _inverse(reorder: torch.Tensor) -> torch.Tensor:
+    inverse = torch.empty_like(reorder)
+    inverse[reorder] = torch.arange(reorder.size(0), device=reorder.device)
+    return inverse
+
+
+def _build_reshape_plan(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    new_shape: tuple[int | tuple[int, int], ...],
+    device: torch.device,
+) -> ReshapePlan:
+    # pylint: disable=too-many-locals
+    new_arrow, new_edges, groups = parse_reshape(arrow, edges, new_shape)
+
+    fine_edges: list[tuple[int, int]] = []
+    fine_indices: list[tuple[int, ...]] = []
+    pairs: list[tuple[int, int]] = []
+    splitting_reorder: list[tuple[int, torch.Tensor, torch.Tensor]] = []
+    merging_reorder: list[tuple[int, torch.Tensor, torch.Tensor]] = []
+
+    for begin_self, end_self, begin_plan, end_plan in groups:
+        begin_fine = len(fine_edges)
+        if end_plan - begin_plan != 1:
+            # Splitting
+            reorder = _reorder_indices(new_edges[begin_plan:end_plan], device)
+            splitting_reorder.append((begin_self, _inverse(reorder), reorder))
+            fine_edges.extend(new_edges[begin_plan:end_plan])
+            fine_indices.append(tuple(range(begin_fine, len(fine_edges))))
+        else:
+            if end_self - begin_self != 1:
+                # Really something merged
+                reorder = _reorder_indices(edges[begin_self:end_self], device)
+                merging_reorder.append((begin_plan, reorder, _inverse(reorder)))
+            fine_edges.extend(edges[begin_self:end_self])
+            fine_indices.extend((i,) for i in range(begin_fine, len(fine_edges)))
+        if arrow[begin_self]:
+            # The sign of merging or splitting n odd edges is n(n-1)/2, which is the count of pairs among them.
+            pairs.extend((i, j) for j in range(begin_fine, len(fine_edges)) for i in range(begin_fine, j))
+
+    return ReshapePlan(
+        arrow=new_arrow,
+        edges=new_edges,
+        shape=tuple(even + odd for even, odd in new_edges),
+        fine_edges=tuple(fine_edges),
+        fine_shape=tuple(even + odd for even, odd in fine_edges),
+        fine_indices=tuple(fine_indices),
+        pairs=tuple(pairs),
+        splitting_reorder=tuple(splitting_reorder),
+        merging_reorder=tuple(merging_reorder),
+    )
+
+
+_cached_reshape_plan = functools.lru_cache(maxsize=RESHAPE_CACHE_SIZE)(_build_reshape_plan)
+
+
+def reshape_plan(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    new_shape: tuple[int | tuple[int, int], ...],
+    device: torch.device,
+) -> ReshapePlan:
+    """
+    Get the plan of reshaping a tensor with the given arrow and edges to the new shape on the given device.
+    See `GrassmannTensor.reshape` for the format of the new shape.
+    """
+    return _cached_reshape_plan(arrow, edges, new_shape, device)
+
+
+def reshape_cache_info() -> typing.Any:
+    """
+    Get the statistics of the reshape plan cache, including hits, misses, maxsize and currsize.
+    """
+    return _cached_reshape_plan.cache_info()
+
+
+def clear_reshape_cache() -> None:
+    """
+    Clear the reshape plan cache, releasing the memory of all cached plans.
+    """
+    _cached_reshape_plan.cache_clear()
+
+
+register_cache("reshape", reshape_cache_info)
@@ -0,0 +1,59 @@
+"""
+Saving and loading Grassmann tensors in a compact format, which stores the arrow, the edges and only the sector blocks allowed by parity.
+"""
+
+from __future__ import annotations
+
+__all__ = ["save", "load", "load_blocks"]
+
+import os
+import typing
+import torch
+from .block_tensor import BlockGrassmannTensor
+from .tensor import GrassmannTensor
+
+FORMAT = "grassmann_tensor"
+VERSION = 1
+
+File = typing.Union[str, os.PathLike[str], typing.BinaryIO]
+
+
+def _compact(block: torch.Tensor) -> torch.Tensor:
+    # Saving a view saves its whole storage, so any block not owning exactly its storage is copied.
+    if block.is_contiguous() and block.storage_offset() == 0 and block.untyped_storage().nbytes() == block.numel() * block.element_size():
+        return block
+    return block.clone(memory_format=torch.contiguous_format)
+
+
+def save(tensor: GrassmannTensor | BlockGrassmannTensor, file: File) -> None:
+    """
+    Save a dense or block-sparse Grassmann tensor to a file, storing only the sector blocks allowed by parity.
+    The file is written by torch.save, and could be loaded by load or load_blocks.
+    A dense tensor is split into its stored blocks with the pending sign applied per block, so its whole data is never copied.
+    """
+    if isinstance(tensor, GrassmannTensor):
+        assert not tensor.batch_shape, f"Saving batched Grassmann tensors is not supported. Got batch shape {tuple(tensor.batch_shape)}."
+        tensor = BlockGrassmannTensor.from_dense(tensor)
+    blocks = {key: _compact(block) for key, block in tensor.blocks.items()}
+    torch.save({"format": FORMAT, "version": VERSION, "arrow": tensor.arrow, "edges": tensor.edges, "blocks": blocks}, file)
+
+
+def load_blocks(file: File, *, mmap: bool = False, map_location: torch.device | str | None = None) -> BlockGrassmannTensor:
+    """
+    Load a Grassmann tensor saved by save as a block-sparse tensor.
+
+    If mmap is True, the file is memory-mapped, so it opens without reading the data,
+    and the pages of every block are read only when the block is touched.
+    """
+    data = torch.load(file, map_location=map_location, mmap=mmap, weights_only=True)
+    assert isinstance(data, dict) and data.get("format") == FORMAT, "The file is not in the format of saved Grassmann tensors."
+    assert data["version"] <= VERSION, f"The file has format version {data['version']}, newer than the supported version {VERSION}."
+    return BlockGrassmannTensor(_arrow=tuple(data["arrow"]), _edges=tuple(tuple(edge) for edge in data["edges"]), _blocks=dict(data["blocks"]))
+
+
+def load(file: File, *, mmap: bool = False, map_location: torch.device | str | None = None) -> GrassmannTensor:
+    """
+    Load a Grassmann tensor saved by save as a dense tensor, filling the elements forbidden by parity with zeros.
+    Since the dense tensor is assembled from all blocks, use load_blocks to keep a memory-mapped file lazy.
+    """
+    return load_blocks(file, mmap=mmap, map_location=map_location).to_dense()
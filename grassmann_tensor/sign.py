@@ -0,0 +1,261 @@
+"""
+The signs of the fermionic operations on dense Grassmann tensors, applied per sector block with the sectors memoized in a bounded LRU cache,
+or by a broadcast product of parity vectors when the sign splits too many edges into blocks.
+"""
+
+from __future__ import annotations
+
+__all__ = ["sign_sectors", "parity_sectors", "allowed_sign_sectors", "split_edges", "sign_mask", "apply_sign", "negate_", "requires_grad", "sign_cache_info", "clear_sign_cache", "set_sign_cache_size"]
+
+import functools
+import itertools
+import typing
+import torch
+from .metrics import record, register_cache
+from .parallel import block_threads, run_blocks
+
+SIGN_CACHE_SIZE = 128
+# The largest number of edges split by a sign into blocks, beyond which the 2**k blocks cost more than a broadcast product over the whole tensor.
+SIGN_SPLIT_LIMIT = 4
+
+Index = tuple[slice, ...]
+
+
+def _build_sign_sectors(
+    edges: tuple[tuple[int, int], ...],
+    singles: tuple[int, ...],
+    pairs: tuple[tuple[int, int], ...],
+    allowed: bool = False,
+) -> tuple[tuple[Index, ...], tuple[Index, ...]]:
+    # Only the edges in the sign with both parities present split the tensor, all the other edges are taken as a whole,
+    # unless only the blocks allowed by parity are built, where every edge is split.
+    involved = list(range(len(edges))) if allowed else sorted({*singles, *(i for pair in pairs for i in pair)})
+    choices = [(False,) if odd == 0 else (True,) if even == 0 else (False, True) for even, odd in (edges[i] for i in involved)]
+    positive: list[Index] = []
+    negative: list[Index] = []
+    for key in itertools.product(*choices):
+        if allowed and sum(key) % 2 == 1:
+            continue
+        parity = dict(zip(involved, key))
+        sign = (sum(parity[i] for i in singles) + sum(parity[i] and parity[j] for i, j in pairs)) % 2 == 1
+        slices = [slice(None)] * (involved[-1] + 1 if involved else 0)
+        for i, choice in zip(involved, choices):
+            if len(choice) == 2:
+                slices[i] = slice(edges[i][0], None) if parity[i] else slice(0, edges[i][0])
+        (negative if sign else positive).append(tuple(slices))
+    return tuple(positive), tuple(negative)
+
+
+_cached_sign_sectors = functools.lru_cache(maxsize=SIGN_CACHE_SIZE)(_build_sign_sectors)
+
+
+def sign_sectors(
+    edges: tuple[tuple[int, int], ...],
+    singles: tuple[int, ...],
+    pairs: tuple[tuple[int, int], ...],
+) -> tuple[tuple[Index, ...], tuple[Index, ...]]:
+    """
+    Get the sector blocks of a tensor with the given edges where the sign is positive and where it is negative,
+    where the sign is the xor of the parity of every edge in singles and the product of parities of every pair of edges in pairs.
+
+    Every block is an index of slices, which only splits the edges appearing in the sign,
+    so there are at most 2**k blocks for k such edges, and the blocks of both kinds cover the whole tensor.
+    """
+    return _cached_sign_sectors(edges, singles, pairs)
+
+
+def parity_sectors(edges: tuple[tuple[int, int], ...]) -> tuple[tuple[Index, ...], tuple[Index, ...]]:
+    """
+    Get the sector blocks of a tensor with the given edges allowed by parity and the blocks forbidden by parity, whose total parity is odd.
+    The total parity is the sign with every edge in singles, so they share the cache of sign_sectors.
+    """
+    return sign_sectors(edges, tuple(range(len(edges))), ())
+
+
+def allowed_sign_sectors(
+    edges: tuple[tuple[int, int], ...],
+    singles: tuple[int, ...],
+    pairs: tuple[tuple[int, int], ...],
+) -> tuple[tuple[Index, ...], tuple[Index, ...]]:
+    """
+    Get the sector blocks allowed by parity where the sign is positive and where it is negative, see sign_sectors,
+    where every edge is split, so the blocks of both kinds cover exactly the elements allowed by parity.
+    They share the cache of sign_sectors.
+    """
+    return _cached_sign_sectors(edges, singles, pairs, True)
+
+
+def split_edges(edges: tuple[tuple[int, int], ...], singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...]) -> int:
+    """
+    Get the number of edges appearing in the sign with both parities present, which split the tensor into 2**k sector blocks.
+    """
+    return sum(1 for i in {*singles, *(i for pair in pairs for i in pair)} if edges[i][0] != 0 and edges[i][1] != 0)
+
+
+def sign_mask(edges: tuple[tuple[int, int], ...], singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...], device: torch.device) -> torch.Tensor:
+    """
+    Get the boolean mask of the elements with a negative sign, see sign_sectors, built by broadcasting the parity vector of every edge in the sign,
+    so every edge not appearing in the sign is a singleton dimension of the mask.
+    """
+    rank = len(edges)
+    parity = {i: (torch.arange(sum(edges[i]), device=device) >= edges[i][0]).view([-1 if j == i else 1 for j in range(rank)]) for i in {*singles, *(i for pair in pairs for i in pair)}}
+    mask = torch.zeros([1] * rank, dtype=torch.bool, device=device)
+    for i in singles:
+        mask = mask ^ parity[i]
+    for i, j in pairs:
+        mask = mask ^ (parity[i] & parity[j])
+    return mask
+
+
+def _sign_factor(tensor: torch.Tensor, edges: tuple[tuple[int, int], ...], singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...]) -> torch.Tensor:
+    # The sign as a broadcast tensor of 1 and -1 of the dtype of the tensor, aligned with its trailing dimensions of the edges.
+    return 1 - 2 * sign_mask(edges, singles, pairs, tensor.device).to(tensor.dtype)
+
+
+def _signed(tensor: torch.Tensor, positive: tuple[Index, ...], negative: tuple[Index, ...], batch: int) -> torch.Tensor:
+    prefix = (slice(None),) * batch
+    result = torch.empty_like(tensor)
+    if block_threads() == 1:
+        for index in positive:
+            result[prefix + index] = tensor[prefix + index]
+        for index in negative:
+            torch.neg(tensor[prefix + index], out=result[prefix + index])
+    else:
+        blocks = [(prefix + index, False) for index in positive] + [(prefix + index, True) for index in negative]
+        run_blocks([(tensor[index].numel(), functools.partial(_copy_block, tensor[index], result[index], negate)) for index, negate in blocks])
+    record(allocated=result, sign_passes=1)
+    return result
+
+
+def _copy_block(source: torch.Tensor, target: torch.Tensor, negate: bool) -> None:
+    if negate:
+        torch.neg(source, out=target)
+    else:
+        target.copy_(source)
+
+
+def _negated_(tensor: torch.Tensor, negative: tuple[Index, ...], batch: int) -> torch.Tensor:
+    prefix = (slice(None),) * batch
+    for index in negative:
+        tensor[prefix + index].neg_()
+    record(sign_passes=1)
+    return tensor
+
+
+class _Sign(torch.autograd.Function):  # pylint: disable=abstract-method
+    # The backward of a sign is the same sign, so only the sectors are kept, which are shared with the cache.
+    # pylint: disable=arguments-differ, missing-function-docstring
+
+    @staticmethod
+    def forward(ctx: typing.Any, tensor: torch.Tensor, positive: tuple[Index, ...], negative: tuple[Index, ...], batch: int) -> torch.Tensor:
+        ctx.sectors = (positive, negative, batch)
+        return _signed(tensor, positive, negative, batch)
+
+    @staticmethod
+    def backward(ctx: typing.Any, grad: torch.Tensor) -> tuple[torch.Tensor | None, ...]:
+        return _signed(grad, *ctx.sectors), None, None, None
+
+
+class _SignInplace(torch.autograd.Function):  # pylint: disable=abstract-method
+    # The in-place variant of the sign, with the same backward.
+    # pylint: disable=arguments-differ, missing-function-docstring
+
+    @staticmethod
+    def forward(ctx: typing.Any, tensor: torch.Tensor, positive: tuple[Index, ...], negative: tuple[Index, ...], batch: int) -> torch.Tensor:
+        ctx.mark_dirty(tensor)
+        ctx.sectors = (positive, negative, batch)
+        return _negated_(tensor, negative, batch)
+
+    @staticmethod
+    def backward(ctx: typing.Any, grad: torch.Tensor) -> tuple[torch.Tensor | None, ...]:
+        return _signed(grad, *ctx.sectors), None, None, None
+
+
+def requires_grad(*tensors: torch.Tensor) -> bool:
+    """
+    Check whether an operation on the tensors is recorded by autograd.
+    """
+    return torch.is_grad_enabled() and any(tensor.requires_grad for tensor in tensors)
+
+
+def apply_sign(
+    tensor: torch.Tensor,
+    edges: tuple[tuple[int, int], ...],
+    singles: tuple[int, ...],
+    pairs: tuple[tuple[int, int], ...],
+    batch: int = 0,
+) -> torch.Tensor:
+    """
+    Apply the sign given by singles and pairs to the tensor in a single pass, copying the positive blocks and negating the negative ones.
+    The first batch dimensions of the tensor are not edges and get no sign.
+    The tensor itself is returned if no sector block gets a negative sign.
+
+    If the sign splits more than SIGN_SPLIT_LIMIT edges, the tensor is multiplied by the broadcast sign instead of being copied block by block.
+    Under autograd, the backward applies the same sign to the gradient, saving nothing but the cached sectors or the broadcast sign.
+    """
+    if not singles and not pairs:
+        return tensor
+    if split_edges(edges, singles, pairs) > SIGN_SPLIT_LIMIT:
+        result = tensor * _sign_factor(tensor, edges, singles, pairs)
+        record(allocated=result, sign_passes=1)
+        return result
+    positive, negative = sign_sectors(edges, singles, pairs)
+    if not negative:
+        return tensor
+    if requires_grad(tensor):
+        return _Sign.apply(tensor, positive, negative, batch)
+    return _signed(tensor, positive, negative, batch)
+
+
+def negate_(
+    tensor: torch.Tensor,
+    edges: tuple[tuple[int, int], ...],
+    singles: tuple[int, ...],
+    pairs: tuple[tuple[int, int], ...],
+    batch: int = 0,
+) -> torch.Tensor:
+    """
+    Apply the sign given by singles and pairs to the tensor in place, negating only the negative blocks.
+    The first batch dimensions of the tensor are not edges and get no sign.
+
+    If the sign splits more than SIGN_SPLIT_LIMIT edges, the tensor is multiplied in place by the broadcast sign instead.
+    Under autograd, the backward applies the same sign to the gradient, saving nothing but the cached sectors or the broadcast sign.
+    """
+    if not singles and not pairs:
+        return tensor
+    if split_edges(edges, singles, pairs) > SIGN_SPLIT_LIMIT:
+        tensor.mul_(_sign_factor(tensor, edges, singles, pairs))
+        record(sign_passes=1)
+        return tensor
+    positive, negative = sign_sectors(edges, singles, pairs)
+    if not negative:
+        return tensor
+    if requires_grad(tensor):
+        return _SignInplace.apply(tensor, positive, negative, batch)
+    return _negated_(tensor, negative, batch)
+
+
+def sign_cache_info() -> typing.Any:
+    """
+    Get the statistics of the sign sector cache, including hits, misses, maxsize and currsize.
+    """
+    return _cached_sign_sectors.cache_info()
+
+
+def clear_sign_cache() -> None:
+    """
+    Clear the sign sector cache.
+    """
+    _cached_sign_sectors.cache_clear()
+
+
+def set_sign_cache_size(maxsize: int | None) -> None:
+    """
+    Set the maximum number of cached sign sectors, where None means unbounded. The current cache is cleared.
+    """
+    global _cached_sign_sectors  # pylint: disable=global-statement
+    _cached_sign_sectors.cache_clear()
+    _cached_sign_sectors = functools.lru_cache(maxsize=maxsize)(_build_sign_sectors)
+
+
+register_cache("sign", sign_cache_info)
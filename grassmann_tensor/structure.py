@@ -0,0 +1,128 @@
+"""
+Helpers for the edge structure of Grassmann tensors, independent of the stored data.
+"""
+
+from __future__ import annotations
+
+__all__ = ["sectors", "sector_slices", "sector_shape", "merged_edge", "parse_reshape"]
+
+import functools
+import itertools
+import math
+import typing
+
+
+@functools.lru_cache(maxsize=None)
+def sectors(rank: int, parity: bool = False) -> tuple[tuple[bool, ...], ...]:
+    """
+    Enumerate the parity sectors of a tensor with the given rank and the given total parity.
+
+    Each sector is a tuple of booleans, one per edge, where True selects the odd part of that edge.
+    """
+    return tuple(key for key in itertools.product((False, True), repeat=rank) if sum(key) % 2 == parity)
+
+
+def sector_slices(edges: tuple[tuple[int, int], ...], key: tuple[bool, ...]) -> tuple[slice, ...]:
+    """
+    Get the slices selecting the given sector from a dense tensor with the given edges.
+    """
+    return tuple(slice(even, even + odd) if parity else slice(0, even) for (even, odd), parity in zip(edges, key))
+
+
+def sector_shape(edges: tuple[tuple[int, int], ...], key: tuple[bool, ...]) -> tuple[int, ...]:
+    """
+    Get the shape of the given sector of a tensor with the given edges.
+    """
+    return tuple(odd if parity else even for (even, odd), parity in zip(edges, key))
+
+
+def merged_edge(edges: tuple[tuple[int, int], ...]) -> tuple[int, int]:
+    """
+    Get the (even, odd) pair of the edge obtained by merging the given edges.
+    """
+    total = math.prod(even + odd for even, odd in edges)
+    difference = math.prod(even - odd for even, odd in edges)
+    return (total + difference) // 2, (total - difference) // 2
+
+
+def parse_reshape(
+    arrow: tuple[bool, ...],
+    edges: tuple[tuple[int, int], ...],
+    new_shape: tuple[int | tuple[int, int], ...],
+) -> tuple[tuple[bool, ...], tuple[tuple[int, int], ...], tuple[tuple[int, int, int, int], ...]]:
+    """
+    Parse the new shape of a reshape, see `GrassmannTensor.reshape` for its format.
+
+    It returns the new arrow, the new edges and the groups of the reshape.
+    Each group is a tuple (begin_self, end_self, begin_plan, end_plan),
+    which maps the old edges in [begin_self, end_self) to the new edges in [begin_plan, end_plan).
+    A group never merges and splits at the same time.
+    """
+    # pylint: disable=too-many-locals, too-many-statements
+
+    new_arrow: list[bool] = []
+    new_edges: list[tuple[int, int]] = []
+    groups: list[tuple[int, int, int, int]] = []
+    shape = tuple(even + odd for even, odd in edges)
+
+    cursor_plan: int = 0
+    cursor_self: int = 0
+    while True:
+        if new_shape[cursor_plan] == -1:
+            # Does not change
+            new_arrow.append(arrow[cursor_self])
+            new_edges.append(edges[cursor_self])
+            groups.append((cursor_self, cursor_self + 1, cursor_plan, cursor_plan + 1))
+            cursor_self += 1
+            cursor_plan += 1
+        else:
+            cursor_new_shape = new_shape[cursor_plan]
+            total = cursor_new_shape if isinstance(cursor_new_shape, int) else cursor_new_shape[0] + cursor_new_shape[1]
+            if total >= shape[cursor_self]:
+                # Merging
+                new_cursor_self = cursor_self
+                self_total = 1
+                while True:
+                    self_total *= shape[new_cursor_self]
+                    new_cursor_self += 1
+                    if self_total == total:
+                        break
+                    assert self_total < total, f"Dimension mismatch with edges {edges} and new shape {new_shape}."
+                    assert new_cursor_self < len(shape), f"New shape {new_shape} exceeds tensor dimensions {len(shape)}."
+                even, odd = merged_edge(edges[cursor_self:new_cursor_self])
+                if isinstance(cursor_new_shape, tuple):
+                    assert (even, odd) == cursor_new_shape, f"New even and odd number mismatch during merging {edges} to {new_shape}."
+                new_arrow.append(arrow[cursor_self])
+                assert all(self_arrow == new_arrow[-1] for self_arrow in arrow[cursor_self:new_cursor_self]), f"Cannot merge edges with different arrows {arrow[cursor_self:new_cursor_self]}."
+                new_edges.append((even, odd))
+                groups.append((cursor_self, new_cursor_self, cursor_plan, cursor_plan + 1))
+                cursor_self = new_cursor_self
+                cursor_plan += 1
+            else:
+                # Splitting
+                new_cursor_plan = cursor_plan
+                plan_total = 1
+                while True:
+                    new_cursor_new_shape = new_shape[new_cursor_plan]
+                    assert isinstance(new_cursor_new_shape, tuple), f"New shape must be a pair when splitting, got {new_cursor_new_shape}."
+                    plan_total *= new_cursor_new_shape[0] + new_cursor_new_shape[1]
+                    new_cursor_plan += 1
+                    if plan_total == shape[cursor_self]:
+                        break
+                    assert plan_total < shape[cursor_self], f"Dimension mismatch with edges {edges} and new shape {new_shape}."
+                    assert new_cursor_plan < len(new_shape), f"New shape {new_shape} exceeds specified dimensions {len(new_shape)}."
+                # new_shape has been verified to be tuple[int, int] in the loop
+                split_edges = typing.cast(tuple[tuple[int, int], ...], new_shape[cursor_plan:new_cursor_plan])
+                even, odd = merged_edge(split_edges)
+                assert (even, odd) == edges[cursor_self], f"New even and odd number mismatch during splitting {edges[cursor_self]} to {split_edges}."
+                for split_edge in split_edges:
+                    new_arrow.append(arrow[cursor_self])
+                    new_edges.append(split_edge)
+                groups.append((cursor_self, cursor_self + 1, cursor_plan, new_cursor_plan))
+                cursor_self += 1
+                cursor_plan = new_cursor_plan
+
+        if cursor_plan == len(new_shape) and cursor_self == len(shape):
+            break
+
+    return tuple(new_arrow), tuple(new_edges), tuple(groups)
@@ -2,28 +2,71 @@
 A Grassmann tensor class.
 """
 
+# pylint: disable=too-many-lines
+
 from __future__ import annotations
 
-__all__ = ["GrassmannTensor"]
+__all__ = ["GrassmannTensor", "set_validation", "validation_enabled"]
 
 import dataclasses
 import functools
+import operator
 import typing
+import weakref
 import torch
+from .metrics import measured, record
+from .parallel import run_blocks
+from .sign import SIGN_SPLIT_LIMIT, allowed_sign_sectors, apply_sign, negate_, parity_sectors, requires_grad, sign_mask, split_edges
+from .reshape_plan import reshape_plan
+
+_validation = True  # pylint: disable=invalid-name
+
+
+def set_validation(enabled: bool) -> bool:
+    """
+    Enable or disable the validation of the structure of Grassmann tensors in their constructor and in the arithmetic operations, returning the previous setting.
+    Disabling it removes the Python overhead of the checks for small tensors in production, where the inputs are known to be consistent.
+    """
+    global _validation  # pylint: disable=global-statement
+    previous, _validation = _validation, enabled
+    return previous
 
 
-@dataclasses.dataclass
-class GrassmannTensor:
+def validation_enabled() -> bool:
+    """
+    Check whether the structure of Grassmann tensors is validated.
+    """
+    return _validation
+
+
+@dataclasses.dataclass(slots=True, weakref_slot=True)
+class GrassmannTensor:  # pylint: disable=too-many-public-methods
     """
     A Grassmann tensor class, which stores a tensor along with information about its edges.
     Each dimension of the tensor is composed of an even and an odd part, represented as a pair of integers.
+
+    The signs of permute and reverse are deferred: the stored data is a view, and the pending sign is kept as the single edges
+    and the pairs of edges whose parities are multiplied into the sign. It is applied in a single pass when the data is read,
+    or folded into the contraction of matmul, tensordot and reshape.
+
+    The first _batch dimensions of the tensor are batch dimensions, which are not edges and carry no fermionic sign.
+    All operations act on every tensor in the batch, leaving the batch dimensions untouched, and broadcast them when combining two tensors.
+
+    The results of the operations are built by a trusted path, which skips the validation of the constructor.
+
+    Since the lazy results of permute, reverse, conj and dagger are views of the data, the data is copied on write:
+    every tensor keeps weak references to the tensors viewing the same data, and while another one of them is alive and still views it,
+    the data is copied before any in-place update, including a read of tensor, which could be updated in place by the caller.
+    Once these lazy results are gone or have applied their signs, the data is updated in the same memory again.
     """
 
     _arrow: tuple[bool, ...]
     _edges: tuple[tuple[int, int], ...]
     _tensor: torch.Tensor
     _parity: tuple[torch.Tensor, ...] | None = None
-    _mask: torch.Tensor | None = None
+    _sign: tuple[tuple[int, ...], tuple[tuple[int, int], ...]] | None = None
+    _batch: int = 0
+    _views: list[weakref.ReferenceType[GrassmannTensor]] | None = dataclasses.field(default=None, init=False, repr=False, compare=False)
 
     @property
     def arrow(self) -> tuple[bool, ...]:
@@ -39,12 +82,20 @@ class GrassmannTensor:
         """
         return self._edges
 
+    @property
+    def batch_shape(self) -> torch.Size:
+        """
+        The shape of the batch dimensions, which lead the shape of the tensor data.
+        """
+        return self._tensor.shape[:self._batch]
+
     @property
     def tensor(self) -> torch.Tensor:
         """
-        The underlying tensor data.
+        The underlying tensor data, with the pending sign applied.
+        It is never shared with the lazy results alive, so it could be updated in place.
         """
-        return self._tensor
+        return self._exclusive()
 
     @property
     def parity(self) -> tuple[torch.Tensor, ...]:
@@ -58,12 +109,12 @@ class GrassmannTensor:
     @property
     def mask(self) -> torch.Tensor:
         """
-        The mask of the tensor, which has the same shape as the tensor and indicates which elements could be non-zero based on the parity.
+        The mask of the tensor, which has the same shape as the tensor and indicates the elements forbidden by parity.
+        It is a debug view built on every access and never stored, while the operations work from the sector blocks of the edges instead.
         """
-        if self._mask is None:
-            self._mask = self._tensor_mask()
-        return self._mask
+        return self._tensor_mask()
 
+    @measured("to")
     def to(self, whatever: torch.device | torch.dtype | str | None = None, *, device: torch.device | None = None, dtype: torch.dtype | None = None) -> GrassmannTensor:
         """
         Copy the tensor to a specified device or copy it to a specified data type.
@@ -84,65 +135,72 @@ class GrassmannTensor:
             case (None, None):
                 return self
             case (None, _):
-                return dataclasses.replace(
-                    self,
-                    _tensor=self._tensor.to(dtype=dtype),
-                )
+                return self._with_tensor(self._tensor.to(dtype=dtype))
             case (_, None):
-                return dataclasses.replace(
-                    self,
-                    _tensor=self._tensor.to(device=device),
-                    _parity=tuple(p.to(device) for p in self._parity) if self._parity is not None else None,
-                    _mask=self._mask.to(device) if self._mask is not None else None,
-                )
+                parity = tuple(p.to(device) for p in self._parity) if self._parity is not None else None
+                return GrassmannTensor._trusted(self._arrow, self._edges, self._tensor.to(device=device), parity, self._sign, self._batch)
             case _:
-                return dataclasses.replace(
-                    self,
-                    _tensor=self._tensor.to(device=device, dtype=dtype),
-                    _parity=tuple(p.to(device=device) for p in self._parity) if self._parity is not None else None,
-                    _mask=self._mask.to(device=device) if self._mask is not None else None,
-                )
+                parity = tuple(p.to(device=device) for p in self._parity) if self._parity is not None else None
+                return GrassmannTensor._trusted(self._arrow, self._edges, self._tensor.to(device=device, dtype=dtype), parity, self._sign, self._batch)
 
+    @measured("update_mask")
     def update_mask(self) -> GrassmannTensor:
         """
-        Update the mask of the tensor based on its parity.
+        Update the mask of the tensor based on its parity, replacing the data with a copy where the elements forbidden by parity are zeros.
+        The copy is made in a single pass, filled through the total parity broadcast from the parity vectors of the edges.
+        """
+        if any(odd != 0 for _, odd in self._edges):
+            self._tensor = self._tensor.masked_fill(self._forbidden(), 0)
+            record(allocated=self._tensor)
+        return self
+
+    @measured("update_mask_")
+    def update_mask_(self) -> GrassmannTensor:
+        """
+        Update the mask of the tensor based on its parity in place, filling the elements forbidden by parity with zeros in the same memory,
+        unless the data is a view of another tensor or may be viewed by lazy results, where it is copied first.
         """
-        self._tensor = torch.where(self.mask, 0, self._tensor)
+        self._exclusive()
+        if any(odd != 0 for _, odd in self._edges):
+            self._tensor.masked_fill_(self._forbidden(), 0)
         return self
 
+    def _forbidden(self) -> torch.Tensor:
+        # The elements forbidden by parity, whose total parity is odd, as the xor of the parity vectors of the edges broadcast against each other.
+        return sign_mask(self._edges, tuple(range(len(self._edges))), (), self._tensor.device)
+
+    @measured("permute")
     def permute(self, before_by_after: tuple[int, ...]) -> GrassmannTensor:
         """
         Permute the indices of the Grassmann tensor.
         """
         assert len(before_by_after) == len(set(before_by_after)), "Permutation indices must be unique."
-        assert set(before_by_after) == set(range(self.tensor.dim())), "Permutation indices must cover all dimensions."
-
-        arrow = tuple(self.arrow[i] for i in before_by_after)
-        edges = tuple(self.edges[i] for i in before_by_after)
-        tensor = self.tensor.permute(before_by_after)
-        parity = tuple(self.parity[i] for i in before_by_after)
-        mask = self.mask.permute(before_by_after)
-
-        total_parity = functools.reduce(
-            torch.logical_xor,
-            (
-                torch.logical_and(self._unsqueeze(parity[i], i, self.tensor.dim()), self._unsqueeze(parity[j], j, self.tensor.dim()))
-                for j in range(self.tensor.dim())
-                for i in range(0, j)  # all 0 <= i < j < dim
-                if before_by_after[i] > before_by_after[j]),
-            torch.zeros([], dtype=torch.bool, device=self.tensor.device),
-        )
-        tensor = torch.where(total_parity, -tensor, +tensor)
-
-        return dataclasses.replace(
-            self,
-            _arrow=arrow,
-            _edges=edges,
-            _tensor=tensor,
-            _parity=parity,
-            _mask=mask,
-        )
+        assert set(before_by_after) == set(range(len(self._edges))), "Permutation indices must cover all dimensions."
+
+        singles, pairs = self._pending_sign(before_by_after)
+        pairs ^= self._inversions(before_by_after)
+
+        return self._viewed_by(
+            GrassmannTensor._trusted(
+                tuple(self._arrow[i] for i in before_by_after),
+                tuple(self._edges[i] for i in before_by_after),
+                self._tensor.permute(self._batch_order(before_by_after)),
+                tuple(self._parity[i] for i in before_by_after) if self._parity is not None else None,
+                (tuple(sorted(singles)), tuple(sorted(pairs))),
+                self._batch,
+            ))
+
+    @measured("permute_")
+    def permute_(self, before_by_after: tuple[int, ...]) -> GrassmannTensor:
+        """
+        Permute the indices of the Grassmann tensor in place, see permute.
+        The data is permuted as a view of the same memory, and the sign is applied by an in-place negation,
+        unless the data is a view of another tensor or may be viewed by lazy results, where the sign is kept pending.
+        """
+        self._assign_(self._owned(), self.permute(before_by_after))
+        return self
 
+    @measured("reverse")
     def reverse(self, indices: tuple[int, ...]) -> GrassmannTensor:
         """
         Reverse the specified indices of the Grassmann tensor.
@@ -151,45 +209,100 @@ class GrassmannTensor:
         This package always applies it to the tensor with arrow as True.
         """
         assert len(set(indices)) == len(indices), f"Indices must be unique. Got {indices}."
-        assert all(0 <= i < self.tensor.dim() for i in indices), f"Indices must be within tensor dimensions. Got {indices}."
-
-        arrow = tuple(self.arrow[i] ^ i in indices for i in range(self.tensor.dim()))
-        tensor = self.tensor
-
-        total_parity = functools.reduce(
-            torch.logical_xor,
-            (self._unsqueeze(parity, index, self.tensor.dim()) for index, parity in enumerate(self.parity) if index in indices and self.arrow[index]),
-            torch.zeros([], dtype=torch.bool, device=self.tensor.device),
-        )
-        tensor = torch.where(total_parity, -tensor, +tensor)
+        assert all(0 <= i < len(self._edges) for i in indices), f"Indices must be within tensor dimensions. Got {indices}."
+
+        singles, pairs = self._pending_sign(tuple(range(len(self._edges))))
+        singles ^= {index for index in indices if self.arrow[index]}
+
+        return self._viewed_by(
+            GrassmannTensor._trusted(
+                tuple(self._arrow[i] ^ (i in indices) for i in range(len(self._edges))),
+                self._edges,
+                self._tensor,
+                self._parity,
+                (tuple(sorted(singles)), tuple(sorted(pairs))),
+                self._batch,
+            ))
+
+    @measured("reverse_")
+    def reverse_(self, indices: tuple[int, ...]) -> GrassmannTensor:
+        """
+        Reverse the specified indices of the Grassmann tensor in place, see reverse.
+        The sign is applied by an in-place negation, unless the data is a view of another tensor or may be viewed by lazy results,
+        where the sign is kept pending.
+        """
+        self._assign_(self._owned(), self.reverse(indices))
+        return self
 
-        return dataclasses.replace(
-            self,
-            _arrow=arrow,
-            _tensor=tensor,
-        )
+    @measured("conj")
+    def conj(self) -> GrassmannTensor:
+        """
+        Take the complex conjugate of the tensor data, keeping the edges and the arrow.
+        The data is a lazy conjugate view by torch.Tensor.conj, which is resolved together with the pending sign when read,
+        so the result is kept as a view with a pending sign even if the sign is empty.
+        """
+        sign = self._sign if self._sign is not None else ((), ())
+        return self._viewed_by(GrassmannTensor._trusted(self._arrow, self._edges, self._tensor.conj(), self._parity, sign, self._batch))
 
-    def _reorder_indices(self, edges: tuple[tuple[int, int], ...]) -> tuple[int, int, torch.Tensor, torch.Tensor]:
-        parity = functools.reduce(
-            torch.logical_xor,
-            (self._unsqueeze(self._edge_mask(even, odd), index, len(edges)) for index, (even, odd) in enumerate(edges)),
-            torch.zeros([], dtype=torch.bool, device=self.tensor.device),
-        )
-        flatten_parity = parity.flatten()
-        even = (~flatten_parity).nonzero().squeeze()
-        odd = flatten_parity.nonzero().squeeze()
-        reorder = torch.cat([even, odd], dim=0)
-
-        total = functools.reduce(
-            torch.add,
-            (self._unsqueeze(self._edge_mask(even, odd), index, len(edges)).to(dtype=torch.int16) for index, (even, odd) in enumerate(edges)),
-            torch.zeros([], dtype=torch.int16, device=self.tensor.device),
-        )
-        count = total * (total - 1)
-        sign = (count & 2).to(dtype=torch.bool)
-        return len(even), len(odd), reorder, sign.flatten()
+    @measured("dagger")
+    def dagger(self) -> GrassmannTensor:
+        """
+        Take the conjugate transpose of the Grassmann tensor, which conjugates the data, reverses the order of the edges and reverses every edge.
 
-    def reshape(self, new_shape: tuple[int | tuple[int, int], ...]) -> GrassmannTensor:
+        It equals conj, followed by permute to the reversed order of the edges and reverse of all edges,
+        but the signs of both steps are combined with the pending sign into a single deferred sign, where every pair of edges is an inversion,
+        and the edges with arrow True are reversed. So the result is a view of the conjugated data, and the sign is applied in one pass when read.
+        """
+        before_by_after = tuple(reversed(range(len(self._edges))))
+        singles, pairs = self._pending_sign(before_by_after)
+        pairs ^= self._inversions(before_by_after)
+        singles ^= {after for after, before in enumerate(before_by_after) if self._arrow[before]}
+
+        return self._viewed_by(
+            GrassmannTensor._trusted(
+                tuple(not self._arrow[i] for i in before_by_after),
+                tuple(self._edges[i] for i in before_by_after),
+                self._tensor.conj().permute(self._batch_order(before_by_after)),
+                tuple(self._parity[i] for i in before_by_after) if self._parity is not None else None,
+                (tuple(sorted(singles)), tuple(sorted(pairs))),
+                self._batch,
+            ))
+
+    def _viewed_by(self, result: GrassmannTensor) -> GrassmannTensor:
+        # Register a lazy result viewing the data, sharing the list of weak references among all the tensors viewing the same data.
+        # pylint: disable=protected-access
+        if self._views is None:
+            self._views = [weakref.ref(self)]
+        self._views.append(weakref.ref(result))
+        result._views = self._views
+        return result
+
+    def _viewed(self) -> bool:
+        # Whether another tensor alive still views the data, dropping the references to the tensors gone.
+        # pylint: disable=protected-access
+        if self._views is None:
+            return False
+        self._views[:] = [view for view in self._views if view() is not None]
+        storage = self._tensor.untyped_storage().data_ptr()
+        return any(tensor is not None and tensor is not self and tensor._tensor.untyped_storage().data_ptr() == storage for tensor in (view() for view in self._views))
+
+    def _owned(self) -> bool:
+        # Whether the data is exclusive to this tensor, being neither a view of another tensor nor viewed by lazy results alive.
+        return self._sign is None and not self._viewed()
+
+    def _assign_(self, owned: bool, result: GrassmannTensor) -> None:
+        # Take all fields of a result of permute or reverse, applying its sign in place if the data was owned before the operation.
+        # Otherwise the sign stays pending, so the data is copied when it is read or updated.
+        # pylint: disable=protected-access
+        self._arrow, self._edges, self._tensor = result.arrow, result.edges, result._tensor
+        self._parity, self._sign = result._parity, result._sign
+        if owned and self._sign is not None:
+            singles, pairs = self._sign
+            self._sign = None
+            negate_(self._tensor, self._edges, singles, pairs, self._batch)
+
+    @measured("reshape")
+    def reshape(self, new_shape: tuple[int | tuple[int, int], ...], *, out: torch.Tensor | None = None) -> GrassmannTensor:
         """
         Reshape the Grassmann tensor, which may split or merge edges.
 
@@ -203,151 +316,101 @@ class GrassmannTensor:
 
         A single sign is generated during merging or splitting two edges, which should be applied to one of the connected two tensors.
         This package always applies it to the tensor with arrow as True.
+
+        If out is given, the result is written into it, and the returned tensor uses it as its data.
         """
-        # This function reshapes the Grassmann tensor according to the new shape, including the following steps:
-        # 1. Generate new arrow, edges, and shape for tensor
-        # 2. Reorder the indices for splitting
-        # 3. Apply the sign for splitting
+        # This function reshapes the Grassmann tensor according to a cached plan for the new shape, including the following steps:
+        # 1. Reorder the indices for splitting
+        # 2. View the tensor with all splitting edges split
+        # 3. Apply the sign for splitting and merging together with the pending sign in a single pass
         # 4. reshape the core tensor according to the new shape
-        # 5. Apply the sign for merging
-        # 6. Reorder the indices for merging
-
-        # pylint: disable=too-many-branches, too-many-locals, too-many-statements
-
-        arrow: list[bool] = []
-        edges: list[tuple[int, int]] = []
-        shape: list[int] = []
-
-        splitting_sign: list[tuple[int, torch.Tensor]] = []
-        splitting_reorder: list[tuple[int, torch.Tensor]] = []
-        merging_reorder: list[tuple[int, torch.Tensor]] = []
-        merging_sign: list[tuple[int, torch.Tensor]] = []
-
-        cursor_plan: int = 0
-        cursor_self: int = 0
-        while True:
-            if new_shape[cursor_plan] == -1:
-                # Does not change
-                arrow.append(self.arrow[cursor_self])
-                edges.append(self.edges[cursor_self])
-                shape.append(self.tensor.shape[cursor_self])
-                cursor_self += 1
-                cursor_plan += 1
-            else:
-                cursor_new_shape = new_shape[cursor_plan]
-                total = cursor_new_shape if isinstance(cursor_new_shape, int) else cursor_new_shape[0] + cursor_new_shape[1]
-                if total >= self.tensor.shape[cursor_self]:
-                    # Merging
-                    new_cursor_self = cursor_self
-                    self_total = 1
-                    while True:
-                        self_total *= self.tensor.shape[new_cursor_self]
-                        new_cursor_self += 1
-                        if self_total == total:
-                            break
-                        assert self_total < total, f"Dimension mismatch with edges {self.edges} and new shape {new_shape}."
-                        assert new_cursor_self < self.tensor.dim(), f"New shape {new_shape} exceeds tensor dimensions {self.tensor.dim()}."
-                    even, odd, reorder, sign = self._reorder_indices(self.edges[cursor_self:new_cursor_self])
-                    if isinstance(cursor_new_shape, tuple):
-                        assert (even, odd) == cursor_new_shape, f"New even and odd number mismatch during merging {self.edges} to {new_shape}."
-                    arrow.append(self.arrow[cursor_self])
-                    assert all(
-                        self_arrow == arrow[-1] for self_arrow in self.arrow[cursor_self:new_cursor_self]), f"Cannot merge edges with different arrows {self.arrow[cursor_self:new_cursor_self]}."
-                    edges.append((even, odd))
-                    shape.append(total)
-                    if cursor_self + 1 != new_cursor_self:
-                        # Really something merged
-                        merging_sign.append((cursor_plan, sign))
-                        merging_reorder.append((cursor_plan, reorder))
-                    cursor_self = new_cursor_self
-                    cursor_plan += 1
-                else:
-                    # Splitting
-                    new_cursor_plan = cursor_plan
-                    plan_total = 1
-                    while True:
-                        new_cursor_new_shape = new_shape[new_cursor_plan]
-                        assert isinstance(new_cursor_new_shape, tuple), f"New shape must be a pair when splitting, got {new_cursor_new_shape}."
-                        plan_total *= new_cursor_new_shape[0] + new_cursor_new_shape[1]
-                        new_cursor_plan += 1
-                        if plan_total == self.tensor.shape[cursor_self]:
-                            break
-                        assert plan_total < self.tensor.shape[cursor_self], f"Dimension mismatch with edges {self.edges} and new shape {new_shape}."
-                        assert new_cursor_plan < len(new_shape), f"New shape {new_shape} exceeds specified dimensions {len(new_shape)}."
-                    # new_shape has been verified to be tuple[int, int] in the loop
-                    even, odd, reorder, sign = self._reorder_indices(typing.cast(tuple[tuple[int, int], ...], new_shape[cursor_plan:new_cursor_plan]))
-                    assert (even, odd) == self.edges[cursor_self], f"New even and odd number mismatch during splitting {self.edges[cursor_self]} to {new_shape[cursor_plan:new_cursor_plan]}."
-                    for i in range(cursor_plan, new_cursor_plan):
-                        # new_shape has been verified to be tuple[int, int] in the loop
-                        new_cursor_new_shape = typing.cast(tuple[int, int], new_shape[i])
-                        arrow.append(self.arrow[cursor_self])
-                        edges.append(new_cursor_new_shape)
-                        shape.append(new_cursor_new_shape[0] + new_cursor_new_shape[1])
-                    splitting_reorder.append((cursor_self, reorder))
-                    splitting_sign.append((cursor_self, sign))
-                    cursor_self += 1
-                    cursor_plan = new_cursor_plan
-
-            if cursor_plan == len(new_shape) and cursor_self == self.tensor.dim():
-                break
-
-        tensor = self.tensor
-
-        for index, reorder in splitting_reorder:
-            inverse_reorder = torch.empty_like(reorder)
-            inverse_reorder[reorder] = torch.arange(reorder.size(0), device=reorder.device)
-            tensor = tensor.index_select(index, inverse_reorder)
-
-        splitting_parity = functools.reduce(
-            torch.logical_xor,
-            (self._unsqueeze(sign, index, self.tensor.dim()) for index, sign in splitting_sign if self.arrow[index]),
-            torch.zeros([], dtype=torch.bool, device=self.tensor.device),
-        )
-        tensor = torch.where(splitting_parity, -tensor, +tensor)
-
+        # 5. Reorder the indices for merging
+
+        plan = reshape_plan(self.arrow, self.edges, new_shape, self._tensor.device)
+
+        tensor = self._tensor
+
+        for index, gather, scatter in plan.splitting_reorder:
+            tensor = _reorder(tensor, self._batch + index, gather, scatter)
+
+        # The parity of a split edge is the xor of the parities of its fine edges, so the pending sign could be expanded to them.
+        pending_singles, pending_pairs = self._pending_sign(tuple(range(len(self._edges))))
+        singles = {fine for i in pending_singles for fine in plan.fine_indices[i]}
+        pairs = {(fine_i, fine_j) for i, j in pending_pairs for fine_i in plan.fine_indices[i] for fine_j in plan.fine_indices[j]} ^ set(plan.pairs)
+        fine_tensor = tensor.reshape(self.batch_shape + plan.fine_shape)
+        if fine_tensor.untyped_storage().data_ptr() != tensor.untyped_storage().data_ptr():
+            record(allocated=fine_tensor)
+        tensor = fine_tensor
+        if tensor.untyped_storage().data_ptr() == self._tensor.untyped_storage().data_ptr():
+            tensor = apply_sign(tensor, plan.fine_edges, tuple(sorted(singles)), tuple(sorted(pairs)), self._batch)
+        else:
+            # The tensor has been copied already, so the sign could be applied in place.
+            negate_(tensor, plan.fine_edges, tuple(sorted(singles)), tuple(sorted(pairs)), self._batch)
+
+        shape = self.batch_shape + plan.shape
         tensor = tensor.reshape(shape)
 
-        merging_parity = functools.reduce(
-            torch.logical_xor,
-            (self._unsqueeze(sign, index, tensor.dim()) for index, sign in merging_sign if arrow[index]),
-            torch.zeros([], dtype=torch.bool, device=self.tensor.device),
-        )
-        tensor = torch.where(merging_parity, -tensor, +tensor)
+        if out is not None:
+            assert out.shape == shape, f"Output shape {tuple(out.shape)} must match the reshaped shape {tuple(shape)}."
+            assert not requires_grad(tensor), "The out argument does not support automatic differentiation."
+            if plan.merging_reorder:
+                for index, gather, scatter in plan.merging_reorder[:-1]:
+                    tensor = _reorder(tensor, self._batch + index, gather, scatter)
+                index, gather, _ = plan.merging_reorder[-1]
+                torch.index_select(tensor, self._batch + index, gather, out=out)
+            else:
+                out.copy_(tensor)
+            return GrassmannTensor._trusted(plan.arrow, plan.edges, out, batch=self._batch)
 
-        for index, reorder in merging_reorder:
-            tensor = tensor.index_select(index, reorder)
+        for index, gather, scatter in plan.merging_reorder:
+            tensor = _reorder(tensor, self._batch + index, gather, scatter)
 
-        return GrassmannTensor(_arrow=tuple(arrow), _edges=tuple(edges), _tensor=tensor)
+        if tensor.data_ptr() == self._tensor.data_ptr():
+            # Nothing has been copied, so copy it to avoid sharing memory with the original tensor.
+            tensor = tensor.clone()
+            record(allocated=tensor)
 
-    def matmul(self, other: GrassmannTensor) -> GrassmannTensor:
+        return GrassmannTensor._trusted(plan.arrow, plan.edges, tensor, batch=self._batch)
+
+    @measured("matmul")
+    def matmul(self, other: GrassmannTensor, *, out: torch.Tensor | None = None) -> GrassmannTensor:
         """
         Perform matrix multiplication with another Grassmann tensor.
         Both of them should be rank 2 tensors, except some pure even edges could exist before the last two edges.
+        The batch dimensions and the leading pure even edges are broadcast separately.
+
+        Only the (even, even) and (odd, odd) blocks of both matrices are allowed by parity, so only these blocks are multiplied,
+        and the elements forbidden by parity are treated as zeros.
+        The pending sign of both matrices is constant in each block, so it is applied to the product of the odd blocks.
+        If out is given, the result is written into it, and the returned tensor uses it as its data.
+
+        Under autograd, the block products are differentiated in block form too, saving only the two input matrices.
+        The products of the even and the odd blocks run concurrently if more than one block thread is set by set_block_threads.
         """
+        # pylint: disable=protected-access, too-many-branches, too-many-locals, too-many-statements
         # The creation operator order from arrow is (False True)
         # So (x, True) * (False, y) = (x, y)
         tensor_a = self
         tensor_b = other
 
-        vector_a = False
-        if tensor_a.tensor.dim() == 1:
-            tensor_a = tensor_a.reshape(((1, 0), -1))
-            vector_a = True
-        vector_b = False
-        if tensor_b.tensor.dim() == 1:
-            tensor_b = tensor_b.reshape((-1, (1, 0)))
-            vector_b = True
+        vector_a = len(tensor_a.edges) == 1
+        if vector_a:
+            tensor_a = tensor_a._insert_trivial_edge(0)
+        vector_b = len(tensor_b.edges) == 1
+        if vector_b:
+            tensor_b = tensor_b._insert_trivial_edge(1)
 
         assert all(odd == 0 for (even, odd) in tensor_a.edges[:-2]), f"All edges except the last two must be pure even. Got {tensor_a.edges[:-2]}."
         assert all(odd == 0 for (even, odd) in tensor_b.edges[:-2]), f"All edges except the last two must be pure even. Got {tensor_b.edges[:-2]}."
+        assert tensor_a.edges[-1] == tensor_b.edges[-2], f"Contracted edges must match. Got {tensor_a.edges[-1]} and {tensor_b.edges[-2]}."
 
         if tensor_a.arrow[-1] is not True:
-            tensor_a = tensor_a.reverse((tensor_a.tensor.dim() - 1,))
+            tensor_a = tensor_a.reverse((len(tensor_a.edges) - 1,))
         if tensor_b.arrow[-2] is not False:
-            tensor_b = tensor_b.reverse((tensor_b.tensor.dim() - 2,))
+            tensor_b = tensor_b.reverse((len(tensor_b.edges) - 2,))
 
-        broadcast_a = tensor_a.tensor.dim() - 2
-        broadcast_b = tensor_b.tensor.dim() - 2
+        broadcast_a = len(tensor_a.edges) - 2
+        broadcast_b = len(tensor_b.edges) - 2
 
         arrow = []
         edges = []
@@ -366,34 +429,365 @@ class GrassmannTensor:
         if not vector_b:
             arrow.append(tensor_b.arrow[-1])
             edges.append(tensor_b.edges[-1])
-        tensor = torch.matmul(tensor_a.tensor, tensor_b.tensor)
+        batch = max(tensor_a._batch, tensor_b._batch)
+        shape = _broadcast_shapes(tensor_a.batch_shape, tensor_b.batch_shape) + torch.Size([even + odd for even, odd in edges])
+        buffer = None
+        if out is not None:
+            assert out.shape == shape, f"Output shape {tuple(out.shape)} must match the product shape {tuple(shape)}."
+            buffer = out.unsqueeze(-1) if vector_b else out
+            buffer = buffer.unsqueeze(-2) if vector_a else buffer
+        data_a = tensor_a._aligned(batch, max(broadcast_a, broadcast_b))
+        data_b = tensor_b._aligned(batch, max(broadcast_a, broadcast_b))
+        sign = tensor_a._odd_block_sign() ^ tensor_b._odd_block_sign()
+        tensor = self._block_matmul(data_a, data_b, tensor_a.edges[-2], tensor_a.edges[-1], tensor_b.edges[-1], sign, buffer)
         if vector_a:
             tensor = tensor.squeeze(-2)
         if vector_b:
             tensor = tensor.squeeze(-1)
+        if out is not None:
+            tensor = out
+
+        return GrassmannTensor._trusted(tuple(arrow), tuple(edges), tensor, batch=batch)
+
+    def _insert_trivial_edge(self, index: int) -> GrassmannTensor:
+        # View the data with a pure even edge of dimension one inserted at the index, which gets no sign, so the pending sign is only shifted.
+        sign = None
+        if self._sign is not None:
+            singles, pairs = self._sign
+            sign = (tuple(i + (i >= index) for i in singles), tuple((i + (i >= index), j + (j >= index)) for i, j in pairs))
+        return GrassmannTensor._trusted(
+            self._arrow[:index] + (False,) + self._arrow[index:],
+            self._edges[:index] + ((1, 0),) + self._edges[index:],
+            self._tensor.unsqueeze(self._batch + index),
+            sign=sign,
+            batch=self._batch,
+        )
+
+    def _aligned(self, batch: int, leading: int) -> torch.Tensor:
+        # View the data with singleton dimensions inserted, to have the given numbers of batch dimensions and leading edges before the last two edges.
+        shape = [1] * (batch - self._batch) + list(self.batch_shape) + [1] * (leading - len(self._edges) + 2) + list(self._tensor.shape[self._batch:])
+        return self._tensor.reshape(shape)
+
+    def _odd_block_sign(self) -> bool:
+        # The pending sign of the (odd, odd) block of the last two edges, where all the other edges are pure even.
+        # The (even, even) block never gets a sign since all its parities are even.
+        singles, pairs = self._pending_sign(tuple(range(len(self._edges))))
+        dim = len(self._edges)
+        return (sum(i >= dim - 2 for i in singles) + ((dim - 2, dim - 1) in pairs)) % 2 == 1
+
+    def _block_matmul(
+        self,
+        tensor_a: torch.Tensor,
+        tensor_b: torch.Tensor,
+        edge_a: tuple[int, int],
+        edge_common: tuple[int, int],
+        edge_b: tuple[int, int],
+        sign: bool,
+        out: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        if requires_grad(tensor_a, tensor_b):
+            assert out is None, "The out argument does not support automatic differentiation."
+            return _BlockMatmul.apply(tensor_a, tensor_b, (edge_a, edge_common, edge_b), sign)
+        return _block_product(tensor_a, tensor_b, edge_a, edge_common, edge_b, sign, out)
+
+    @measured("tensordot")
+    def tensordot(self, other: GrassmannTensor, axes: int | tuple[tuple[int, ...], tuple[int, ...]]) -> GrassmannTensor:
+        """
+        Contract edges of this Grassmann tensor with edges of another Grassmann tensor.
+
+        The axes are either a pair of sequences of edges of both tensors to be contracted in order,
+        or an integer n to contract the last n edges of this tensor with the first n edges of the other one.
+        The result has the remaining edges of this tensor followed by the remaining edges of the other tensor.
 
-        return GrassmannTensor(
-            _arrow=tuple(arrow),
-            _edges=tuple(edges),
-            _tensor=tensor,
+        It is equivalent to permuting, reversing and merging the edges of both tensors, calling matmul and splitting the result,
+        but the signs of all these steps are combined and applied in a single pass over each tensor before a single contraction.
+        The batch dimensions of both tensors are broadcast.
+        """
+        # pylint: disable=protected-access, too-many-locals
+        if isinstance(axes, int):
+            axes_a = tuple(range(len(self._edges) - axes, len(self._edges)))
+            axes_b = tuple(range(axes))
+        else:
+            axes_a = tuple(axes[0])
+            axes_b = tuple(axes[1])
+        assert len(axes_a) == len(axes_b), f"The numbers of contracted edges must match. Got {axes_a} and {axes_b}."
+        assert len(set(axes_a)) == len(axes_a) and len(set(axes_b)) == len(axes_b), f"Contracted edges must be unique. Got {axes_a} and {axes_b}."
+        assert all(0 <= i < len(self.edges) for i in axes_a), f"Contracted edges must be within tensor dimensions. Got {axes_a}."
+        assert all(0 <= i < len(other.edges) for i in axes_b), f"Contracted edges must be within tensor dimensions. Got {axes_b}."
+        assert all(self.edges[i] == other.edges[j] for i, j in zip(axes_a, axes_b)), f"Contracted edges must match. Got {[self.edges[i] for i in axes_a]} and {[other.edges[j] for j in axes_b]}."
+
+        free_a = tuple(i for i in range(len(self.edges)) if i not in axes_a)
+        free_b = tuple(i for i in range(len(other.edges)) if i not in axes_b)
+        order_a = free_a + axes_a
+        order_b = axes_b + free_b
+        contract = range(len(axes_a))
+
+        # The tensor a is permuted to (free, contracted), its contracted edges are reversed to True without sign, and merged with sign.
+        # The tensor b is permuted to (contracted, free), its contracted edges are reversed to False with sign, and merged without sign.
+        # The merging and splitting of free edges cancel each other, so they are not needed.
+        # The pending signs of both tensors are applied in the same pass.
+        singles_a, pairs_a = self._pending_sign(order_a)
+        pairs_a ^= self._inversions(order_a) ^ {(len(free_a) + i, len(free_a) + j) for j in contract for i in range(0, j)}
+        singles_b, pairs_b = other._pending_sign(order_b)
+        pairs_b ^= self._inversions(order_b)
+        singles_b ^= {i for i in contract if other.arrow[axes_b[i]]}
+
+        edges_a = tuple(self.edges[i] for i in order_a)
+        edges_b = tuple(other.edges[i] for i in order_b)
+        tensor_a = apply_sign(self._tensor.permute(self._batch_order(order_a)), edges_a, tuple(sorted(singles_a)), tuple(sorted(pairs_a)), self._batch)
+        tensor_b = apply_sign(other._tensor.permute(other._batch_order(order_b)), edges_b, tuple(sorted(singles_b)), tuple(sorted(pairs_b)), other._batch)
+        common = functools.reduce(operator.mul, (even + odd for even, odd in edges_b[:len(axes_b)]), 1)
+        if self._batch == 0 and other._batch == 0:
+            tensor = torch.tensordot(tensor_a, tensor_b, dims=(list(range(len(free_a), len(self.edges))), list(contract)))
+        else:
+            # The batched contraction is a broadcast product of matrices, whose rows are the free edges of a and whose columns are the free edges of b.
+            shape_a = [even + odd for even, odd in edges_a[:len(free_a)]]
+            shape_b = [even + odd for even, odd in edges_b[len(axes_b):]]
+            matrix_a = tensor_a.reshape([*self.batch_shape, functools.reduce(operator.mul, shape_a, 1), common])
+            matrix_b = tensor_b.reshape([*other.batch_shape, common, functools.reduce(operator.mul, shape_b, 1)])
+            tensor = torch.matmul(matrix_a, matrix_b)
+            tensor = tensor.reshape([*tensor.shape[:-2], *shape_a, *shape_b])
+        record(flops=2 * tensor.numel() * common, allocated=tensor)
+
+        return GrassmannTensor._trusted(
+            tuple(self._arrow[i] for i in free_a) + tuple(other._arrow[i] for i in free_b),
+            tuple(self._edges[i] for i in free_a) + tuple(other._edges[i] for i in free_b),
+            tensor,
+            batch=max(self._batch, other._batch),
         )
 
+    @measured("trace")
+    def trace(self, pairs: tuple[tuple[int, int], ...]) -> GrassmannTensor:
+        """
+        Trace over the given pairs of edges, summing the diagonal of every pair, where both edges of a pair must be the same.
+
+        It is equivalent to tensordot contracting the first edges of the pairs with the second edges of the pairs, as if they belonged to two tensors.
+        So a pair with arrows (True, False) gives the ordinary trace, while the odd part of a pair whose second edge has arrow True is negated,
+        which gives the supertrace. The result has the remaining edges in their order, and the batch dimensions are kept.
+
+        Only the diagonal entries are read, as a view of the data, and all signs, including the pending sign, are applied to them in a single pass.
+        """
+        # pylint: disable=too-many-locals
+        axes_a = tuple(i for i, _ in pairs)
+        axes_b = tuple(j for _, j in pairs)
+        axes = axes_a + axes_b
+        assert len(set(axes)) == len(axes), f"Traced edges must be unique. Got {pairs}."
+        assert all(0 <= i < len(self._edges) for i in axes), f"Traced edges must be within tensor dimensions. Got {pairs}."
+        assert all(self._edges[i] == self._edges[j] for i, j in pairs), f"Traced edges must match. Got {[(self._edges[i], self._edges[j]) for i, j in pairs]}."
+        if not pairs:
+            return self
+
+        free = tuple(i for i in range(len(self._edges)) if i not in axes)
+        order = free + axes
+        count = len(pairs)
+        # The signs are those of tensordot, in terms of the edges ordered as (free, first edges, second edges).
+        singles, inversions = self._pending_sign(order)
+        inversions ^= self._inversions(order) ^ {(len(free) + i, len(free) + j) for j in range(count) for i in range(0, j)}
+        singles ^= {len(free) + count + k for k in range(count) if self._arrow[axes_b[k]]}
+
+        # Both edges of a pair become their diagonal, whose parity is the parity of either edge, and the product of both parities.
+        position = (*range(len(free) + count), *range(len(free), len(free) + count))
+        diagonal_singles: set[int] = set()
+        diagonal_pairs: set[tuple[int, int]] = set()
+        for i in singles:
+            diagonal_singles ^= {position[i]}
+        for i, j in inversions:
+            if position[i] == position[j]:
+                diagonal_singles ^= {position[i]}
+            else:
+                diagonal_pairs ^= {(min(position[i], position[j]), max(position[i], position[j]))}
+
+        tensor = self._tensor.permute(self._batch_order(order))
+        for k in range(count):
+            # Every diagonal is taken over the first remaining pair, and appended as the last dimension.
+            tensor = tensor.diagonal(dim1=self._batch + len(free), dim2=self._batch + len(free) + count - k)
+        edges = tuple(self._edges[i] for i in free + axes_a)
+        tensor = apply_sign(tensor, edges, tuple(sorted(diagonal_singles)), tuple(sorted(diagonal_pairs)), self._batch)
+        tensor = tensor.sum(tuple(range(tensor.dim() - count, tensor.dim())))
+        record(allocated=tensor)
+
+        return GrassmannTensor._trusted(
+            tuple(self._arrow[i] for i in free),
+            tuple(self._edges[i] for i in free),
+            tensor,
+            batch=self._batch,
+        )
+
+    @measured("inner")
+    def inner(self, other: GrassmannTensor) -> torch.Tensor:
+        """
+        Compute the inner product with another Grassmann tensor with the same arrow and edges, which is the sum of the products of their elements,
+        with the elements of this tensor conjugated. It is reduced over the edges, and the batch dimensions of both tensors are broadcast.
+
+        Only the sector blocks allowed by parity are read. The data of both tensors is read as stored, so a permuted tensor is not copied,
+        and their pending signs are combined into a single sign of every block, which is applied to the product of the block.
+        With more than SIGN_SPLIT_LIMIT edges split by parity, the product is taken over the whole data with a broadcast sign and parity instead.
+        """
+        # pylint: disable=protected-access
+        self._validate_edge_compatibility(other)
+        if self._many_sectors():
+            return self._reduce((self._tensor.conj() * other._tensor * self._relative_factor(other)).masked_fill(self._forbidden(), 0))
+        positive, negative = self._relative_sectors(other)
+        total = self._tensor.new_zeros(())
+        for index in positive:
+            total = total + self._reduce(self._block(index).conj() * other._block(index))
+        for index in negative:
+            total = total - self._reduce(self._block(index).conj() * other._block(index))
+        return total
+
+    @measured("norm")
+    def norm(self) -> torch.Tensor:
+        """
+        Compute the Frobenius norm of the Grassmann tensor, reduced over the edges and kept over the batch dimensions.
+        Only the sector blocks allowed by parity are read, and the pending sign is ignored, since it does not change the norm.
+        """
+        if self._many_sectors():
+            return self._reduce(self._tensor.abs().square().masked_fill(self._forbidden(), 0)).sqrt()
+        allowed, _ = parity_sectors(self._edges)
+        squares = functools.reduce(operator.add, (self._reduce(self._block(index).abs().square()) for index in allowed), self._tensor.new_zeros(()).real)
+        return squares.sqrt()
+
+    @measured("allclose")
+    def allclose(self, other: GrassmannTensor, rtol: float = 1e-05, atol: float = 1e-08, equal_nan: bool = False) -> bool:
+        """
+        Check whether the elements of this Grassmann tensor are close to those of another one with the same arrow and edges, see torch.allclose.
+        Only the sector blocks allowed by parity are compared, and the data of both tensors is read as stored,
+        with their pending signs combined into a single sign of every block, which negates the block of the other tensor where needed.
+        With more than SIGN_SPLIT_LIMIT edges split by parity, the whole data is compared with a broadcast sign and parity instead.
+        """
+        # pylint: disable=protected-access
+        self._validate_edge_compatibility(other)
+        if self._many_sectors():
+            forbidden = self._forbidden()
+            signed = (other._tensor * self._relative_factor(other)).masked_fill(forbidden, 0)
+            return torch.allclose(self._tensor.masked_fill(forbidden, 0), signed, rtol=rtol, atol=atol, equal_nan=equal_nan)
+        positive, negative = self._relative_sectors(other)
+        for index in positive:
+            if not torch.allclose(self._block(index), other._block(index), rtol=rtol, atol=atol, equal_nan=equal_nan):
+                return False
+        for index in negative:
+            if not torch.allclose(self._block(index), -other._block(index), rtol=rtol, atol=atol, equal_nan=equal_nan):
+                return False
+        return True
+
+    def _block(self, index: tuple[slice, ...]) -> torch.Tensor:
+        # The block of the stored data selected by the index of slices of the edges, without applying the pending sign.
+        return self._tensor[(slice(None),) * self._batch + index]
+
+    def _reduce(self, tensor: torch.Tensor) -> torch.Tensor:
+        # Sum over the trailing dimensions of the edges, keeping the broadcast batch dimensions.
+        rank = len(self._edges)
+        return tensor.sum(tuple(range(tensor.dim() - rank, tensor.dim()))) if rank != 0 else tensor
+
+    def _many_sectors(self) -> bool:
+        # Whether the edges split by parity are too many to go through the sector blocks allowed by parity one by one.
+        return split_edges(self._edges, tuple(range(len(self._edges))), ()) > SIGN_SPLIT_LIMIT
+
+    def _relative_sign(self, other: GrassmannTensor) -> tuple[tuple[int, ...], tuple[tuple[int, int], ...]]:
+        # The singles and the pairs of the sign where the pending signs of both tensors differ.
+        # pylint: disable=protected-access
+        identity = tuple(range(len(self._edges)))
+        singles_a, pairs_a = self._pending_sign(identity)
+        singles_b, pairs_b = other._pending_sign(identity)
+        return tuple(sorted(singles_a ^ singles_b)), tuple(sorted(pairs_a ^ pairs_b))
+
+    def _relative_sectors(self, other: GrassmannTensor) -> tuple[tuple[tuple[slice, ...], ...], tuple[tuple[slice, ...], ...]]:
+        # The sector blocks allowed by parity where the pending signs of both tensors agree and where they differ.
+        return allowed_sign_sectors(self._edges, *self._relative_sign(other))
+
+    def _relative_factor(self, other: GrassmannTensor) -> torch.Tensor:
+        # The relative sign of both tensors as a broadcast tensor of 1 and -1.
+        return 1 - 2 * sign_mask(self._edges, *self._relative_sign(other), self._tensor.device).to(self._tensor.dtype)
+
+    def _batch_order(self, before_by_after: tuple[int, ...]) -> tuple[int, ...]:
+        # The permutation of the data, which keeps the batch dimensions in front.
+        return tuple(range(self._batch)) + tuple(self._batch + i for i in before_by_after)
+
+    def _pending_sign(self, before_by_after: tuple[int, ...]) -> tuple[set[int], set[tuple[int, int]]]:
+        # The singles and the pairs of the pending sign, in terms of the edges permuted by before_by_after.
+        if self._sign is None:
+            return set(), set()
+        after_by_before = {before: after for after, before in enumerate(before_by_after)}
+        singles, pairs = self._sign
+        return {after_by_before[i] for i in singles}, {(min(after_by_before[i], after_by_before[j]), max(after_by_before[i], after_by_before[j])) for i, j in pairs}
+
+    def _materialize(self) -> torch.Tensor:
+        if self._sign is not None:
+            self._apply_pending_sign()
+        return self._tensor
+
+    def _exclusive(self) -> torch.Tensor:
+        # The data, made exclusive to this tensor before it could be updated in place.
+        # Applying the pending sign already copies the data, and the data which lazy results alive still view is copied.
+        if self._sign is not None:
+            self._apply_pending_sign()
+        elif self._viewed():
+            self._tensor = self._tensor.clone()
+            self._views = None
+            record(allocated=self._tensor)
+        return self._tensor
+
+    @measured("materialize")
+    def _apply_pending_sign(self) -> None:
+        # Apply the pending sign, which also copies the data to not share memory with the tensor it was viewed from.
+        assert self._sign is not None
+        singles, pairs = self._sign
+        tensor = apply_sign(self._tensor, self._edges, singles, pairs, self._batch)
+        if tensor is self._tensor:
+            tensor = tensor.clone()
+            record(allocated=tensor)
+        self._tensor = tensor
+        self._sign = None
+        self._views = None
+
+    def _inversions(self, before_by_after: tuple[int, ...]) -> set[tuple[int, int]]:
+        return {(i, j) for j in range(len(before_by_after)) for i in range(0, j) if before_by_after[i] > before_by_after[j]}
+
+    @classmethod
+    def _trusted(
+        cls,
+        arrow: tuple[bool, ...],
+        edges: tuple[tuple[int, int], ...],
+        tensor: torch.Tensor,
+        parity: tuple[torch.Tensor, ...] | None = None,
+        sign: tuple[tuple[int, ...], tuple[tuple[int, int], ...]] | None = None,
+        batch: int = 0,
+    ) -> GrassmannTensor:
+        # Build a tensor from fields known to be consistent, such as the results of the operations, skipping __post_init__.
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        result = object.__new__(cls)
+        result._arrow, result._edges, result._tensor = arrow, edges, tensor
+        result._parity, result._sign, result._batch = parity, sign, batch
+        result._views = None
+        return result
+
+    def _with_tensor(self, tensor: torch.Tensor) -> GrassmannTensor:
+        # Build a result with the same structure and new data, which is trusted only if the data keeps the shape of the edges.
+        if tensor.dim() != self._tensor.dim() or tensor.shape[self._batch:] != self._tensor.shape[self._batch:]:
+            return dataclasses.replace(self, _tensor=tensor)
+        return GrassmannTensor._trusted(self._arrow, self._edges, tensor, self._parity, self._sign, self._batch)
+
     def __post_init__(self) -> None:
-        assert len(self._arrow) == self._tensor.dim(), f"Arrow length ({len(self._arrow)}) must match tensor dimensions ({self._tensor.dim()})."
-        assert len(self._edges) == self._tensor.dim(), f"Edges length ({len(self._edges)}) must match tensor dimensions ({self._tensor.dim()})."
-        for dim, (even, odd) in zip(self._tensor.shape, self._edges):
+        if not _validation:
+            return
+        assert 0 <= self._batch <= self._tensor.dim(), f"Batch dimensions ({self._batch}) must be within tensor dimensions ({self._tensor.dim()})."
+        rank = self._tensor.dim() - self._batch
+        assert len(self._arrow) == rank, f"Arrow length ({len(self._arrow)}) must match tensor dimensions ({rank})."
+        assert len(self._edges) == rank, f"Edges length ({len(self._edges)}) must match tensor dimensions ({rank})."
+        for dim, (even, odd) in zip(self._tensor.shape[self._batch:], self._edges):
             assert even >= 0 and odd >= 0 and dim == even + odd, f"Dimension {dim} must equal sum of even ({even}) and odd ({odd}) parts, and both must be non-negative."
 
     def _unsqueeze(self, tensor: torch.Tensor, index: int, dim: int) -> torch.Tensor:
         return tensor.view([-1 if i == index else 1 for i in range(dim)])
 
     def _edge_mask(self, even: int, odd: int) -> torch.Tensor:
-        return torch.cat([torch.zeros(even, dtype=torch.bool, device=self.tensor.device), torch.ones(odd, dtype=torch.bool, device=self.tensor.device)])
+        return torch.cat([torch.zeros(even, dtype=torch.bool, device=self._tensor.device), torch.ones(odd, dtype=torch.bool, device=self._tensor.device)])
 
     def _tensor_mask(self) -> torch.Tensor:
         return functools.reduce(
             torch.logical_xor,
-            (self._unsqueeze(parity, index, self._tensor.dim()) for index, parity in enumerate(self.parity)),
+            (self._unsqueeze(parity, self._batch + index, self._tensor.dim()) for index, parity in enumerate(self.parity)),
             torch.zeros_like(self._tensor, dtype=torch.bool),
         )
 
@@ -401,56 +795,50 @@ class GrassmannTensor:
         """
         Validate that the edges of two ParityTensor instances are compatible for arithmetic operations.
         """
+        # pylint: disable=protected-access
+        if not _validation:
+            return
         assert self._arrow == other.arrow, f"Arrows must match for arithmetic operations. Got {self._arrow} and {other.arrow}."
         assert self._edges == other.edges, f"Edges must match for arithmetic operations. Got {self._edges} and {other.edges}."
+        assert self._batch == other._batch, f"Numbers of batch dimensions must match for arithmetic operations. Got {self._batch} and {other._batch}."
 
     def __pos__(self) -> GrassmannTensor:
-        return dataclasses.replace(
-            self,
-            _tensor=+self._tensor,
-        )
+        return self._with_tensor(+self._tensor)
 
     def __neg__(self) -> GrassmannTensor:
-        return dataclasses.replace(
-            self,
-            _tensor=-self._tensor,
-        )
+        return self._with_tensor(-self._tensor)
 
+    @measured("add")
     def __add__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            return dataclasses.replace(
-                self,
-                _tensor=self._tensor + other._tensor,
-            )
+            return self._with_tensor(self._materialize() + other._materialize())
         try:
-            result = self._tensor + other
+            result = self._materialize() + other
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("radd")
     def __radd__(self, other: typing.Any) -> GrassmannTensor:
         try:
-            result = other + self._tensor
+            result = other + self._materialize()
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("iadd")
     def __iadd__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            self._tensor += other._tensor
+            self._exclusive()
+            self._tensor += other._materialize()
             return self
+        self._exclusive()
         try:
             self._tensor += other
         except TypeError:
@@ -459,41 +847,37 @@ class GrassmannTensor:
             return self
         return NotImplemented
 
+    @measured("sub")
     def __sub__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            return dataclasses.replace(
-                self,
-                _tensor=self._tensor - other._tensor,
-            )
+            return self._with_tensor(self._materialize() - other._materialize())
         try:
-            result = self._tensor - other
+            result = self._materialize() - other
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("rsub")
     def __rsub__(self, other: typing.Any) -> GrassmannTensor:
         try:
-            result = other - self._tensor
+            result = other - self._materialize()
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("isub")
     def __isub__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            self._tensor -= other._tensor
+            self._exclusive()
+            self._tensor -= other._materialize()
             return self
+        self._exclusive()
         try:
             self._tensor -= other
         except TypeError:
@@ -502,41 +886,37 @@ class GrassmannTensor:
             return self
         return NotImplemented
 
+    @measured("mul")
     def __mul__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            return dataclasses.replace(
-                self,
-                _tensor=self._tensor * other._tensor,
-            )
+            return self._with_tensor(self._materialize() * other._materialize())
         try:
-            result = self._tensor * other
+            result = self._materialize() * other
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("rmul")
     def __rmul__(self, other: typing.Any) -> GrassmannTensor:
         try:
-            result = other * self._tensor
+            result = other * self._materialize()
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("imul")
     def __imul__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            self._tensor *= other._tensor
+            self._exclusive()
+            self._tensor *= other._materialize()
             return self
+        self._exclusive()
         try:
             self._tensor *= other
         except TypeError:
@@ -545,41 +925,37 @@ class GrassmannTensor:
             return self
         return NotImplemented
 
+    @measured("truediv")
     def __truediv__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            return dataclasses.replace(
-                self,
-                _tensor=self._tensor / other._tensor,
-            )
+            return self._with_tensor(self._materialize() / other._materialize())
         try:
-            result = self._tensor / other
+            result = self._materialize() / other
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("rtruediv")
     def __rtruediv__(self, other: typing.Any) -> GrassmannTensor:
         try:
-            result = other / self._tensor
+            result = other / self._materialize()
         except TypeError:
             return NotImplemented
         if isinstance(result, torch.Tensor):
-            return dataclasses.replace(
-                self,
-                _tensor=result,
-            )
+            return self._with_tensor(result)
         return NotImplemented
 
+    @measured("itruediv")
     def __itruediv__(self, other: typing.Any) -> GrassmannTensor:
         if isinstance(other, GrassmannTensor):
             self._validate_edge_compatibility(other)
-            self._tensor /= other._tensor
+            self._exclusive()
+            self._tensor /= other._materialize()
             return self
+        self._exclusive()
         try:
             self._tensor /= other
         except TypeError:
@@ -588,19 +964,121 @@ class GrassmannTensor:
             return self
         return NotImplemented
 
+    @measured("clone")
     def clone(self) -> GrassmannTensor:
         """
         Create a deep copy of the Grassmann tensor.
         """
-        return dataclasses.replace(
-            self,
-            _tensor=self._tensor.clone(),
-            _parity=tuple(parity.clone() for parity in self._parity) if self._parity is not None else None,
-            _mask=self._mask.clone() if self._mask is not None else None,
-        )
+        parity = tuple(parity.clone() for parity in self._parity) if self._parity is not None else None
+        return GrassmannTensor._trusted(self._arrow, self._edges, self._tensor.clone(), parity, self._sign, self._batch)
 
     def __copy__(self) -> GrassmannTensor:
         return self.clone()
 
     def __deepcopy__(self, memo: dict) -> GrassmannTensor:
         return self.clone()
+
+
+def _reorder(tensor: torch.Tensor, dim: int, gather: torch.Tensor, scatter: torch.Tensor) -> torch.Tensor:
+    # Gather a dimension by a permutation, where scatter is the inverse permutation.
+    if requires_grad(tensor):
+        result = _Reorder.apply(tensor, dim, gather, scatter)
+    else:
+        result = tensor.index_select(dim, gather)
+    record(allocated=result)
+    return result
+
+
+class _Reorder(torch.autograd.Function):  # pylint: disable=abstract-method
+    # The backward of a permutation gathers the gradient by the inverse permutation, so only the indices shared with the reshape plan are kept.
+    # pylint: disable=arguments-differ, missing-function-docstring
+
+    @staticmethod
+    def forward(ctx: typing.Any, tensor: torch.Tensor, dim: int, gather: torch.Tensor, scatter: torch.Tensor) -> torch.Tensor:
+        ctx.dim, ctx.scatter = dim, scatter
+        return tensor.index_select(dim, gather)
+
+    @staticmethod
+    def backward(ctx: typing.Any, grad: torch.Tensor) -> tuple[torch.Tensor | None, ...]:
+        return grad.index_select(ctx.dim, ctx.scatter), None, None, None
+
+
+class _BlockMatmul(torch.autograd.Function):  # pylint: disable=abstract-method
+    # The gradients of a block diagonal product are block diagonal products too, with the same sign on the odd blocks.
+    # Only the two input matrices are saved, and no mask or intermediate block is kept for backward.
+    # pylint: disable=arguments-differ, missing-function-docstring
+
+    @staticmethod
+    def forward(
+        ctx: typing.Any,
+        tensor_a: torch.Tensor,
+        tensor_b: torch.Tensor,
+        edges: tuple[tuple[int, int], tuple[int, int], tuple[int, int]],
+        sign: bool,
+    ) -> torch.Tensor:
+        ctx.save_for_backward(tensor_a, tensor_b)
+        ctx.edges, ctx.sign = edges, sign
+        return _block_product(tensor_a, tensor_b, *edges, sign)
+
+    @staticmethod
+    def backward(ctx: typing.Any, grad: torch.Tensor) -> tuple[torch.Tensor | None, ...]:
+        tensor_a, tensor_b = ctx.saved_tensors
+        edge_a, edge_common, edge_b = ctx.edges
+        grad_a = grad_b = None
+        if ctx.needs_input_grad[0]:
+            grad_a = _block_product(grad, tensor_b.mH, edge_a, edge_b, edge_common, ctx.sign).sum_to_size(tensor_a.shape)
+        if ctx.needs_input_grad[1]:
+            grad_b = _block_product(tensor_a.mH, grad, edge_common, edge_a, edge_b, ctx.sign).sum_to_size(tensor_b.shape)
+        return grad_a, grad_b, None, None
+
+
+def _block_product(
+    tensor_a: torch.Tensor,
+    tensor_b: torch.Tensor,
+    edge_a: tuple[int, int],
+    edge_common: tuple[int, int],
+    edge_b: tuple[int, int],
+    sign: bool,
+    out: torch.Tensor | None = None,
+) -> torch.Tensor:
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    (even_a, odd_a), (even_common, odd_common), (even_b, odd_b) = edge_a, edge_common, edge_b
+    if out is not None:
+        # Only the blocks forbidden by parity need to be cleared, since the allowed blocks are overwritten.
+        out[..., :even_a, even_b:].zero_()
+        out[..., even_a:, :even_b].zero_()
+    if (even_a, even_common, even_b) == (odd_a, odd_common, odd_b):
+        # Both blocks have the same shape, so they are multiplied by a single batched product over the block diagonal views.
+        blocks = torch.matmul(_diagonal_blocks(tensor_a, even_a, even_common), _diagonal_blocks(tensor_b, even_common, even_b))
+        if sign:
+            blocks[..., 1, :, :].neg_()
+        tensor = out if out is not None else blocks.new_zeros([*blocks.shape[:-3], even_a + odd_a, even_b + odd_b])
+        _diagonal_blocks(tensor, even_a, even_b).copy_(blocks)
+        record(flops=2 * blocks.numel() * even_common, allocated=blocks)
+        if out is None:
+            record(allocated=tensor)
+        return tensor
+    even, odd = run_blocks([
+        (even_a * even_common * even_b, functools.partial(torch.matmul, tensor_a[..., :even_a, :even_common], tensor_b[..., :even_common, :even_b])),
+        (odd_a * odd_common * odd_b, functools.partial(torch.matmul, tensor_a[..., even_a:, even_common:], tensor_b[..., even_common:, even_b:])),
+    ])
+    if sign:
+        odd.neg_()
+    tensor = out if out is not None else even.new_zeros([*even.shape[:-2], even_a + odd_a, even_b + odd_b])
+    tensor[..., :even_a, :even_b] = even
+    tensor[..., even_a:, even_b:] = odd
+    record(flops=2 * (even.numel() * even_common + odd.numel() * odd_common), allocated=even)
+    record(allocated=odd)
+    if out is None:
+        record(allocated=tensor)
+    return tensor
+
+
+def _diagonal_blocks(tensor: torch.Tensor, even_row: int, even_column: int) -> torch.Tensor:
+    # View a matrix made of two diagonal blocks with the same shape as a batch of these two blocks in the third last dimension.
+    return torch.unflatten(torch.unflatten(tensor, -1, (2, even_column)), -3, (2, even_row)).diagonal(dim1=-4, dim2=-2).movedim(-1, -3)
+
+
+def _broadcast_shapes(*shapes: torch.Size) -> torch.Size:
+    # A typed wrapper of torch.broadcast_shapes, which is not annotated.
+    return typing.cast(typing.Callable[..., torch.Size], torch.broadcast_shapes)(*shapes)
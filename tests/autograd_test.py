@@ -0,0 +1,71 @@
+import typing
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+
+
+def leaf(edges: tuple[tuple[int, int], ...], batch: tuple[int, ...] = ()) -> torch.Tensor:
+    data = torch.randn([*batch, *(even + odd for even, odd in edges)], dtype=torch.float64)
+    return GrassmannTensor(tuple(False for _ in edges), edges, data, _batch=len(batch)).update_mask().tensor.requires_grad_()
+
+
+def count_saved(function: typing.Callable[[], torch.Tensor]) -> int:
+    saved: list[torch.Tensor] = []
+
+    def pack(tensor: torch.Tensor) -> torch.Tensor:
+        saved.append(tensor)
+        return tensor
+
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+        function()
+    return len(saved)
+
+
+@pytest.mark.parametrize("arrow", [(False, True, True), (True, True, False)])
+@pytest.mark.parametrize("permutation", [(2, 0, 1), (1, 0, 2)])
+@pytest.mark.parametrize("indices", [(), (0, 1)])
+def test_permute_reverse_gradient(arrow: tuple[bool, ...], permutation: tuple[int, ...], indices: tuple[int, ...]) -> None:
+    edges = ((2, 2), (1, 3), (2, 1))
+    x = leaf(edges)
+    assert torch.autograd.gradcheck(lambda x: GrassmannTensor(arrow, edges, x).reverse(indices).permute(permutation).tensor, (x,))
+    assert count_saved(lambda: GrassmannTensor(arrow, edges, x).reverse(indices).permute(permutation).tensor) == 0
+
+
+@pytest.mark.parametrize("new_shape", [(16, -1), (-1, (1, 1), (1, 1), -1)])
+def test_reshape_gradient(new_shape: tuple[int | tuple[int, int], ...]) -> None:
+    edges = ((2, 2), (1, 3), (2, 1))
+    x = leaf(edges)
+    assert torch.autograd.gradcheck(lambda x: GrassmannTensor((True, True, False), edges, x).permute((1, 0, 2)).reshape(new_shape).tensor, (x,))
+    assert count_saved(lambda: GrassmannTensor((True, True, False), edges, x).permute((1, 0, 2)).reshape(new_shape).tensor) == 0
+
+
+@pytest.mark.parametrize("edge_a, edge_common, edge_b", [((2, 2), (3, 3), (1, 1)), ((2, 1), (1, 3), (2, 2))])
+@pytest.mark.parametrize("batch_a, batch_b", [((), ()), ((3,), ()), ((3, 1), (2,))])
+def test_matmul_gradient(
+    edge_a: tuple[int, int],
+    edge_common: tuple[int, int],
+    edge_b: tuple[int, int],
+    batch_a: tuple[int, ...],
+    batch_b: tuple[int, ...],
+) -> None:
+    x = leaf((edge_a, edge_common), batch_a)
+    y = leaf((edge_common, edge_b), batch_b)
+
+    def product(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+        a = GrassmannTensor((False, True), (edge_a, edge_common), x, _batch=len(batch_a)).reverse((0,))
+        b = GrassmannTensor((False, True), (edge_common, edge_b), y, _batch=len(batch_b)).permute((1, 0)).reverse((0, 1)).permute((1, 0))
+        return a.matmul(b).tensor
+
+    assert torch.autograd.gradcheck(product, (x, y))
+    assert count_saved(lambda: product(x, y)) == 2
+    with pytest.raises(AssertionError, match="automatic differentiation"):
+        a = GrassmannTensor((False, True), (edge_a, edge_common), x, _batch=len(batch_a))
+        b = GrassmannTensor((False, True), (edge_common, edge_b), y, _batch=len(batch_b))
+        a.matmul(b, out=torch.empty(a.matmul(b).tensor.shape, dtype=torch.float64))
+
+
+def test_complex_matmul_gradient() -> None:
+    edges = ((2, 2), (1, 3))
+    x = leaf(edges).detach().to(torch.complex128).requires_grad_()
+    y = leaf(tuple(reversed(edges))).detach().to(torch.complex128).requires_grad_()
+    assert torch.autograd.gradcheck(lambda x, y: GrassmannTensor((False, True), edges, x).matmul(GrassmannTensor((False, True), edges[::-1], y)).tensor, (x, y))
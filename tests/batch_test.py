@@ -0,0 +1,58 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+BATCH = 3
+
+
+def sample(tensor: GrassmannTensor, index: int) -> GrassmannTensor:
+    return GrassmannTensor(tensor.arrow, tensor.edges, tensor.tensor[index])
+
+
+def test_batch_attributes() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)), (5, 2))
+    assert a.batch_shape == torch.Size([5, 2])
+    assert a.mask.shape == torch.Size([5, 2, 4, 4])
+    assert torch.equal(a.mask[1, 0], GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.zeros([4, 4])).mask)
+    with pytest.raises(AssertionError, match="Batch dimensions"):
+        GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.zeros([4, 4]), _batch=3)
+    with pytest.raises(AssertionError, match="Arrow length"):
+        GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.zeros([4, 4]), _batch=1)
+
+
+@pytest.mark.parametrize("permutation", [(2, 0, 1), (1, 2, 0)])
+@pytest.mark.parametrize("indices", [(), (0,), (1, 2)])
+def test_batch_permute_reverse(permutation: tuple[int, int, int], indices: tuple[int, ...]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), (BATCH,))
+    b = a.reverse(indices).permute(permutation)
+    assert b.batch_shape == a.batch_shape
+    for i in range(BATCH):
+        assert torch.allclose(b.tensor[i], sample(a, i).reverse(indices).permute(permutation).tensor)
+
+
+@pytest.mark.parametrize("new_shape", [(16, -1), (-1, (1, 1), (1, 1), -1)])
+def test_batch_reshape(new_shape: tuple[int | tuple[int, int], ...]) -> None:
+    a = random_tensor((True, True, False), ((2, 2), (1, 3), (2, 1)), (BATCH,)).permute((1, 0, 2))
+    b = a.reshape(new_shape)
+    assert b.batch_shape == a.batch_shape
+    for i in range(BATCH):
+        assert torch.allclose(b.tensor[i], sample(a, i).reshape(new_shape).tensor)
+
+
+def test_batch_matmul() -> None:
+    a = random_tensor((True, False), ((2, 2), (1, 3)), (BATCH,))
+    b = random_tensor((True, True), ((1, 3), (3, 1)), (1,))
+    c = a.matmul(b)
+    assert c.batch_shape == torch.Size([BATCH])
+    for i in range(BATCH):
+        assert torch.allclose(c.tensor[i], sample(a, i).matmul(sample(b, 0)).tensor)
+
+
+def test_batch_tensordot() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), (BATCH,))
+    b = random_tensor((False, False, True), ((2, 1), (1, 3), (2, 2)), (BATCH,))
+    c = a.tensordot(b, ((1, 2), (1, 0)))
+    assert c.batch_shape == torch.Size([BATCH])
+    for i in range(BATCH):
+        assert torch.allclose(c.tensor[i], sample(a, i).tensordot(sample(b, i), ((1, 2), (1, 0))).tensor)
@@ -0,0 +1,88 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, BlockGrassmannTensor
+from .helpers import random_tensor
+
+
+@pytest.fixture(params=[
+    ((False, True, True, False), ((2, 2), (1, 3), (2, 1), (1, 1))),
+    ((True, True, False), ((1, 1), (2, 0), (0, 3))),
+    ((False,), ((2, 3),)),
+])
+def x(request: pytest.FixtureRequest) -> GrassmannTensor:
+    return random_tensor(*request.param)
+
+
+def test_block_round_trip(x: GrassmannTensor) -> None:
+    block = BlockGrassmannTensor.from_dense(x)
+    assert len(block.blocks) == 2**(len(x.edges) - 1)
+    y = block.to_dense()
+    assert y.arrow == x.arrow
+    assert y.edges == x.edges
+    assert torch.equal(y.tensor, x.tensor)
+
+
+def test_block_permute(x: GrassmannTensor) -> None:
+    before_by_after = tuple(reversed(range(len(x.edges))))
+    result = BlockGrassmannTensor.from_dense(x).permute(before_by_after).to_dense()
+    expected = x.permute(before_by_after)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+def test_block_reverse(x: GrassmannTensor) -> None:
+    indices = tuple(range(0, len(x.edges), 2))
+    result = BlockGrassmannTensor.from_dense(x).reverse(indices).to_dense()
+    expected = x.reverse(indices)
+    assert result.arrow == expected.arrow
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+@pytest.mark.parametrize("arrow", [(i, j, k, l, m) for i in [False, True] for j in [False, True] for k in [False, True] for l in [False, True] for m in [False, True]])
+@pytest.mark.parametrize("plan_range", [(i, j) for i in range(5) for j in range(5) if j > i])
+def test_block_reshape(arrow: tuple[bool, ...], plan_range: tuple[int, int]) -> None:
+    l, h = plan_range
+    if not all(arrow[l:h]) and any(arrow[l:h]):
+        pytest.skip("Invalid reshape plan for the given arrow configuration.")
+    a = random_tensor(arrow, ((2, 2), (1, 2), (2, 1), (1, 1), (2, 2)))
+    plan = tuple([-1] * l + [a.tensor.shape[l:h].numel()] + [-1] * (5 - h))
+    merged = BlockGrassmannTensor.from_dense(a).reshape(plan)
+    expected = a.reshape(plan)
+    assert merged.edges == expected.edges
+    assert torch.allclose(merged.to_dense().tensor, expected.tensor)
+    split = merged.reshape(a.edges)
+    assert split.edges == a.edges
+    assert torch.allclose(split.to_dense().tensor, a.tensor)
+
+
+@pytest.mark.parametrize("arrow_a", [False, True])
+@pytest.mark.parametrize("arrow_b", [False, True])
+@pytest.mark.parametrize("arrow_common", [False, True])
+def test_block_matmul(arrow_a: bool, arrow_b: bool, arrow_common: bool) -> None:
+    a = random_tensor((False, arrow_a, arrow_common), ((3, 0), (2, 1), (2, 3)))
+    b = random_tensor((not arrow_common, arrow_b), ((2, 3), (1, 2)))
+    result = BlockGrassmannTensor.from_dense(a).matmul(BlockGrassmannTensor.from_dense(b)).to_dense()
+    expected = a.matmul(b)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor, atol=1e-6)
+
+
+def test_block_arithmetic(x: GrassmannTensor) -> None:
+    y = random_tensor(x.arrow, x.edges)
+    block_x = BlockGrassmannTensor.from_dense(x)
+    block_y = BlockGrassmannTensor.from_dense(y)
+    assert torch.allclose((block_x + block_y).to_dense().tensor, (x + y).tensor)
+    assert torch.allclose((block_x - block_y).to_dense().tensor, (x - y).tensor)
+    assert torch.allclose((block_x * 2).to_dense().tensor, (x * 2).tensor)
+    assert torch.allclose((2 * block_x).to_dense().tensor, (2 * x).tensor)
+    assert torch.allclose((-block_x).to_dense().tensor, (-x).tensor)
+    block_z = block_x.clone()
+    block_z += block_y
+    assert torch.allclose(block_z.to_dense().tensor, (x + y).tensor)
+    assert torch.allclose(block_x.to_dense().tensor, x.tensor)
+    with pytest.raises(TypeError):
+        block_x + "string"
+    with pytest.raises(AssertionError):
+        block_x + BlockGrassmannTensor.from_dense(random_tensor(tuple(not arrow for arrow in x.arrow), x.edges))
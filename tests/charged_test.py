@@ -0,0 +1,157 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, ChargedGrassmannTensor, fuse_edges, fusion_order, parity_edge
+from .helpers import random_tensor
+
+# Particle number edges, with moduli (0,).
+N_A = (((0,), 2), ((1,), 2), ((2,), 1))
+N_B = (((0,), 1), ((1,), 3))
+# Parity and twice Sz edges, with moduli (2, 0).
+S_A = (((0, 0), 2), ((1, 1), 1), ((1, -1), 2), ((0, 2), 1))
+S_B = (((0, 0), 1), ((1, 1), 2), ((1, -1), 1))
+
+
+def dual(edge: tuple[tuple[tuple[int, ...], int], ...], moduli: tuple[int, ...]) -> tuple[tuple[tuple[int, ...], int], ...]:
+    return tuple((tuple(-value % modulus if modulus else -value for value, modulus in zip(charge, moduli)), dim) for charge, dim in edge)
+
+
+def random_charged(arrow: tuple[bool, ...], edges: tuple[tuple[tuple[tuple[int, ...], int], ...], ...], moduli: tuple[int, ...]) -> ChargedGrassmannTensor:
+    return ChargedGrassmannTensor.from_dense(random_tensor(arrow, tuple(parity_edge(edge) for edge in edges)), edges, moduli)
+
+
+@pytest.fixture(params=[
+    ((False, True, True), (N_A, N_B, N_A), (0,)),
+    ((True, False, True, False), (N_B, N_A, N_A, N_B), (0,)),
+    ((False, True, True), (S_A, S_B, S_A), (2, 0)),
+])
+def x(request: pytest.FixtureRequest) -> ChargedGrassmannTensor:
+    return random_charged(*request.param)
+
+
+def test_charged_round_trip(x: ChargedGrassmannTensor) -> None:
+    dense = x.to_dense()
+    assert dense.edges == x.parity_edges
+    # Only the blocks conserving the charges are stored, which are fewer than the blocks allowed by parity.
+    assert sum(block.numel() for block in x.blocks.values()) < dense.tensor.numel() // 2
+    y = ChargedGrassmannTensor.from_dense(dense, x.edges, x.moduli)
+    assert torch.equal(y.to_dense().tensor, dense.tensor)
+
+
+def test_charged_permute_reverse(x: ChargedGrassmannTensor) -> None:
+    before_by_after = tuple(reversed(range(len(x.edges))))
+    indices = tuple(range(0, len(x.edges), 2))
+    result = x.permute(before_by_after).reverse(indices)
+    expected = x.to_dense().permute(before_by_after).reverse(indices)
+    assert result.arrow == expected.arrow
+    assert result.parity_edges == expected.edges
+    assert torch.allclose(result.to_dense().tensor, expected.tensor)
+
+
+def test_charged_arithmetic(x: ChargedGrassmannTensor) -> None:
+    y = random_charged(x.arrow, x.edges, x.moduli)
+    dense_x = x.to_dense().tensor
+    dense_y = y.to_dense().tensor
+    assert torch.allclose((x + y).to_dense().tensor, dense_x + dense_y)
+    assert torch.allclose((x - y).to_dense().tensor, dense_x - dense_y)
+    assert torch.allclose((x * y).to_dense().tensor, dense_x * dense_y)
+    assert torch.equal((+x).to_dense().tensor, dense_x)
+    # Scalars apply to the stored blocks only, so the elements not conserving the charges stay zero.
+    for result, expected in [(2 + x, 2 + dense_x), (2 - x, 2 - dense_x), (2 * x, 2 * dense_x), (x / 2, dense_x / 2)]:
+        assert torch.allclose(result.to_dense().tensor, ChargedGrassmannTensor.from_dense(GrassmannTensor(x.arrow, x.parity_edges, expected), x.edges, x.moduli).to_dense().tensor)
+
+
+def test_charged_inplace(x: ChargedGrassmannTensor) -> None:
+    y = random_charged(x.arrow, x.edges, x.moduli)
+    before_by_after = tuple(reversed(range(len(x.edges))))
+    expected = x.to_dense().tensor.clone()
+    # The permuted blocks are views of the blocks of x, which the in-place operators must not modify.
+    z = x.permute(before_by_after)
+    z += y.permute(before_by_after)
+    z -= y.permute(before_by_after)
+    z *= 2
+    z /= 2
+    assert torch.equal(x.to_dense().tensor, expected)
+    assert torch.allclose(z.to_dense().tensor, x.permute(before_by_after).to_dense().tensor)
+
+
+def test_charged_reshape(x: ChargedGrassmannTensor) -> None:
+    last = len(x.edges) - 2
+    if x.arrow[last] != x.arrow[last + 1]:
+        pytest.skip("Cannot merge edges with different arrows.")
+    merged = x.reshape((-1,) * last + (x.to_dense().tensor.shape[last:].numel(),))
+    assert merged.edges[-1] == fuse_edges(x.edges[last:], x.moduli)
+    split = merged.reshape((-1,) * last + x.edges[last:])
+    assert split.edges == x.edges
+    assert torch.equal(split.to_dense().tensor, x.to_dense().tensor)
+
+
+def test_charged_reshape_dense_basis(x: ChargedGrassmannTensor) -> None:
+    last = len(x.edges) - 2
+    if x.arrow[last] != x.arrow[last + 1]:
+        pytest.skip("Cannot merge edges with different arrows.")
+    new_shape = (-1,) * last + (x.to_dense().tensor.shape[last:].numel(),)
+    merged = x.reshape(new_shape).to_dense()
+    expected = x.to_dense().reshape(new_shape)
+    assert merged.edges == expected.edges
+    # The merged edges differ by a permutation inside each parity, given by fusion_order.
+    order = fusion_order(x.edges[last:], x.moduli)
+    even, _ = expected.edges[-1]
+    assert sorted(order[:even]) == list(range(even))
+    assert torch.allclose(merged.tensor, expected.tensor[..., list(order)])
+
+
+@pytest.mark.parametrize("arrow_a", [False, True])
+@pytest.mark.parametrize("arrow_b", [False, True])
+@pytest.mark.parametrize("arrow_common_a", [False, True])
+@pytest.mark.parametrize("arrow_common_b", [False, True])
+@pytest.mark.parametrize("edge_a, edge_common, edge_b, moduli", [(N_A, N_B, N_A, (0,)), (S_B, S_A, S_B, (2, 0))])
+def test_charged_matmul(
+    arrow_a: bool,
+    arrow_b: bool,
+    arrow_common_a: bool,
+    arrow_common_b: bool,
+    edge_a: tuple,
+    edge_common: tuple,
+    edge_b: tuple,
+    moduli: tuple[int, ...],
+) -> None:
+    # The contracted edges are dual if their arrows are the same, since the charges of a reversed edge are negated.
+    edge_other = dual(edge_common, moduli) if arrow_common_a == arrow_common_b else edge_common
+    a = random_charged((arrow_a, arrow_common_a), (edge_a, edge_common), moduli)
+    b = random_charged((arrow_common_b, arrow_b), (edge_other, edge_b), moduli)
+    result = a.matmul(b)
+    expected = a.to_dense().matmul(b.to_dense())
+    assert result.arrow == expected.arrow
+    assert result.parity_edges == expected.edges
+    assert torch.allclose(result.to_dense().tensor, expected.tensor)
+
+
+def test_charged_contract_merged() -> None:
+    # Merging orders the elements differently from the dense tensor, but the contraction over the merged edge is the same.
+    a = random_charged((False, True, True), (N_A, N_B, N_A), (0,))
+    b = random_charged((False, False, True), (N_B, N_A, N_B), (0,))
+    size = a.to_dense().tensor.shape[1:].numel()
+    result = a.reshape((-1, size)).matmul(b.reshape((size, -1)))
+    expected = a.to_dense().tensordot(b.to_dense(), ((1, 2), (0, 1)))
+    assert torch.allclose(result.to_dense().tensor, expected.tensor)
+
+
+def test_charged_no_block() -> None:
+    # No sector of the odd row and the even column conserves the particle number, so the dtype and the device are carried without any block.
+    a = random_charged((False, True), ((((1,), 2),), (((1,), 3),)), (0,))
+    b = random_charged((False, True), ((((1,), 3),), (((0,), 2),)), (0,))
+    result = a.matmul(b)
+    assert not result.blocks
+    assert result.dtype == torch.float64
+    expected = a.to_dense().matmul(b.to_dense())
+    assert result.parity_edges == expected.edges
+    assert torch.equal(result.to_dense().tensor, expected.tensor)
+
+
+def test_charged_validation() -> None:
+    with pytest.raises(AssertionError, match="unique"):
+        random_charged((False, True), ((((0,), 1), ((0,), 2)), N_B), (0,))
+    with pytest.raises(AssertionError, match="must match"):
+        random_charged((False, True), (N_A, N_A), (0,)).matmul(random_charged((False, True), (N_B, N_B), (0,)))
+    with pytest.raises(AssertionError, match="Moduli must match"):
+        _ = random_charged((False, True), (N_B, N_B), (0,)) + random_charged((False, True), (N_B, N_B), (2,))
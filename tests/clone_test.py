@@ -41,10 +41,8 @@ def test_clone(
     else:
         assert cloned_tensor._parity is original_tensor._parity
     if mask:
-        assert cloned_tensor._mask is not None
-        assert original_tensor._mask is not None
-        assert torch.equal(cloned_tensor._mask, original_tensor._mask)
-    else:
-        assert cloned_tensor._mask is original_tensor._mask
+        assert torch.equal(cloned_tensor.mask, original_tensor.mask)
+    # The mask is a debug view, which is never stored along with the data.
+    assert not hasattr(cloned_tensor, "_mask")
 
     assert id(original_tensor.tensor) != id(cloned_tensor.tensor)
@@ -0,0 +1,57 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, set_validation, validation_enabled
+
+
+def test_slots() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    with pytest.raises(AttributeError):
+        a.extra = 1  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("operation", ["neg", "add", "mul", "permute", "reverse", "clone", "to"])
+def test_trusted_results(operation: str) -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4])).update_mask()
+    b = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4])).update_mask()
+    match operation:
+        case "neg":
+            result = -a
+        case "add":
+            result = a + b
+        case "mul":
+            result = a * 2
+        case "permute":
+            result = a.permute((1, 0))
+        case "reverse":
+            result = a.reverse((0,))
+        case "clone":
+            result = a.clone()
+        case _:
+            result = a.to(torch.float64)
+    # A trusted result must be as consistent as one checked by the constructor.
+    checked = GrassmannTensor(result.arrow, result.edges, result.tensor)
+    assert checked.arrow == result.arrow and checked.edges == result.edges
+    assert torch.equal(checked.tensor, result.tensor)
+
+
+def test_untrusted_broadcast() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    with pytest.raises(AssertionError, match="Arrow length"):
+        _ = a + torch.randn([3, 4, 4])
+
+
+def test_validation_switch() -> None:
+    assert validation_enabled()
+    with pytest.raises(AssertionError, match="must equal sum"):
+        GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 5]))
+    previous = set_validation(False)
+    try:
+        assert previous
+        assert not validation_enabled()
+        GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 5]))
+        a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+        b = GrassmannTensor((True, False), ((2, 2), (1, 3)), torch.randn([4, 4]))
+        _ = a + b
+    finally:
+        set_validation(previous)
+    assert validation_enabled()
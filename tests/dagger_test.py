@@ -0,0 +1,36 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+
+def stepwise(tensor: GrassmannTensor) -> GrassmannTensor:
+    rank = len(tensor.edges)
+    conjugated = GrassmannTensor(tensor.arrow, tensor.edges, tensor.tensor.conj(), _batch=len(tensor.batch_shape))
+    return conjugated.permute(tuple(reversed(range(rank)))).reverse(tuple(range(rank)))
+
+
+@pytest.mark.parametrize("arrow", [(False, True, True), (True, False, True), (True, True, True)])
+@pytest.mark.parametrize("batch", [(), (2,)])
+def test_dagger(arrow: tuple[bool, ...], batch: tuple[int, ...]) -> None:
+    a = random_tensor(arrow, ((2, 2), (1, 3), (2, 1)), batch, torch.complex128)
+    result = a.dagger()
+    # Reading the data of a copies it while the lazy result views it, so the view is checked first.
+    assert result._tensor.data_ptr() == a._tensor.data_ptr()
+    expected = stepwise(a)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+def test_dagger_pending_sign() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), dtype=torch.complex128)
+    lazy = a.reverse((1,)).permute((2, 0, 1))
+    assert torch.allclose(lazy.dagger().tensor, stepwise(lazy).tensor)
+    assert torch.allclose(lazy.dagger().dagger().tensor, stepwise(stepwise(lazy)).tensor)
+
+
+def test_conj() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)), dtype=torch.complex128).permute((1, 0))
+    assert torch.allclose(a.conj().tensor, a.tensor.conj())
+    assert a.conj().arrow == a.arrow
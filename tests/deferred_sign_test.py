@@ -0,0 +1,88 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+
+def eager(tensor: GrassmannTensor) -> GrassmannTensor:
+    # Reading the data applies the pending sign.
+    _ = tensor.tensor
+    return tensor
+
+
+def test_deferred_sign_is_pending() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    b = a.reverse((1,)).permute((2, 0, 1))
+    assert b._sign is not None
+    assert b._tensor.data_ptr() == a._tensor.data_ptr()
+    _ = b.tensor
+    assert b._sign is None
+    assert b._tensor.data_ptr() != a._tensor.data_ptr()
+
+
+@pytest.mark.parametrize("permutation", [(0, 1, 2), (2, 0, 1), (1, 2, 0), (2, 1, 0)])
+@pytest.mark.parametrize("indices", [(), (0,), (1, 2), (0, 1, 2)])
+def test_deferred_sign_chain(permutation: tuple[int, int, int], indices: tuple[int, ...]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    lazy = a.reverse(indices).permute(permutation).reverse(indices).permute(permutation)
+    stepwise = eager(eager(eager(eager(a).reverse(indices)).permute(permutation)).reverse(indices)).permute(permutation)
+    assert torch.allclose(lazy.tensor, stepwise.tensor)
+
+
+def test_deferred_sign_reshape() -> None:
+    a = random_tensor((True, True, False), ((2, 2), (1, 3), (2, 1)))
+    lazy = a.reverse((2,)).permute((2, 1, 0)).reverse((0,))
+    stepwise = eager(eager(eager(a).reverse((2,))).permute((2, 1, 0))).reverse((0,))
+    assert torch.allclose(lazy.reshape((-1, 16)).tensor, eager(stepwise).reshape((-1, 16)).tensor)
+    assert torch.allclose(lazy.reshape((-1, (1, 0), (1, 3), -1)).tensor, eager(stepwise).reshape((-1, (1, 0), (1, 3), -1)).tensor)
+
+
+def test_deferred_sign_matmul() -> None:
+    a = random_tensor((True, False), ((2, 2), (2, 2)))
+    b = random_tensor((True, True), ((2, 2), (2, 2)))
+    lazy_a = a.reverse((0, 1)).permute((1, 0))
+    lazy_b = b.permute((1, 0)).reverse((1,))
+    eager_a = eager(lazy_a.clone())
+    eager_b = eager(lazy_b.clone())
+    assert torch.allclose(lazy_a.matmul(lazy_b).tensor, eager_a.matmul(eager_b).tensor)
+
+
+def test_deferred_sign_tensordot() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    b = random_tensor((False, False, True), ((2, 1), (1, 3), (2, 2)))
+    lazy_a = a.permute((1, 2, 0)).reverse((0,))
+    lazy_b = b.reverse((2,)).permute((1, 0, 2))
+    eager_a = eager(lazy_a.clone())
+    eager_b = eager(lazy_b.clone())
+    assert torch.allclose(lazy_a.tensordot(lazy_b, ((0, 1), (0, 1))).tensor, eager_a.tensordot(eager_b, ((0, 1), (0, 1))).tensor)
+
+
+def test_deferred_sign_inplace_does_not_share_memory() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    original = a.tensor.clone()
+    b = a.permute((1, 0))
+    b += 1
+    assert torch.equal(a.tensor, original)
+
+
+@pytest.mark.parametrize("operation", ["permute", "reverse", "dagger", "conj"])
+@pytest.mark.parametrize("mutation", ["iadd", "imul", "tensor"])
+def test_deferred_sign_source_mutation(operation: str, mutation: str) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    lazy_results = {
+        "permute": lambda: a.permute((2, 0, 1)),
+        "reverse": lambda: a.reverse((0, 1)),
+        "dagger": a.dagger,
+        "conj": a.conj,
+    }
+    expected = eager(lazy_results[operation]()).tensor.clone()
+    lazy = lazy_results[operation]()
+    assert lazy._tensor.untyped_storage().data_ptr() == a._tensor.untyped_storage().data_ptr()
+    # The source is updated in place while the lazy result still views its data, which is copied on write.
+    if mutation == "iadd":
+        a += 1
+    elif mutation == "imul":
+        a *= 2
+    else:
+        a.tensor.add_(1)
+    assert torch.equal(lazy.tensor, expected)
@@ -0,0 +1,46 @@
+import pathlib
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing
+from grassmann_tensor import BlockGrassmannTensor, ShardedGrassmannTensor
+from grassmann_tensor.distributed import assign_owners
+from .helpers import random_tensor
+
+WORLD_SIZE = 3
+
+
+def worker(rank: int, init_method: str) -> None:
+    dist.init_process_group("gloo", init_method=init_method, rank=rank, world_size=WORLD_SIZE)
+    try:
+        # Every rank creates the same data from the same seed.
+        torch.manual_seed(0)
+        a = random_tensor((True, True, False), ((2, 2), (1, 3), (2, 1)))
+        sharded = ShardedGrassmannTensor.from_blocks(BlockGrassmannTensor.from_dense(a))
+        assert set(sharded.blocks) == {key for key, owner in sharded.owners.items() if owner == rank}
+        assert torch.equal(sharded.to_dense().tensor, a.tensor)
+
+        permuted = sharded.permute((2, 0, 1)).reverse((0, 1))
+        assert torch.allclose(permuted.to_dense().tensor, a.permute((2, 0, 1)).reverse((0, 1)).tensor)
+
+        merged = sharded.reshape((16, -1))
+        assert torch.allclose(merged.to_dense().tensor, a.reshape((16, -1)).tensor)
+        split = merged.reshape(((2, 2), (1, 3), -1))
+        assert torch.allclose(split.to_dense().tensor, a.tensor)
+
+        x = random_tensor((False, True), ((2, 2), (3, 1)))
+        y = random_tensor((True, False), ((3, 1), (2, 3)))
+        product = ShardedGrassmannTensor.from_dense(x).matmul(ShardedGrassmannTensor.from_dense(y))
+        assert torch.allclose(product.to_dense().tensor, x.matmul(y).tensor)
+    finally:
+        dist.destroy_process_group()
+
+
+@pytest.mark.skipif(not dist.is_available(), reason="torch.distributed is not available")
+def test_sharded_operations(tmp_path: pathlib.Path) -> None:
+    torch.multiprocessing.spawn(worker, args=(f"file://{tmp_path / 'store'}",), nprocs=WORLD_SIZE)
+
+
+def test_assign_owners() -> None:
+    owners = assign_owners({(False,): 10, (True,): 6, (False, False): 5, (True, True): 1}, 2)
+    assert owners == {(False,): 0, (True,): 1, (False, False): 1, (True, True): 0}
@@ -0,0 +1,53 @@
+import pytest
+import torch
+from grassmann_tensor import einsum, contraction_path
+from .helpers import random_tensor
+
+
+def test_einsum_chain() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    b = random_tensor((False, True), ((1, 3), (3, 2)))
+    c = random_tensor((False, True), ((3, 2), (2, 1)))
+    expected = a.matmul(b).matmul(c)
+    for optimize in ["greedy", "optimal"]:
+        result = einsum("ab,bc,cd->ad", a, b, c, optimize=optimize)
+        assert result.edges == expected.edges
+        assert torch.allclose(result.tensor, expected.tensor)
+    assert torch.allclose(einsum("ab,bc,cd", a, b, c).tensor, expected.tensor)
+    assert torch.allclose(einsum("ab,bc,cd->da", a, b, c).tensor, expected.permute((1, 0)).tensor)
+
+
+@pytest.mark.parametrize("path", [[(0, 1), (0, 1), (0, 1)], [(2, 3), (1, 2), (0, 1)], [(0, 3), (1, 2), (0, 1)], [(1, 3), (0, 1), (0, 1)]])
+def test_einsum_path_independence(path: list[tuple[int, int]]) -> None:
+    torch.manual_seed(0)
+    a = random_tensor((False, True, True), ((1, 1), (2, 2), (1, 2)))
+    b = random_tensor((False, True, False), ((2, 2), (2, 1), (1, 1)))
+    c = random_tensor((False, True, True), ((1, 2), (2, 1), (2, 2)))
+    d = random_tensor((True, False, True), ((1, 1), (2, 1), (1, 1)))
+    # a: i j k, b: j l m, c: k n o, d: m n p
+    subscripts = "ijk,jlm,kno,mnp->ilop"
+    expected = einsum(subscripts, a, b, c, d, optimize=[(0, 1), (0, 1), (0, 1)])
+    result = einsum(subscripts, a, b, c, d, optimize=path)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+def test_contraction_path_prefers_cheap_order() -> None:
+    a = random_tensor((False, True), ((8, 8), (1, 1)))
+    b = random_tensor((False, True), ((1, 1), (8, 8)))
+    c = random_tensor((False, True), ((8, 8), (8, 8)))
+    # Contracting a and b first produces a large intermediate, so both searches contract b and c first.
+    assert contraction_path("ab,bc,cd->ad", a, b, c, optimize="optimal") == [(1, 2), (0, 1)]
+    assert contraction_path("ab,bc,cd->ad", a, b, c, optimize="greedy") == [(1, 2), (0, 1)]
+
+
+def test_einsum_invalid() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    b = random_tensor((False, True), ((2, 2), (1, 3)))
+    with pytest.raises(AssertionError, match="Edges of subscript"):
+        einsum("ab,bc->ac", a, b)
+    with pytest.raises(AssertionError, match="Repeated subscripts"):
+        einsum("aa->", a)
+    with pytest.raises(AssertionError, match="opposite arrows"):
+        einsum("ab,cb->ac", a, a)
@@ -0,0 +1,8 @@
+import torch
+from grassmann_tensor import GrassmannTensor
+
+
+def random_tensor(arrow: tuple[bool, ...], edges: tuple[tuple[int, int], ...], batch: tuple[int, ...] = (), dtype: torch.dtype = torch.float64) -> GrassmannTensor:
+    # A random tensor with the odd blocks masked out, shared by the tests through `from .helpers import random_tensor`.
+    data = torch.randn([*batch, *(even + odd for even, odd in edges)], dtype=dtype)
+    return GrassmannTensor(arrow, edges, data, _batch=len(batch)).update_mask()
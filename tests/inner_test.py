@@ -0,0 +1,63 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+
+def lazy(tensor: GrassmannTensor) -> GrassmannTensor:
+    # A tensor with the same arrow and edges and a pending sign, whose data is a view of the original data.
+    return tensor.reverse((0, 2)).permute((2, 0, 1)).permute((1, 2, 0)).reverse((0, 2))
+
+
+@pytest.mark.parametrize("dtype", [torch.float64, torch.complex128])
+@pytest.mark.parametrize("batch", [(), (3,)])
+def test_inner(dtype: torch.dtype, batch: tuple[int, ...]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), batch, dtype)
+    b = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), batch, dtype)
+    expected = (a.tensor.conj() * b.tensor).sum((-3, -2, -1))
+    assert torch.allclose(a.inner(b), expected)
+    assert torch.allclose(lazy(a).inner(b), (lazy(a).tensor.conj() * b.tensor).sum((-3, -2, -1)))
+    assert torch.allclose(a.inner(lazy(b)), (a.tensor.conj() * lazy(b).tensor).sum((-3, -2, -1)))
+    assert lazy(a)._sign is not None
+    permuted = (a.permute((2, 0, 1)).tensor.conj() * b.permute((2, 0, 1)).tensor).sum((-3, -2, -1))
+    assert torch.allclose(a.permute((2, 0, 1)).inner(b.permute((2, 0, 1))), permuted)
+
+
+@pytest.mark.parametrize("batch", [(), (3,)])
+def test_norm(batch: tuple[int, ...]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)), batch, torch.complex128)
+    expected = torch.linalg.vector_norm(a.tensor, dim=(-3, -2, -1))
+    assert torch.allclose(a.norm(), expected)
+    assert torch.allclose(lazy(a).norm(), expected)
+    assert torch.allclose(a.inner(a).real, expected**2)
+
+
+def test_allclose() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    b = lazy(a)
+    eager = GrassmannTensor(b.arrow, b.edges, b.tensor.clone())
+    assert b.allclose(eager)
+    assert b.allclose(a) == torch.allclose(b.tensor, a.tensor)
+    assert a.allclose(a.clone())
+    assert not a.allclose(a * 1.01)
+    assert not a.allclose(-a)
+    with pytest.raises(AssertionError, match="Edges must match"):
+        a.allclose(random_tensor((False, True, True), ((2, 2), (2, 2), (2, 1))))
+
+
+def test_inner_many_sectors() -> None:
+    # Every edge is split by parity, so the whole data is reduced with a broadcast sign and parity instead of sector blocks.
+    arrow = (False, True, False, True, False, True)
+    edges = ((1, 1), (1, 2), (2, 1), (1, 1), (1, 1), (2, 2))
+    a = random_tensor(arrow, edges, dtype=torch.complex128)
+    b = random_tensor(arrow, edges, dtype=torch.complex128)
+    swap = (1, 0, 2, 3, 4, 5)
+    lazy_b = b.reverse((0, 2)).permute(swap).permute(swap).reverse((0, 2))
+    eager_b = GrassmannTensor(arrow, edges, b.reverse((0, 2)).permute(swap).permute(swap).reverse((0, 2)).tensor)
+    assert lazy_b._sign is not None
+    dims = tuple(range(-len(edges), 0))
+    assert torch.allclose(a.inner(lazy_b), (a.tensor.conj() * eager_b.tensor).sum(dims))
+    assert torch.allclose(a.norm(), torch.linalg.vector_norm(a.tensor, dim=dims))
+    assert lazy_b.allclose(eager_b)
+    assert eager_b.allclose(lazy_b)
+    assert not lazy_b.allclose(b)
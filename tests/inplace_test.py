@@ -0,0 +1,103 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+
+@pytest.mark.parametrize("permutation", [(0, 1, 2), (2, 0, 1), (1, 2, 0), (2, 1, 0)])
+def test_permute_inplace(permutation: tuple[int, int, int]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    expected = a.clone().permute(permutation)
+    pointer = a._tensor.data_ptr()
+    assert a.permute_(permutation) is a
+    assert a._tensor.data_ptr() == pointer
+    assert a._sign is None
+    assert a.arrow == expected.arrow
+    assert a.edges == expected.edges
+    assert torch.allclose(a.tensor, expected.tensor)
+
+
+@pytest.mark.parametrize("indices", [(), (0,), (1, 2), (0, 1, 2)])
+def test_reverse_inplace(indices: tuple[int, ...]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    expected = a.clone().reverse(indices)
+    pointer = a._tensor.data_ptr()
+    assert a.reverse_(indices) is a
+    assert a._tensor.data_ptr() == pointer
+    assert a.arrow == expected.arrow
+    assert torch.allclose(a.tensor, expected.tensor)
+
+
+def test_inplace_on_view_does_not_share_memory() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    original = a.tensor.clone()
+    b = a.permute((2, 1, 0))
+    b.reverse_((0, 1)).permute_((1, 0, 2)).update_mask_()
+    assert torch.equal(a.tensor, original)
+    assert torch.allclose(b.tensor, a.permute((2, 1, 0)).reverse((0, 1)).permute((1, 0, 2)).tensor)
+
+
+@pytest.mark.parametrize("operation", ["permute", "reverse", "dagger"])
+@pytest.mark.parametrize("mutation", ["permute_", "reverse_", "update_mask_", "iadd"])
+def test_inplace_on_source_of_view(operation: str, mutation: str) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    lazy_results = {
+        "permute": lambda: a.permute((2, 0, 1)),
+        "reverse": lambda: a.reverse((1, 2)),
+        "dagger": a.dagger,
+    }
+    expected = lazy_results[operation]().tensor.clone()
+    lazy = lazy_results[operation]()
+    pointer = a._tensor.data_ptr()
+    mutations = {
+        "permute_": lambda: a.permute_((1, 2, 0)),
+        "reverse_": lambda: a.reverse_((0, 2)),
+        "update_mask_": a.update_mask_,
+        "iadd": lambda: a.__iadd__(1),
+    }
+    mutations[mutation]()
+    # The source data may be viewed by the lazy result, so it is copied instead of being updated in the same memory.
+    assert torch.equal(lazy.tensor, expected)
+    assert a.tensor.data_ptr() != pointer
+
+
+def test_update_mask_inplace() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    expected = a.clone().update_mask()
+    pointer = a._tensor.data_ptr()
+    assert a.update_mask_() is a
+    assert a._tensor.data_ptr() == pointer
+    assert torch.equal(a.tensor, expected.tensor)
+
+
+@pytest.mark.parametrize("new_shape", [(16, -1), ((0, 1), (3, 1), -1, -1), (-1, -1, -1)])
+def test_reshape_out(new_shape: tuple[int | tuple[int, int], ...]) -> None:
+    a = random_tensor((True, True, False), ((2, 2), (1, 3), (2, 1))).permute((1, 0, 2))
+    expected = a.reshape(new_shape)
+    out = torch.empty([even + odd for even, odd in expected.edges], dtype=torch.float64)
+    b = a.reshape(new_shape, out=out)
+    assert b.tensor is out
+    assert torch.equal(out, expected.tensor)
+    with pytest.raises(AssertionError, match="Output shape"):
+        a.reshape(new_shape, out=torch.empty([1], dtype=torch.float64))
+
+
+@pytest.mark.parametrize("edges", [((2, 2), (2, 2), (2, 2)), ((3, 1), (2, 2), (1, 3))])
+def test_matmul_out(edges: tuple[tuple[int, int], tuple[int, int], tuple[int, int]]) -> None:
+    a = random_tensor((False, True), (edges[0], edges[1]))
+    b = random_tensor((False, True), (edges[1], edges[2]))
+    expected = a.matmul(b)
+    out = torch.randn([sum(edges[0]), sum(edges[2])], dtype=torch.float64)
+    c = a.matmul(b, out=out)
+    assert c.tensor is out
+    assert torch.allclose(out, expected.tensor)
+    with pytest.raises(AssertionError, match="Output shape"):
+        a.matmul(b, out=torch.empty([1], dtype=torch.float64))
+
+
+def test_matmul_vector_out() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    v = random_tensor((False,), ((1, 3),))
+    expected = a.matmul(v)
+    out = torch.empty([4], dtype=torch.float64)
+    assert torch.allclose(a.matmul(v, out=out).tensor, expected.tensor)
@@ -0,0 +1,63 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from grassmann_tensor import svd, qr, eigh
+
+
+def random_matrix(arrow: tuple[bool, bool], edges: tuple[tuple[int, int], tuple[int, int]]) -> GrassmannTensor:
+    return GrassmannTensor(arrow, edges, torch.randn([even + odd for even, odd in edges], dtype=torch.float64)).update_mask()
+
+
+@pytest.mark.parametrize("arrow", [(False, False), (False, True), (True, False), (True, True)])
+@pytest.mark.parametrize("edges", [((3, 2), (2, 4)), ((2, 2), (2, 2)), ((1, 0), (2, 3))])
+def test_svd(arrow: tuple[bool, bool], edges: tuple[tuple[int, int], tuple[int, int]]) -> None:
+    a = random_matrix(arrow, edges)
+    u, s, vh = svd(a)
+    assert u.arrow == (arrow[0], True)
+    assert vh.arrow == (False, arrow[1])
+    assert u.edges[1] == (min(edges[0][0], edges[1][0]), min(edges[0][1], edges[1][1]))
+    b = u.matmul(s).matmul(vh)
+    assert b.arrow == a.arrow
+    assert torch.allclose(b.tensor, a.tensor)
+
+
+def test_svd_truncation() -> None:
+    a = random_matrix((False, True), ((4, 4), (4, 4)))
+    _, s, _ = svd(a)
+    values = torch.diagonal(s.tensor)
+    _, s_rank, _ = svd(a, rank=5)
+    assert sum(s_rank.edges[0]) == 5
+    assert torch.allclose(torch.diagonal(s_rank.tensor).sort(descending=True).values, values.sort(descending=True).values[:5])
+    cutoff = float(values.median())
+    _, s_cutoff, _ = svd(a, cutoff=cutoff)
+    assert sum(s_cutoff.edges[0]) == int((values > cutoff).sum())
+
+
+def test_qr() -> None:
+    a = random_matrix((True, False), ((3, 2), (2, 4)))
+    q, r = qr(a)
+    assert q.edges[1] == (2, 2)
+    assert torch.allclose(q.matmul(r).tensor, a.tensor)
+
+
+def test_eigh() -> None:
+    a = random_matrix((False, True), ((3, 2), (3, 2)))
+    a = GrassmannTensor(a.arrow, a.edges, a.tensor + a.tensor.T)
+    w, v = eigh(a)
+    vh = GrassmannTensor((False, True), (v.edges[1], a.edges[1]), v.tensor.mH)
+    assert torch.allclose(v.matmul(w).matmul(vh).tensor, a.tensor)
+    w_rank, _ = eigh(a, rank=3)
+    assert sum(w_rank.edges[0]) == 3
+    assert torch.allclose(torch.diagonal(w_rank.tensor).abs().sort(descending=True).values, torch.diagonal(w.tensor).abs().sort(descending=True).values[:3])
+
+
+def test_decomposition_invalid_rank() -> None:
+    a = GrassmannTensor((False, True, True), ((1, 1), (1, 1), (1, 1)), torch.randn([2, 2, 2]))
+    with pytest.raises(AssertionError, match="rank 2"):
+        svd(a)
+
+
+def test_decomposition_batch() -> None:
+    a = GrassmannTensor((False, True), ((1, 1), (1, 1)), torch.randn([3, 2, 2]), _batch=1).update_mask()
+    with pytest.raises(AssertionError, match="batch"):
+        svd(a)
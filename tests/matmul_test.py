@@ -52,3 +52,48 @@ def test_matmul_matrix_ft(x: MatmulMatrixCase) -> None:
     assert c.arrow == (arrow_a, arrow_b)
     assert c.edges == (edge_a, edge_b)
     assert torch.allclose(c.tensor, expected)
+
+
+MatmulBlockCase = tuple[tuple[int, ...], tuple[int, ...], tuple[int, int], tuple[int, int], tuple[int, int]]
+
+
+@pytest.mark.parametrize("x", [
+    ((), (), (2, 2), (3, 3), (1, 1)),
+    ((), (), (2, 1), (3, 2), (1, 4)),
+    ((5,), (), (2, 2), (3, 3), (1, 1)),
+    ((5,), (1,), (2, 1), (3, 2), (1, 4)),
+    ((2, 1), (3,), (2, 2), (0, 0), (1, 1)),
+])
+def test_matmul_blocks(x: MatmulBlockCase) -> None:
+    batch_a, batch_b, edge_a, edge_common, edge_b = x
+    dim_a = sum(edge_a)
+    dim_common = sum(edge_common)
+    dim_b = sum(edge_b)
+    # The elements forbidden by parity are not masked, and they should be ignored.
+    a = GrassmannTensor((False,) * len(batch_a) + (False, True), tuple((size, 0) for size in batch_a) + (edge_a, edge_common), torch.randn([*batch_a, dim_a, dim_common]))
+    b = GrassmannTensor((False,) * len(batch_b) + (False, True), tuple((size, 0) for size in batch_b) + (edge_common, edge_b), torch.randn([*batch_b, dim_common, dim_b]))
+    c = a.matmul(b)
+    expected = a.clone().update_mask().tensor.matmul(b.clone().update_mask().tensor)
+    assert c.edges[-2:] == (edge_a, edge_b)
+    assert c.tensor.shape == expected.shape
+    assert torch.allclose(c.tensor, expected, atol=1e-6)
+
+
+def test_matmul_mismatch() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    b = GrassmannTensor((False, True), ((3, 1), (2, 2)), torch.randn([4, 4]))
+    with pytest.raises(AssertionError, match="Contracted edges must match"):
+        a.matmul(b)
+
+
+def test_matmul_vector() -> None:
+    # A vector is a matrix with a trivial pure even edge, which gets no sign, and the pending signs of both operands are kept.
+    a = GrassmannTensor((True, True), ((2, 2), (1, 3)), torch.randn([4, 4], dtype=torch.float64)).update_mask().reverse((1,))
+    u = GrassmannTensor((True,), ((2, 2),), torch.randn([4], dtype=torch.float64)).update_mask().reverse((0,))
+    v = GrassmannTensor((False,), ((1, 3),), torch.randn([4], dtype=torch.float64)).update_mask()
+    row = GrassmannTensor((False, False), ((1, 0), (2, 2)), u.tensor.unsqueeze(0))
+    column = GrassmannTensor((False, False), ((1, 3), (1, 0)), v.tensor.unsqueeze(-1))
+    assert u.matmul(a).edges == ((1, 3),)
+    assert torch.allclose(u.matmul(a).tensor, row.matmul(a).tensor[0])
+    assert a.matmul(v).edges == ((2, 2),)
+    assert torch.allclose(a.matmul(v).tensor, a.matmul(column).tensor[:, 0])
@@ -0,0 +1,61 @@
+import torch
+from grassmann_tensor import GrassmannTensor, collect_metrics, enable_metrics, disable_metrics, current_metrics, clear_reshape_cache
+
+
+def test_metrics_disabled_by_default() -> None:
+    assert current_metrics() is None
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    _ = a.permute((1, 0)).tensor
+    assert current_metrics() is None
+
+
+def test_metrics_permute() -> None:
+    a = GrassmannTensor((False, True, True), ((2, 2), (1, 3), (2, 1)), torch.randn([4, 4, 3], dtype=torch.float64)).update_mask()
+    with collect_metrics() as metrics:
+        b = a.permute((2, 1, 0))
+        _ = b.tensor
+    assert current_metrics() is None
+    assert metrics.operations["permute"].calls == 1
+    assert metrics.operations["permute"].sign_passes == 0
+    assert metrics.operations["materialize"].calls == 1
+    assert metrics.operations["materialize"].sign_passes == 1
+    assert metrics.operations["materialize"].allocated_bytes == 4 * 4 * 3 * 8
+    assert metrics.total().sign_passes == 1
+    assert "permute" in metrics.summary()
+
+
+def test_metrics_matmul_flops() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (2, 2)), torch.randn([4, 4]))
+    b = GrassmannTensor((False, True), ((2, 2), (2, 2)), torch.randn([4, 4]))
+    with collect_metrics() as metrics:
+        _ = a.matmul(b)
+    assert metrics.operations["matmul"].calls == 1
+    assert metrics.operations["matmul"].flops == 2 * (2 * 2 * 2 + 2 * 2 * 2)
+
+
+def test_metrics_reshape_cache() -> None:
+    clear_reshape_cache()
+    a = GrassmannTensor((True, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    with collect_metrics() as metrics:
+        _ = a.reshape((16,))
+        _ = a.reshape((16,))
+    assert metrics.operations["reshape"].calls == 2
+    assert metrics.operations["reshape"].allocated_bytes > 0
+    assert metrics.cache_stats()["reshape"] == (1, 1)
+
+
+def test_metrics_global_registry() -> None:
+    metrics = enable_metrics()
+    try:
+        assert current_metrics() is metrics
+        a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+        _ = a + a
+        with collect_metrics() as inner:
+            _ = a * a
+        assert current_metrics() is metrics
+    finally:
+        assert disable_metrics() is metrics
+    assert metrics.operations["add"].calls == 1
+    assert "mul" not in metrics.operations
+    assert inner.operations["mul"].calls == 1
+    assert current_metrics() is None
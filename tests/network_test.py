@@ -0,0 +1,61 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, TensorNetwork, collect_metrics, einsum
+from .helpers import random_tensor
+
+
+def ring() -> tuple[TensorNetwork, list[GrassmannTensor]]:
+    torch.manual_seed(0)
+    a = random_tensor((False, True, True), ((1, 1), (2, 2), (1, 2)))
+    b = random_tensor((False, True, False), ((2, 2), (2, 1), (1, 1)))
+    c = random_tensor((False, True, True), ((1, 2), (2, 1), (2, 2)))
+    d = random_tensor((True, False, True), ((1, 1), (2, 1), (1, 1)))
+    network = TensorNetwork()
+    for name, tensor, labels in zip("abcd", (a, b, c, d), ("ijk", "jlm", "kno", "mnp")):
+        network.add(name, tensor, labels)
+    return network, [a, b, c, d]
+
+
+@pytest.mark.parametrize("optimize", ["greedy", "optimal"])
+def test_network_contract(optimize: str) -> None:
+    network, tensors = ring()
+    network.optimize = optimize  # type: ignore[assignment]
+    assert network.bonds["j"] == ("a", "b")
+    assert network.bonds["i"] == ("a",)
+    expected = einsum("ijk,jlm,kno,mnp->ilop", *tensors)
+    result = network.contract()
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor)
+    assert torch.allclose(network.contract("poli").tensor, expected.permute((3, 2, 1, 0)).tensor)
+    with pytest.raises(AssertionError, match="permutation of the open labels"):
+        network.contract("ilo")
+
+
+def test_network_cache() -> None:
+    network, tensors = ring()
+    network.contract()
+    assert len(network.cached) == 3
+    with collect_metrics() as metrics:
+        network.contract()
+    assert "tensordot" not in metrics.operations
+
+    affected = sum(1 for subset in network.cached if "c" in subset)
+    new_c = random_tensor((False, True, True), ((1, 2), (2, 1), (2, 2)))
+    network.update("c", new_c)
+    assert len(network.cached) == 3 - affected
+    with collect_metrics() as metrics:
+        result = network.contract()
+    # Only the intermediates containing the updated tensor are contracted again.
+    assert metrics.operations["tensordot"].calls == affected
+    expected = einsum("ijk,jlm,kno,mnp->ilop", tensors[0], tensors[1], new_c, tensors[3])
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+def test_network_invalid() -> None:
+    network, _ = ring()
+    with pytest.raises(AssertionError, match="already in the network"):
+        network.add("a", random_tensor((False,), ((1, 1),)), "x")
+    network.remove("d")
+    network.add("d", random_tensor((False, False, True), ((1, 1), (2, 1), (1, 1))), "mnp")
+    with pytest.raises(AssertionError, match="opposite arrows"):
+        network.contract()
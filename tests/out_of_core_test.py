@@ -0,0 +1,34 @@
+import pathlib
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, BlockGrassmannTensor, save, load_blocks, open_blocks, streamed_tensordot, streamed_matmul
+from .helpers import random_tensor
+
+
+def mapped(tensor: GrassmannTensor, path: pathlib.Path) -> BlockGrassmannTensor:
+    save(tensor, path)
+    return load_blocks(path, mmap=True)
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 64, 2**20])
+@pytest.mark.parametrize("axes", [((1, 2), (1, 0)), ((0,), (2,)), ((0, 1, 2), (2, 1, 0))])
+def test_streamed_tensordot(tmp_path: pathlib.Path, chunk_bytes: int, axes: tuple[tuple[int, ...], tuple[int, ...]]) -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 1)))
+    b = random_tensor((False, False, True), ((2, 1), (1, 3), (2, 2)))
+    expected = a.tensordot(b, axes)
+    result = streamed_tensordot(mapped(a, tmp_path / "a.pt"), mapped(b, tmp_path / "b.pt"), axes, tmp_path / "c.raw", chunk_bytes=chunk_bytes)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.to_dense().tensor, expected.tensor)
+    # The result is stored in the file, which could be opened again.
+    assert torch.allclose(open_blocks(tmp_path / "c.raw").to_dense().tensor, expected.tensor)
+
+
+@pytest.mark.parametrize("arrow_b", [(False, True), (True, False)])
+def test_streamed_matmul(tmp_path: pathlib.Path, arrow_b: tuple[bool, bool]) -> None:
+    a = random_tensor((False, True), ((5, 3), (2, 4)))
+    b = random_tensor(arrow_b, ((2, 4), (3, 3)))
+    result = streamed_matmul(mapped(a, tmp_path / "a.pt"), mapped(b, tmp_path / "b.pt"), tmp_path / "c.raw", chunk_bytes=32)
+    assert torch.allclose(result.to_dense().tensor, a.matmul(b).tensor)
+    with pytest.raises(AssertionError, match="rank 2"):
+        streamed_matmul(BlockGrassmannTensor.from_dense(random_tensor((False,), ((1, 1),))), mapped(b, tmp_path / "b.pt"), tmp_path / "d.raw")
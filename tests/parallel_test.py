@@ -0,0 +1,50 @@
+import typing
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, BlockGrassmannTensor, set_block_threads, block_threads
+from grassmann_tensor.parallel import run_blocks
+
+
+@pytest.fixture(params=[1, 4])
+def threads(request: pytest.FixtureRequest) -> typing.Iterator[int]:
+    previous = set_block_threads(request.param)
+    yield request.param
+    set_block_threads(previous)
+
+
+def test_run_blocks(threads: int) -> None:
+    assert block_threads() == threads
+    # The results keep the order of the tasks, even though the largest task is submitted first.
+    assert run_blocks([(cost, lambda cost=cost: cost * 2) for cost in [1, 5, 3, 2]]) == [2, 10, 6, 4]
+    with torch.no_grad():
+        assert run_blocks([(1, torch.is_grad_enabled), (2, torch.is_grad_enabled)]) == [False, False]
+    assert run_blocks([(1, torch.is_grad_enabled), (2, torch.is_grad_enabled)]) == [True, True]
+
+
+def test_invalid_threads() -> None:
+    with pytest.raises(AssertionError, match="must be positive"):
+        set_block_threads(0)
+
+
+@pytest.mark.parametrize("edge_a, edge_common, edge_b", [((2, 2), (3, 3), (1, 1)), ((2, 1), (1, 3), (2, 2))])
+def test_parallel_matmul(threads: int, edge_a: tuple[int, int], edge_common: tuple[int, int], edge_b: tuple[int, int]) -> None:
+    a = GrassmannTensor((False, True), (edge_a, edge_common), torch.randn([sum(edge_a), sum(edge_common)], dtype=torch.float64)).update_mask()
+    b = GrassmannTensor((False, True), (edge_common, edge_b), torch.randn([sum(edge_common), sum(edge_b)], dtype=torch.float64)).update_mask()
+    expected = a.tensor @ b.tensor
+    assert torch.allclose(a.matmul(b).tensor, expected)
+    block_a = BlockGrassmannTensor.from_dense(a)
+    block_b = BlockGrassmannTensor.from_dense(b)
+    assert torch.allclose(block_a.matmul(block_b).to_dense().tensor, expected)
+
+
+def test_parallel_sign(threads: int) -> None:
+    a = GrassmannTensor((True, True, False, True), ((2, 2), (1, 3), (2, 1), (3, 2)), torch.randn([4, 4, 3, 5], dtype=torch.float64)).update_mask()
+    b = a.permute((3, 1, 0, 2)).reverse((0, 2)).tensor
+    previous = set_block_threads(1)
+    try:
+        expected = a.permute((3, 1, 0, 2)).reverse((0, 2)).tensor
+    finally:
+        set_block_threads(previous)
+    assert torch.equal(b, expected)
+    x = a.tensor.detach().requires_grad_()
+    assert torch.autograd.gradcheck(lambda x: GrassmannTensor(a.arrow, a.edges, x).permute((3, 1, 0, 2)).tensor, (x,))
@@ -1,6 +1,6 @@
 import pytest
 import torch
-from grassmann_tensor import GrassmannTensor
+from grassmann_tensor import GrassmannTensor, reshape_cache_info, clear_reshape_cache
 
 
 @pytest.mark.parametrize("arrow", [(i, j, k, l, m) for i in [False, True] for j in [False, True] for k in [False, True] for l in [False, True] for m in [False, True]])
@@ -86,3 +86,25 @@ def test_reshape_splitting_even_odd_mismatch() -> None:
     _ = a.reshape(((1, 3), (3, 1)))
     with pytest.raises(AssertionError, match="New even and odd number mismatch during splitting"):
         _ = a.reshape(((2, 2), (2, 2)))
+
+
+def test_reshape_plan_cache() -> None:
+    clear_reshape_cache()
+    a = GrassmannTensor((True, True, False), ((2, 2), (1, 3), (2, 1)), torch.randn([4, 4, 3]))
+    b = a.reshape((16, -1))
+    assert reshape_cache_info().misses == 1
+    c = a.reshape((16, -1))
+    assert reshape_cache_info().hits == 1
+    assert torch.equal(b.tensor, c.tensor)
+    d = b.reshape(((2, 2), (1, 3), -1))
+    assert reshape_cache_info().misses == 2
+    assert torch.allclose(d.tensor, a.tensor)
+    clear_reshape_cache()
+    assert reshape_cache_info().currsize == 0
+
+
+def test_reshape_does_not_share_memory() -> None:
+    a = GrassmannTensor((False, True), ((2, 2), (1, 3)), torch.randn([4, 4]))
+    b = a.reshape((-1, -1))
+    b += 1
+    assert not torch.allclose(a.tensor, b.tensor)
@@ -0,0 +1,57 @@
+import pathlib
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, BlockGrassmannTensor, save, load, load_blocks
+from .helpers import random_tensor
+
+
+@pytest.fixture(params=[
+    ((False, True, True, False), ((2, 2), (1, 3), (2, 1), (1, 1))),
+    ((True, True, False), ((1, 1), (2, 0), (0, 3))),
+    ((False,), ((2, 3),)),
+    ((), ()),
+])
+def x(request: pytest.FixtureRequest) -> GrassmannTensor:
+    return random_tensor(*request.param)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_load(x: GrassmannTensor, tmp_path: pathlib.Path, mmap: bool) -> None:
+    path = tmp_path / "tensor.pt"
+    save(x, path)
+    y = load(path, mmap=mmap)
+    assert y.arrow == x.arrow
+    assert y.edges == x.edges
+    assert torch.equal(y.tensor, x.tensor)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_load_blocks(x: GrassmannTensor, tmp_path: pathlib.Path, mmap: bool) -> None:
+    path = tmp_path / "tensor.pt"
+    save(BlockGrassmannTensor.from_dense(x), path)
+    y = load_blocks(path, mmap=mmap)
+    assert y.arrow == x.arrow
+    assert y.edges == x.edges
+    assert torch.equal(y.to_dense().tensor, x.tensor)
+
+
+def test_save_is_compact(tmp_path: pathlib.Path) -> None:
+    x = random_tensor((False, True, True, False), ((8, 8), (8, 8), (8, 8), (8, 8)))
+    save(x, tmp_path / "compact.pt")
+    torch.save(x.tensor, tmp_path / "dense.pt")
+    assert (tmp_path / "compact.pt").stat().st_size < 0.6 * (tmp_path / "dense.pt").stat().st_size
+
+
+def test_save_pending_sign(tmp_path: pathlib.Path) -> None:
+    # The pending sign is applied to the saved blocks, while the lazy tensor keeps its data and its sign.
+    x = random_tensor((False, True, True, False), ((2, 2), (1, 3), (2, 1), (1, 1))).permute((2, 0, 3, 1)).reverse((0, 1))
+    assert x._sign is not None
+    save(x, tmp_path / "tensor.pt")
+    assert x._sign is not None
+    assert torch.equal(load(tmp_path / "tensor.pt").tensor, x.tensor)
+
+
+def test_load_invalid_file(tmp_path: pathlib.Path) -> None:
+    torch.save({"something": torch.zeros([2])}, tmp_path / "invalid.pt")
+    with pytest.raises(AssertionError, match="not in the format"):
+        load(tmp_path / "invalid.pt")
@@ -0,0 +1,64 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor, sign_cache_info, clear_sign_cache, set_sign_cache_size
+from grassmann_tensor.sign import SIGN_CACHE_SIZE, SIGN_SPLIT_LIMIT, apply_sign, negate_, split_edges
+
+
+def test_sign_cache_hits() -> None:
+    clear_sign_cache()
+    a = GrassmannTensor((False, True, False), ((2, 2), (1, 3), (2, 1)), torch.randn([4, 4, 3])).update_mask()
+    b = a.permute((2, 0, 1)).tensor
+    assert sign_cache_info().misses == 1
+    assert sign_cache_info().hits == 0
+    c = a.permute((2, 0, 1)).tensor
+    assert sign_cache_info().misses == 1
+    assert sign_cache_info().hits == 1
+    assert torch.equal(b, c)
+    _ = a.reverse((1,)).tensor
+    _ = a.reverse((1,)).tensor
+    assert sign_cache_info().misses == 2
+    assert sign_cache_info().hits == 2
+    clear_sign_cache()
+    assert sign_cache_info().currsize == 0
+
+
+def test_sign_cache_size() -> None:
+    set_sign_cache_size(1)
+    try:
+        a = GrassmannTensor((False, True, False), ((2, 2), (1, 3), (2, 1)), torch.randn([4, 4, 3])).update_mask()
+        _ = a.permute((2, 0, 1)).tensor
+        _ = a.permute((1, 0, 2)).tensor
+        assert sign_cache_info().currsize == 1
+        assert sign_cache_info().maxsize == 1
+        _ = a.permute((2, 0, 1)).tensor
+        assert sign_cache_info().hits == 0
+    finally:
+        set_sign_cache_size(SIGN_CACHE_SIZE)
+
+
+def check_sign(edges: tuple[tuple[int, int], ...], singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...]) -> None:
+    tensor = torch.randn([even + odd for even, odd in edges])
+    parity = [(torch.arange(even + odd) >= even).view([-1 if i == index else 1 for i in range(len(edges))]) for index, (even, odd) in enumerate(edges)]
+    mask = torch.zeros(tensor.shape, dtype=torch.bool)
+    for i in singles:
+        mask = mask ^ parity[i]
+    for i, j in pairs:
+        mask = mask ^ (parity[i] & parity[j])
+    expected = torch.where(mask, -tensor, tensor)
+    assert torch.equal(apply_sign(tensor, edges, singles, pairs), expected)
+    assert torch.equal(negate_(tensor.clone(), edges, singles, pairs), expected)
+
+
+@pytest.mark.parametrize("singles", [(), (0,), (1, 3)])
+@pytest.mark.parametrize("pairs", [(), ((0, 1),), ((0, 2), (1, 3), (2, 3))])
+def test_sign_sectors(singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...]) -> None:
+    check_sign(((2, 1), (0, 3), (1, 2), (2, 2)), singles, pairs)
+
+
+@pytest.mark.parametrize("singles", [(0, 1, 2, 3, 4, 6), (1, 3, 5)])
+@pytest.mark.parametrize("pairs", [((0, 5), (1, 3), (2, 4), (4, 6)), ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5))])
+def test_sign_broadcast(singles: tuple[int, ...], pairs: tuple[tuple[int, int], ...]) -> None:
+    # More than SIGN_SPLIT_LIMIT edges are split, so the sign is applied by a broadcast product instead of sector blocks.
+    edges = ((1, 1), (2, 1), (1, 2), (1, 1), (2, 2), (1, 1), (0, 2))
+    assert split_edges(edges, singles, pairs) > SIGN_SPLIT_LIMIT
+    check_sign(edges, singles, pairs)
@@ -0,0 +1,43 @@
+import pytest
+import torch
+from .helpers import random_tensor
+
+
+@pytest.mark.parametrize("arrow_a", [False, True])
+@pytest.mark.parametrize("arrow_b", [False, True])
+@pytest.mark.parametrize("before_by_after", [(0, 1, 2, 3), (2, 0, 3, 1), (3, 2, 1, 0), (1, 3, 0, 2)])
+def test_tensordot(arrow_a: bool, arrow_b: bool, before_by_after: tuple[int, ...]) -> None:
+    a = random_tensor((False, False, arrow_a, arrow_a), ((2, 1), (1, 2), (2, 2), (1, 3)))
+    b = random_tensor((arrow_b, arrow_b, True), ((2, 2), (1, 3), (2, 3)))
+
+    # The reference goes through reverse, reshape and matmul step by step.
+    reversed_a = a if arrow_a else a.reverse((2, 3))
+    reversed_b = b.reverse((0, 1)) if arrow_b else b
+    expected = reversed_a.reshape((9, 16)).matmul(reversed_b.reshape((16, -1))).reshape(((2, 1), (1, 2), -1))
+
+    permuted_a = a.permute(before_by_after)
+    position = {old: new for new, old in enumerate(before_by_after)}
+    result = permuted_a.tensordot(b, ((position[2], position[3]), (0, 1)))
+    if position[0] > position[1]:
+        expected = expected.permute((1, 0, 2))
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor, atol=1e-6)
+
+
+def test_tensordot_integer_axes() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    b = random_tensor((False, True), ((1, 3), (2, 1)))
+    assert torch.allclose(a.tensordot(b, 1).tensor, a.matmul(b).tensor, atol=1e-6)
+    outer = a.tensordot(b, 0)
+    assert outer.edges == a.edges + b.edges
+    assert torch.allclose(outer.tensor, torch.tensordot(a.tensor, b.tensor, dims=0))
+
+
+def test_tensordot_mismatch() -> None:
+    a = random_tensor((False, True), ((2, 2), (1, 3)))
+    b = random_tensor((False, True), ((3, 1), (2, 1)))
+    with pytest.raises(AssertionError, match="Contracted edges must match"):
+        a.tensordot(b, 1)
+    with pytest.raises(AssertionError, match="numbers of contracted edges"):
+        a.tensordot(b, ((0, 1), (0,)))
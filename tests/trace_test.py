@@ -0,0 +1,47 @@
+import pytest
+import torch
+from grassmann_tensor import GrassmannTensor
+from .helpers import random_tensor
+
+
+@pytest.mark.parametrize("arrow, expected_sign", [((True, False), 1), ((False, True), -1), ((False, False), 1), ((True, True), -1)])
+def test_trace_matrix(arrow: tuple[bool, bool], expected_sign: int) -> None:
+    a = random_tensor(arrow, ((2, 3), (2, 3)))
+    even = torch.diagonal(a.tensor[:2, :2]).sum()
+    odd = torch.diagonal(a.tensor[2:, 2:]).sum()
+    assert torch.allclose(a.trace(((0, 1),)).tensor, even + expected_sign * odd)
+
+
+@pytest.mark.parametrize("arrow_a", [(False, True, True), (True, False, True)])
+@pytest.mark.parametrize("arrow_b", [(False, False, True), (True, True, False)])
+@pytest.mark.parametrize("axes", [((1,), (0,)), ((2, 0), (1, 2)), ((0, 1, 2), (2, 0, 1))])
+def test_trace_tensordot(arrow_a: tuple[bool, ...], arrow_b: tuple[bool, ...], axes: tuple[tuple[int, ...], tuple[int, ...]]) -> None:
+    # Tracing the outer product of two tensors over pairs of their edges gives the contraction of both tensors.
+    a = random_tensor(arrow_a, ((2, 2), (1, 3), (2, 1)))
+    b = random_tensor(arrow_b, ((1, 3), (2, 1), (2, 2)))
+    result = a.tensordot(b, ((), ())).trace(tuple((i, len(a.edges) + j) for i, j in zip(*axes)))
+    expected = a.tensordot(b, axes)
+    assert result.arrow == expected.arrow
+    assert result.edges == expected.edges
+    assert torch.allclose(result.tensor, expected.tensor)
+
+
+@pytest.mark.parametrize("pairs", [((0, 2),), ((3, 1), (2, 0)), ((1, 3),)])
+def test_trace_pending_sign(pairs: tuple[tuple[int, int], ...]) -> None:
+    a = random_tensor((False, True, True, True), ((2, 2), (1, 3), (2, 2), (1, 3)))
+    lazy = a.reverse((0, 2)).permute((2, 3, 0, 1))
+    assert lazy._sign is not None
+    # The reference reads the data of a separate lazy copy, which keeps the sign of lazy pending.
+    eager = GrassmannTensor(lazy.arrow, lazy.edges, a.reverse((0, 2)).permute((2, 3, 0, 1)).tensor)
+    assert torch.allclose(lazy.trace(pairs).tensor, eager.trace(pairs).tensor)
+
+
+def test_trace_batch() -> None:
+    a = random_tensor((False, True, True), ((2, 2), (1, 3), (2, 2)), (3,))
+    result = a.trace(((2, 0),))
+    assert result.batch_shape == (3,)
+    for index in range(3):
+        item = GrassmannTensor(a.arrow, a.edges, a.tensor[index])
+        assert torch.allclose(result.tensor[index], item.trace(((2, 0),)).tensor)
+    with pytest.raises(AssertionError, match="must match"):
+        a.trace(((0, 1),))
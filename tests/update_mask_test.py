@@ -1,6 +1,6 @@
 import pytest
 import torch
-from grassmann_tensor import GrassmannTensor
+from grassmann_tensor import GrassmannTensor, collect_metrics
 
 Initialization = tuple[tuple[bool, ...], tuple[tuple[int, int], ...], torch.Tensor]
 
@@ -40,3 +40,14 @@ def test_update_mask(x: Initialization) -> None:
     tensor = GrassmannTensor(*x)
     updated_tensor = tensor.update_mask()
     assert torch.all(updated_tensor.tensor == torch.where(updated_tensor.mask, 0, x[2]))
+
+
+def test_update_mask_without_mask(x: Initialization) -> None:
+    tensor = GrassmannTensor(*x)
+    with collect_metrics() as metrics:
+        tensor.update_mask()
+    # Only the copy of the data is allocated, and the broadcast parity is not kept.
+    assert metrics.total().allocated_bytes <= x[2].numel() * x[2].element_size()
+    assert not hasattr(tensor, "_mask")
+    in_place = GrassmannTensor(*x).clone().update_mask_()
+    assert torch.equal(in_place.tensor, tensor.tensor)